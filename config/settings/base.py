@@ -222,10 +222,25 @@ def get_trade_tariff_config():
 
 TRADE_TARIFF_CONFIG = get_trade_tariff_config
 
+# connection pool shared by the trade tariff API clients within a process
+TRADE_TARIFF_API_POOL_SIZE = env.int("TRADE_TARIFF_API_POOL_SIZE", 10)
+TRADE_TARIFF_API_RETRIES = env.int("TRADE_TARIFF_API_RETRIES", 3)
+TRADE_TARIFF_API_BACKOFF_FACTOR = env.float("TRADE_TARIFF_API_BACKOFF_FACTOR", 0.5)
+
+# concurrency of the hierarchy download, the rate limit is in requests per second per host
+TRADE_TARIFF_API_DOWNLOAD_WORKERS = env.int("TRADE_TARIFF_API_DOWNLOAD_WORKERS", 8)
+TRADE_TARIFF_API_RATE_LIMIT = env.float("TRADE_TARIFF_API_RATE_LIMIT", 20)
+
+# how long the rendered commodity, heading and subheading pages are cached for, pages are
+# also dropped when a new tree is activated or their tts content is refreshed, 0 disables
+DETAIL_PAGE_CACHE_TIMEOUT = env.int("DETAIL_PAGE_CACHE_TIMEOUT", 60 * 60)
+
 # regulation import arguments
 REGULATIONS_DATA_PATH = APPS_DIR + "/regulations/data/{0}"
 RULES_OF_ORIGIN_DATA_PATH = APPS_DIR + "/rules_of_origin/ingest/data"
 SEARCH_DATA_PATH = APPS_DIR + "/search/data/{0}"
+# where the NLTK corpora used to generate the search keywords are downloaded to
+NLTK_DATA_PATH = env.str("NLTK_DATA_PATH", APPS_DIR + "/search/data/nltk")
 
 COMMODITY_CODE_REGEX = "([0-9]{4})([0-9]{2})([0-9]{2})([0-9]{2})"
 
@@ -32,6 +32,9 @@ CACHES = {
     }
 }
 
+# the cache isn't cleared between tests, so pages are only cached by the tests for it
+DETAIL_PAGE_CACHE_TIMEOUT = 0
+
 # TEMPLATES
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#templates
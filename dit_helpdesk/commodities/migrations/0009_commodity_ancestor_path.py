@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 00:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("commodities", "0008_remove_commodity_last_updated"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commodity",
+            name="ancestor_path",
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
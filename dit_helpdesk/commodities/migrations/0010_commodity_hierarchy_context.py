@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("commodities", "0009_commodity_ancestor_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commodity",
+            name="hierarchy_context",
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
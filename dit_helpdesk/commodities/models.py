@@ -54,6 +54,7 @@ class Commodity(BaseHierarchyModel, TreeSelectorMixin):
     )
 
     COMMODITY_CODE_FIELD = "commodity_code"
+    tts_obj_class = CommodityJson
 
     class Meta:
         unique_together = (
@@ -107,15 +108,6 @@ class Commodity(BaseHierarchyModel, TreeSelectorMixin):
     def short_formatted_commodity_code(self):
         return f"{self.commodity_code[:4]}.{self.commodity_code[4:6]}"
 
-    @property
-    def tts_obj(self):
-        """
-        gets the json object from the tts_json field and converts it to a python CommodityJson class instance
-        used to extract data from the json data structure to display in the template
-        :return: CommodityJson object
-        """
-        return CommodityJson(self, json.loads(self.tts_json))
-
     def get_chapter(self):
         """
         returns the chapter for this commodity via the heading
@@ -130,13 +122,15 @@ class Commodity(BaseHierarchyModel, TreeSelectorMixin):
         Heading item is reached
         :return: model instance
         """
+        self.get_ancestors()
+
         obj = self.heading or self.parent_subheading
         while type(obj) is not Heading:
             obj = obj.get_parent()
         return obj
 
     def get_hierarchy_context_ids(self):
-        hierarchy_context = flatten(reversed(self.get_ancestor_data()))
+        hierarchy_context = flatten(json.loads(self.ancestor_data))
 
         chapter_id = next(d["id"] for d in hierarchy_context if d["type"] == "chapter")
         heading_id = next(d["id"] for d in hierarchy_context if d["type"] == "heading")
@@ -167,6 +161,7 @@ class Commodity(BaseHierarchyModel, TreeSelectorMixin):
         if not parent:
             tree = []
             parent = self
+            self.get_ancestors()
 
         if len(tree) < level + 1:
             tree.append([])
@@ -194,12 +189,6 @@ class Commodity(BaseHierarchyModel, TreeSelectorMixin):
     def get_commodity_object_path(self):
         return self.get_path()
 
-    @property
-    def ancestor_data(self):
-        ancestors = self.get_ancestor_data()
-        ancestors.reverse()
-        return json.dumps(ancestors)
-
     def get_ancestor_data(self, parent=None, tree=None, level=0):
         """
         Returns the context path of the Commodity showing its level in the hierarchy tree
@@ -214,6 +203,7 @@ class Commodity(BaseHierarchyModel, TreeSelectorMixin):
         if not parent:
             tree = []
             parent = self
+            self.get_ancestors()
 
         if len(tree) < level + 1:
             tree.append([])
@@ -104,8 +104,7 @@ class CommodityDetailNorthernIrelandView(BaseSectionedCommodityDetailView):
             goods_nomenclature_sid=self.commodity_object.goods_nomenclature_sid,
         )
 
-        if eu_commodity_object.should_update_tts_content():
-            eu_commodity_object.update_tts_content()
+        self.update_commodity_object_tts_content(eu_commodity_object)
 
 
 class MeasureConditionDetailView(BaseMeasureConditionDetailView):
@@ -86,6 +86,13 @@ class Command(BaseCommand):
             call_command("migrate_regulations")
             logger.info(f"Completed: {current_step}")
 
+            # Downloads the NLTK corpora used to generate the search keywords, unless
+            # they are already in NLTK_DATA_PATH, e.g. on a freshly deployed instance.
+            current_step = "download_nltk_corpora"
+            logger.info(f"Start: {current_step}")
+            call_command("download_nltk_corpora")
+            logger.info(f"Completed: {current_step}")
+
             # This generates the search keywords for the nomenclature tree.
             # Outputs the keywords into a csv file.
             current_step = "generate_search_keywords"
@@ -107,7 +114,14 @@ class Command(BaseCommand):
             # it out at the end.
             current_step = "swap_rebuild_index"
             logger.info(f"Start: {current_step}")
-            call_command("swap_rebuild_index", "--keep-old-trees")
+            call_command("swap_rebuild_index", "--keep-old-trees", "--parallel")
+            logger.info(f"Completed: {current_step}")
+
+            # Fetches the trade tariff JSON for every node of the newly activated trees
+            # so the first visitors to each page don't have to wait on the API.
+            current_step = "prefetch_tts_content"
+            logger.info(f"Start: {current_step}")
+            call_command("prefetch_tts_content")
             logger.info(f"Completed: {current_step}")
 
             # Checks for any change to a countrys Trade Agreement Scenario and will update
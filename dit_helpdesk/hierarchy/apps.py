@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class HierarchyConfig(AppConfig):
     name = "hierarchy"
+
+    def ready(self):
+        from .signals import connect_signals
+
+        connect_signals()
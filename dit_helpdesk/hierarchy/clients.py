@@ -1,7 +1,12 @@
 import logging
+import os
+import threading
+
 import requests
 
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 
 from enum import Enum
 
@@ -13,6 +18,68 @@ logging.disable(logging.NOTSET)
 logger.setLevel(logging.INFO)
 
 
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _build_session():
+    retries = Retry(
+        total=settings.TRADE_TARIFF_API_RETRIES,
+        backoff_factor=settings.TRADE_TARIFF_API_BACKOFF_FACTOR,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["GET"],
+        # hand back the last response so the clients raise `ServerError` as before
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.TRADE_TARIFF_API_POOL_SIZE,
+        pool_maxsize=settings.TRADE_TARIFF_API_POOL_SIZE,
+        max_retries=retries,
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def get_session():
+    """
+    Returns the keep-alive session shared by the API clients of this process
+    Sessions aren't shared across a fork, so they are keyed by process id
+    :return: requests.Session
+    """
+    pid = os.getpid()
+    with _sessions_lock:
+        if pid not in _sessions:
+            _sessions[pid] = _build_session()
+
+        return _sessions[pid]
+
+
+def get_session_stats():
+    """
+    Returns connection reuse counts for the shared session of this process
+    :return: dict of requests made, connections opened and connections reused
+    """
+    num_requests = num_connections = 0
+    for adapter in set(get_session().adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            num_requests += pool.num_requests
+            num_connections += pool.num_connections
+
+    return {
+        "requests": num_requests,
+        "connections": num_connections,
+        "reused": num_requests - num_connections,
+    }
+
+
 def get_auth(config):
     try:
         config = config["AUTH"]
@@ -67,7 +134,7 @@ class JSONObjClient:
         url = f"{self.base_url}{path}/{commodity_code}"
 
         logger.debug(url)
-        response = requests.get(
+        response = get_session().get(
             url,
             auth=self.auth,
             timeout=self.TIMEOUT,
@@ -140,7 +207,7 @@ class HierarchyClient:
 
     def _make_request(self, url):
         logger.debug(url)
-        response = requests.get(
+        response = get_session().get(
             url,
             auth=self.auth,
             params=self.params,
@@ -8,7 +8,18 @@ from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 
-from .models import NomenclatureTree
+from commodities.models import Commodity
+
+from .models import (
+    NomenclatureTree,
+    Section,
+    Chapter,
+    Heading,
+    SubHeading,
+    ANCESTOR_MODELS,
+    join_ancestor_path,
+    parse_ancestor_path,
+)
 
 from trade_tariff_service.tts_api import COMMODITY_DETAIL_TABLE_KEYS
 
@@ -196,28 +207,23 @@ IMPORT_MEASURE_GROUPS = {
 }
 
 
+IMPORT_MEASURE_GROUP_TYPE_IDS = {
+    group_name: frozenset(
+        type_id for _, type_ids in measure_groups for type_id in type_ids
+    )
+    for group_name, measure_groups in IMPORT_MEASURE_GROUPS.items()
+}
+
+
 def get_nomenclature_group_measures(
     nomenclature_model, group_name, country_code, is_eu=None
 ):
     if is_eu:
         country_code = "EU"
 
-    group_measure_type_ids = [
-        item
-        for collection in [type_id for _, type_id in IMPORT_MEASURE_GROUPS[group_name]]
-        for item in collection
-    ]
-
-    measures = nomenclature_model.tts_obj.get_import_measures(country_code)
-
-    group_measures = [
-        measure
-        for measure in measures
-        if measure.type_id in group_measure_type_ids
-        and country_code not in [id for id in measure.excluded_country_area_ids]
-    ]
-
-    return group_measures
+    return nomenclature_model.tts_obj.get_group_import_measures(
+        country_code, IMPORT_MEASURE_GROUP_TYPE_IDS[group_name]
+    )
 
 
 def create_nomenclature_tree(region=settings.PRIMARY_REGION):
@@ -352,3 +358,136 @@ _class_name_arg_map = {
 
 def get_code_argument_by_class(class_):
     return _class_name_arg_map[class_.__name__]
+
+
+def build_ancestor_paths(tree, batch_size=1000):
+    """
+    Fills in the `ancestor_path` of every node of `tree` in a single top-down pass over the tree,
+    this needs to be run again whenever the parents of the nodes change
+    :param tree: NomenclatureTree
+    :param batch_size: number of rows per update statement
+    """
+    section_pks = Section.all_objects.filter(nomenclature_tree=tree).values_list(
+        "pk", flat=True
+    )
+    section_paths = {pk: "" for pk in section_pks}
+
+    chapter_paths = {
+        pk: join_ancestor_path("", "section", section_id) if section_id else ""
+        for pk, section_id in Chapter.all_objects.filter(
+            nomenclature_tree=tree
+        ).values_list("pk", "section_id")
+    }
+
+    heading_paths = {
+        pk: join_ancestor_path(chapter_paths[chapter_id], "chapter", chapter_id)
+        if chapter_id in chapter_paths
+        else ""
+        for pk, chapter_id in Heading.all_objects.filter(
+            nomenclature_tree=tree
+        ).values_list("pk", "chapter_id")
+    }
+
+    def get_child_path(heading_id, parent_subheading_id):
+        if heading_id in heading_paths:
+            return join_ancestor_path(heading_paths[heading_id], "heading", heading_id)
+        if parent_subheading_id in subheading_paths:
+            return join_ancestor_path(
+                subheading_paths[parent_subheading_id],
+                "sub_heading",
+                parent_subheading_id,
+            )
+
+        return ""
+
+    subheading_parents = {
+        pk: (heading_id, parent_subheading_id)
+        for pk, heading_id, parent_subheading_id in SubHeading.all_objects.filter(
+            nomenclature_tree=tree
+        ).values_list("pk", "heading_id", "parent_subheading_id")
+    }
+    subheading_paths = {}
+    for pk in subheading_parents:
+        # walk up to the closest subheading with a known path and fill in the way back down
+        chain = []
+        while pk is not None and pk not in subheading_paths:
+            chain.append(pk)
+            heading_id, parent_subheading_id = subheading_parents[pk]
+            if heading_id is None and parent_subheading_id in subheading_parents:
+                pk = parent_subheading_id
+            else:
+                pk = None
+
+        for chain_pk in reversed(chain):
+            subheading_paths[chain_pk] = get_child_path(*subheading_parents[chain_pk])
+
+    commodity_paths = {
+        pk: get_child_path(heading_id, parent_subheading_id)
+        for pk, heading_id, parent_subheading_id in Commodity.all_objects.filter(
+            nomenclature_tree=tree
+        ).values_list("pk", "heading_id", "parent_subheading_id")
+    }
+
+    for model, paths in [
+        (Section, section_paths),
+        (Chapter, chapter_paths),
+        (Heading, heading_paths),
+        (SubHeading, subheading_paths),
+        (Commodity, commodity_paths),
+    ]:
+        model.all_objects.bulk_update(
+            [model(pk=pk, ancestor_path=path) for pk, path in paths.items()],
+            ["ancestor_path"],
+            batch_size=batch_size,
+        )
+
+
+def build_hierarchy_contexts(tree, batch_size=1000):
+    """
+    Fills in the `hierarchy_context` of every node of `tree` so that indexing the nodes only has
+    to read it, the ancestors of the tree are held in memory and linked through the ancestor paths
+    so that none of the nodes needs a query to walk up to its Section
+    :param tree: NomenclatureTree
+    :param batch_size: number of rows per update statement
+    """
+    ancestors = {
+        hierarchy_type: model.all_objects.filter(nomenclature_tree=tree).in_bulk()
+        for hierarchy_type, model in ANCESTOR_MODELS.items()
+    }
+
+    def build_hierarchy_context(obj):
+        if obj.ancestor_path is not None:
+            obj.set_ancestors(
+                [
+                    ancestors[hierarchy_type][pk]
+                    for hierarchy_type, pk in parse_ancestor_path(obj.ancestor_path)
+                ]
+            )
+        obj.hierarchy_context = obj.build_hierarchy_context()
+
+    for hierarchy_type, objects in ancestors.items():
+        for obj in objects.values():
+            build_hierarchy_context(obj)
+        ANCESTOR_MODELS[hierarchy_type].all_objects.bulk_update(
+            objects.values(), ["hierarchy_context"], batch_size=batch_size
+        )
+
+    # the context of a commodity lists its siblings but is otherwise the same for every child
+    # of the same parent, so it only needs to be built once per parent
+    commodity_contexts = {}
+    commodities = []
+    for commodity in Commodity.all_objects.filter(nomenclature_tree=tree).iterator(
+        chunk_size=batch_size
+    ):
+        parent_key = (commodity.heading_id, commodity.parent_subheading_id)
+        if parent_key not in commodity_contexts:
+            build_hierarchy_context(commodity)
+            commodity_contexts[parent_key] = commodity.hierarchy_context
+        commodity.hierarchy_context = commodity_contexts[parent_key]
+        commodities.append(commodity)
+
+        if len(commodities) >= batch_size:
+            Commodity.all_objects.bulk_update(commodities, ["hierarchy_context"])
+            commodities = []
+
+    Commodity.all_objects.bulk_update(commodities, ["hierarchy_context"])
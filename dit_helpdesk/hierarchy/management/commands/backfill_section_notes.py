@@ -0,0 +1,84 @@
+import logging
+
+import requests
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hierarchy.clients import HierarchyClient, get_hierarchy_client
+from hierarchy.models import Section, invalidate_detail_pages
+
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_section_notes(region):
+    """
+    Fetches and stores the section notes of the active tree of a region when the tree was
+    imported before the notes were stored with it, see `Section.section_note`
+    Sections the API has no note for are stored with an empty note so they aren't fetched
+    again
+    :param region: string
+    :return: number of sections updated
+    """
+    sections = Section.get_active_objects(region).filter(section_note__isnull=True)
+    section_ids = sorted(set(sections.values_list("section_id", flat=True)))
+    if not section_ids:
+        return 0
+
+    hierarchy_client = get_hierarchy_client(region)
+
+    updated = 0
+    for section_id in section_ids:
+        try:
+            section_data = hierarchy_client.get_item_data(
+                HierarchyClient.CommodityType.SECTION, section_id
+            )
+        except (
+            HierarchyClient.NotFound,
+            HierarchyClient.ServerError,
+            HierarchyClient.UnknownError,
+            requests.RequestException,
+        ) as e:
+            logger.warning(
+                "Could not fetch section %s for %s: %s", section_id, region, e
+            )
+            continue
+
+        section_note = section_data["data"]["attributes"].get("section_note") or ""
+        updated += sections.filter(section_id=section_id).update(
+            section_note=section_note
+        )
+
+    return updated
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Fetch and store the section notes of the active NomenclatureTrees imported before "
+        "the notes were stored with the tree, does nothing once they are all stored"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--region",
+            action="append",
+            help="Region to backfill, can be given multiple times (default: all regions)",
+        )
+
+    def handle(self, *args, **options):
+        regions = options["region"] or [
+            settings.PRIMARY_REGION,
+            settings.SECONDARY_REGION,
+        ]
+
+        updated = 0
+        for region in regions:
+            region_updated = backfill_section_notes(region)
+            logger.info("Stored %s section notes for %s", region_updated, region)
+            updated += region_updated
+
+        # the cached detail pages were rendered without the notes
+        if updated:
+            invalidate_detail_pages()
@@ -4,6 +4,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from commodities.models import Commodity
+from hierarchy.helpers import build_ancestor_paths, build_hierarchy_contexts
 from hierarchy.models import NomenclatureTree, Section, Chapter, Heading, SubHeading
 
 logger = logging.getLogger(__name__)
@@ -158,3 +159,7 @@ class Command(BaseCommand):
                     commodity.save()
 
             copy_sections()
+
+            # the copied paths and contexts point at the objects of the source tree
+            build_ancestor_paths(new_tree)
+            build_hierarchy_contexts(new_tree)
@@ -0,0 +1,131 @@
+import logging
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from commodities.models import Commodity
+from hierarchy.clients import JSONObjClient, get_session_stats
+from hierarchy.models import NomenclatureTree, Chapter, Heading, SubHeading
+
+from core.helpers import Timer
+
+
+logger = logging.getLogger(__name__)
+
+
+HIERARCHY_MODELS = [Chapter, Heading, SubHeading, Commodity]
+
+DEFAULT_WORKERS = 4
+
+
+def _update_tts_content(obj, tts_client):
+    try:
+        obj.update_tts_content(tts_client)
+    except (
+        JSONObjClient.ServerError,
+        JSONObjClient.UnknownError,
+        requests.RequestException,
+    ) as e:
+        logger.warning("Could not prefetch %s: %s", obj, e)
+        return False
+
+    return True
+
+
+def prefetch_tts_content(region, workers=DEFAULT_WORKERS, force=False):
+    """Warm the `tts_json` cache for every node of the active tree for `region`.
+
+    Nodes whose cached content is still fresh are skipped unless `force` is set, so an
+    interrupted run resumes from where it stopped when run again.
+
+    """
+    tree = NomenclatureTree.get_active_tree(region)
+    if not tree:
+        logger.warning("No active tree for %s, nothing to prefetch", region)
+        return {}
+
+    tts_client = tree.get_tts_api_client()
+    stats = {}
+
+    for model in HIERARCHY_MODELS:
+        model_name = model.__name__
+        objects = model.get_active_objects(region).order_by("pk").iterator()
+        if not force:
+            objects = (obj for obj in objects if obj.should_update_tts_content())
+
+        timer = Timer()
+        timer.start()
+
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Only keep a couple of requests queued per worker so we don't load the
+            # whole table into memory before the first request is made
+            pending = set()
+            for obj in objects:
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    results.extend(future.result() for future in done)
+                pending.add(executor.submit(_update_tts_content, obj, tts_client))
+
+            results.extend(future.result() for future in wait(pending).done)
+
+        fetched = results.count(True)
+        failed = results.count(False)
+
+        timer.stop()
+        logger.info(
+            "Prefetched %s %s objects for %s in %.1fs (%d failed)",
+            fetched,
+            model_name,
+            region,
+            timer.elapsed(),
+            failed,
+        )
+        stats[model_name] = {"fetched": fetched, "failed": failed}
+
+    return stats
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Fetch and cache the trade tariff JSON for every Chapter, Heading, SubHeading and "
+        "Commodity of the active NomenclatureTree so that detail views don't have to"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--region",
+            action="append",
+            help="Region to prefetch, can be given multiple times (default: all regions)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help="Number of concurrent requests to the trade tariff API",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            default=False,
+            help="Refetch content even if the cached copy is still fresh",
+        )
+
+    def handle(self, *args, **options):
+        regions = options["region"] or [
+            settings.PRIMARY_REGION,
+            settings.SECONDARY_REGION,
+        ]
+
+        for region in regions:
+            logger.info("Prefetching tts content for %s", region)
+            prefetch_tts_content(
+                region, workers=options["workers"], force=options["force"]
+            )
+
+        logger.info("API connection stats: %s", get_session_stats())
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 00:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hierarchy", "0017_nomenclaturetree_source"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chapter",
+            name="ancestor_path",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="heading",
+            name="ancestor_path",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="section",
+            name="ancestor_path",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="subheading",
+            name="ancestor_path",
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
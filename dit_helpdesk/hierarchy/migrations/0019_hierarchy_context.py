@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hierarchy", "0018_ancestor_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chapter",
+            name="hierarchy_context",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="heading",
+            name="hierarchy_context",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="section",
+            name="hierarchy_context",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="subheading",
+            name="hierarchy_context",
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hierarchy", "0019_hierarchy_context"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="section",
+            name="section_note",
+            field=models.TextField(null=True),
+        ),
+    ]
@@ -1,12 +1,16 @@
+import copy
 import json
 import logging
 import re
+import threading
+import uuid
 import datetime as dt
 
-import requests
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils import timezone
 from django.core.cache import cache
@@ -14,6 +18,7 @@ from django.core.cache import cache
 from backports.datetime_fromisoformat import MonkeyPatch
 
 from hierarchy.clients import get_json_obj_client
+from hierarchy.notes import parse_chapter_note, parse_section_note
 from trade_tariff_service.tts_api import ChapterJson, HeadingJson, SubHeadingJson
 from core.helpers import flatten
 
@@ -24,6 +29,97 @@ logger = logging.getLogger(__name__)
 
 CHAPTER_CODE_REGEX = "([0-9]{2})([0-9]{2})([0-9]{2})([0-9]{2})([0-9]{2})"
 
+# How long a process holds the lock for refreshing an object's tts content, this also
+# acts as a back-off when the refresh fails as the lock is left to expire
+TTS_REFRESH_LOCK_TIMEOUT = 60
+
+# How long tts content is served before it's refreshed
+TTS_CONTENT_MAX_AGE = dt.timedelta(days=1)
+
+# Stale tts content is refreshed in the background so requests don't have to wait on
+# the trade tariff API, threads are only started on first use
+tts_refresh_executor = ThreadPoolExecutor(max_workers=4)
+
+# How many times this process fetched tts content from the cache and decoded it, see
+# `get_tts_stats`
+_tts_stats = Counter()
+_tts_stats_lock = threading.Lock()
+
+
+def _count_tts_stat(name):
+    with _tts_stats_lock:
+        _tts_stats[name] += 1
+
+
+# Rendered detail pages are cached against these versions, see `get_detail_page_versions`
+DETAIL_PAGE_TREE_VERSION_CACHE_KEY = "detail_page__tree_version"
+
+# Only bumped when a tree is activated or ended, see `get_active_tree_version`
+ACTIVE_TREE_VERSION_CACHE_KEY = "nomenclature_tree__active_version"
+
+
+def get_detail_page_version_cache_key(model, commodity_code, goods_nomenclature_sid):
+    # shared by the regions as the Northern Ireland pages show the objects of both trees
+    return (
+        f"detail_page__{model.__name__}_{commodity_code}_{goods_nomenclature_sid}"
+        "__version"
+    )
+
+
+def get_detail_page_versions(model, commodity_code, goods_nomenclature_sid):
+    """
+    Returns the versions the rendered detail pages of an object are cached against, a
+    version is None until the first time it is bumped
+    :param model: hierarchy model class of the object
+    :param commodity_code: string
+    :param goods_nomenclature_sid: string
+    :return: tuple of the tree version and the object version
+    """
+    object_key = get_detail_page_version_cache_key(
+        model, commodity_code, goods_nomenclature_sid
+    )
+    versions = cache.get_many([DETAIL_PAGE_TREE_VERSION_CACHE_KEY, object_key])
+
+    return versions.get(DETAIL_PAGE_TREE_VERSION_CACHE_KEY), versions.get(object_key)
+
+
+def _bump_detail_page_version(key):
+    cache.set(key, uuid.uuid4().hex, None)
+
+
+def invalidate_detail_pages():
+    """
+    Drops every cached detail page, e.g. when regulations or flags change
+    """
+    _bump_detail_page_version(DETAIL_PAGE_TREE_VERSION_CACHE_KEY)
+
+
+def get_active_tree_version():
+    """
+    Returns the version of the active trees, the in-memory lookups built from the active
+    trees are rebuilt when it changes
+    :return: string
+    """
+    return cache.get(ACTIVE_TREE_VERSION_CACHE_KEY)
+
+
+def invalidate_active_trees():
+    """
+    Drops everything built from the active trees, when a tree is activated or ended
+    """
+    _bump_detail_page_version(ACTIVE_TREE_VERSION_CACHE_KEY)
+    invalidate_detail_pages()
+
+
+def get_tts_stats():
+    """
+    Returns how many times tts content was fetched from the cache and decoded into a tts
+    object by this process, the difference across a request gives the counts for a page
+    :return: dict of fetches and decodes
+    """
+    with _tts_stats_lock:
+        return {"fetches": _tts_stats["fetches"], "decodes": _tts_stats["decodes"]}
+
 
 class HierarchyQuerySet(models.QuerySet):
     def get_by_commodity_code(self, commodity_code, **kwargs):
@@ -114,6 +210,13 @@ class NomenclatureTree(models.Model):
 
         return prev_tree
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        # activating or ending a tree changes what every detail page shows, this is only
+        # visible to other connections once the transaction is committed
+        transaction.on_commit(invalidate_active_trees)
+
     def get_tts_api_client(self):
         return get_json_obj_client(self.region)
 
@@ -127,9 +230,23 @@ class BaseHierarchyModel(models.Model):
 
     nomenclature_tree = models.ForeignKey(NomenclatureTree, on_delete=models.CASCADE)
 
+    # materialised path of the ancestors from the Section down to the parent, e.g.
+    # `section-1/chapter-2/heading-3`, null until built by `build_ancestor_paths`
+    ancestor_path = models.TextField(null=True, blank=True)
+
+    # JSON of `get_ancestor_data` as indexed in elasticsearch, null until built by
+    # `build_hierarchy_contexts`
+    hierarchy_context = models.TextField(null=True, blank=True)
+
+    # class wrapping the decoded tts content, see `tts_obj`
+    tts_obj_class = None
+
     def __init__(self, *args, **kwargs):
         super(BaseHierarchyModel, self).__init__(*args, **kwargs)
         self._temp_cache = None
+        self._cached_tts_json = None
+        self._tts_obj = None
+        self._ancestors = None
 
     class Meta:
         abstract = True
@@ -144,7 +261,33 @@ class BaseHierarchyModel(models.Model):
     def tts_json(self):
         if self._temp_cache:
             return self._temp_cache
-        return cache.get(self._get_external_cache_key())
+
+        # only fetched once per instance, a missing value is looked up again in case it has
+        # been fetched in the meantime
+        if self._cached_tts_json is None:
+            self._cached_tts_json = cache.get(self._get_external_cache_key())
+            _count_tts_stat("fetches")
+
+        return self._cached_tts_json
+
+    @property
+    def tts_obj(self):
+        """
+        gets the json object from the tts_json field and converts it to a python `tts_obj_class`
+        instance used to extract data from the json data structure to display in the template
+        The json is only decoded again when `tts_json` changes, so every caller shares the same
+        object which mustn't be modified
+        :return: BaseCommodityJson object
+        """
+        if self.tts_obj_class is None:
+            raise NotImplementedError(f"Implement `tts_obj_class` for {self.__class__}")
+
+        tts_json = self.tts_json
+        if self._tts_obj is None or self._tts_obj[0] is not tts_json:
+            self._tts_obj = (tts_json, self.tts_obj_class(self, json.loads(tts_json)))
+            _count_tts_stat("decodes")
+
+        return self._tts_obj[1]
 
     @tts_json.setter
     def tts_json(self, val):
@@ -165,25 +308,84 @@ class BaseHierarchyModel(models.Model):
         if self._temp_cache:
             cache.set(self._get_external_cache_key(), self._temp_cache)
             cache.set(self._get_updated_at_cache_key(), timezone.now().isoformat())
+            self._cached_tts_json = self._temp_cache
+            self.invalidate_detail_pages()
 
         self._temp_cache = None
 
-    def should_update_tts_content(self):
-        is_stale_tts_json = (
-            not self.last_updated
-            or self.last_updated < dt.datetime.now(timezone.utc) - dt.timedelta(days=1)
+    def invalidate_detail_pages(self):
+        """
+        Drops the cached detail pages of this object in every region
+        """
+        _bump_detail_page_version(
+            get_detail_page_version_cache_key(
+                self.__class__,
+                self.commodity_code,
+                getattr(self, "goods_nomenclature_sid", None),
+            )
         )
+
+    def get_tts_content_stale_at(self):
+        """
+        Returns when the tts content of the object becomes stale and should be refreshed
+        :return: datetime, None if the content has never been fetched
+        """
+        last_updated = self.last_updated
+        if not last_updated:
+            return None
+
+        return last_updated + TTS_CONTENT_MAX_AGE
+
+    def should_update_tts_content(self):
+        stale_at = self.get_tts_content_stale_at()
+        is_stale_tts_json = not stale_at or stale_at < dt.datetime.now(timezone.utc)
         should_update = is_stale_tts_json or self.tts_json is None
         return should_update
 
     def get_tts_content(self, tts_client):
         raise NotImplementedError("Implement `get_tts_content`")
 
-    def update_tts_content(self):
-        client = self.nomenclature_tree.get_tts_api_client()
+    def update_tts_content(self, tts_client=None):
+        client = tts_client or self.nomenclature_tree.get_tts_api_client()
         self.tts_json = self.get_tts_content(client)
         self.save_cache()
 
+    def _get_refresh_lock_cache_key(self):
+        return f"{self._get_external_cache_key()}__refresh_lock"
+
+    def _background_update_tts_content(self, tts_client):
+        try:
+            self.update_tts_content(tts_client)
+        except Exception:
+            logger.exception("Could not refresh tts content for %s", self)
+            return
+
+        cache.delete(self._get_refresh_lock_cache_key())
+
+    def refresh_tts_content(self):
+        """
+        Makes sure the object has up to date tts content.
+        Content that has never been fetched is fetched straight away, stale content is
+        served as is while a single background refresh per object is queued
+        """
+        if not self.should_update_tts_content():
+            return
+
+        if self.tts_json is None:
+            self.update_tts_content()
+            return
+
+        if not cache.add(
+            self._get_refresh_lock_cache_key(), True, TTS_REFRESH_LOCK_TIMEOUT
+        ):
+            return
+
+        # refresh a copy so the content doesn't change under the current request
+        tts_client = self.nomenclature_tree.get_tts_api_client()
+        tts_refresh_executor.submit(
+            copy.copy(self)._background_update_tts_content, tts_client
+        )
+
     @staticmethod
     def _amend_measure_conditions(resp_content):
         """
@@ -233,6 +435,9 @@ class BaseHierarchyModel(models.Model):
         return chapter_path
 
     def get_depth(self):
+        if self.ancestor_path is not None:
+            return len(parse_ancestor_path(self.ancestor_path)) + 1
+
         depth = 1
 
         parent = self.get_parent()
@@ -242,6 +447,81 @@ class BaseHierarchyModel(models.Model):
 
         return depth
 
+    @property
+    def ancestor_data(self):
+        if self.hierarchy_context is not None:
+            return self.hierarchy_context
+
+        return self.build_hierarchy_context()
+
+    def build_hierarchy_context(self):
+        """
+        Returns the JSON of the ancestors of the instance from the Section down, as stored in
+        `hierarchy_context`
+        :return: string
+        """
+        ancestors = self.get_ancestor_data()
+        ancestors.reverse()
+        return json.dumps(ancestors)
+
+    def get_ancestors(self):
+        """
+        Returns the ancestors of the instance from the Section down to its parent
+        When the ancestor path has been built they are loaded with a query per type of ancestor and
+        linked to each other, so walking up the parents from here on doesn't hit the database
+        :return: list of model instances
+        """
+        if self._ancestors is not None:
+            return self._ancestors
+
+        if self.ancestor_path is None:
+            ancestors = []
+            parent = self.get_parent()
+            while parent:
+                ancestors.insert(0, parent)
+                parent = parent.get_parent()
+
+            return ancestors
+
+        path = parse_ancestor_path(self.ancestor_path)
+        objects = {}
+        for hierarchy_type in {hierarchy_type for hierarchy_type, _ in path}:
+            model = ANCESTOR_MODELS[hierarchy_type]
+            objects[hierarchy_type] = model.all_objects.in_bulk(
+                [pk for path_type, pk in path if path_type == hierarchy_type]
+            )
+
+        ancestors = [
+            objects[hierarchy_type][pk]
+            for hierarchy_type, pk in path
+            if pk in objects[hierarchy_type]
+        ]
+        self.set_ancestors(ancestors)
+
+        return ancestors
+
+    def set_ancestors(self, ancestors):
+        """
+        Links the instance to already loaded ancestors, which are then returned by `get_ancestors`
+        :param ancestors: list of model instances from the Section down to the parent
+        """
+        for parent, child in zip(ancestors, ancestors[1:] + [self]):
+            child.set_parent(parent)
+
+        self._ancestors = ancestors
+
+    def set_parent(self, parent):
+        """
+        Points the foreign key to the parent's type at `parent`, which also caches it
+        :param parent: model instance
+        """
+        for field in self._meta.concrete_fields:
+            if field.is_relation and field.related_model is type(parent):
+                setattr(self, field.name, parent)
+                return
+
+        raise ValueError(f"{parent} can't be the parent of {self}")
+
 
 class Section(BaseHierarchyModel, TreeSelectorMixin):
     """
@@ -255,6 +535,9 @@ class Section(BaseHierarchyModel, TreeSelectorMixin):
     keywords = models.TextField(null=True)
     ranking = models.SmallIntegerField(null=True)
 
+    # raw note as downloaded with the section, null for trees imported without it
+    section_note = models.TextField(null=True)
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -331,138 +614,10 @@ class Section(BaseHierarchyModel, TreeSelectorMixin):
 
     @property
     def section_notes(self):
-        url = "https://www.trade-tariff.service.gov.uk/api/v2/sections/{0}/section_note".format(
-            self.section_id
-        )
-        resp = requests.get(url, timeout=10)
-        section_notes = []
-
-        if resp.status_code == 200:
-            resp_content = resp.json()
-
-            section_note_items = resp_content["content"].split("\r\n")
-
-            for item in section_note_items:
-                if not item:
-                    continue
-
-                # 2.A.
-                # Matches:
-                #   1: 2.A.
-                match = re.search(r"^(\d\.[A-Z]\.)$", item)
-                if match:
-                    section_notes.append(
-                        '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-1"><span>{0}</span><span></span></div>'.format(  # noqa: E501
-                            match.group(1)
-                        )
-                    )
-                    continue
-
-                # '* 1\\. This is some text'
-                # Matches:
-                #   1: *
-                #   2: 1
-                #   3: This is some text
-                #
-                # '2. This is some text'
-                # Matches:
-                #   1: ''
-                #   2: 1
-                #   3: This is some text
-                match = re.search(r"^(\* )?([\dA-Z])\\*\. (.+)", item)
-                if match:
-                    section_notes.append(
-                        '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-1"><span>{0}.</span><span>{1}</span></div>'.format(  # noqa: E501
-                            match.group(2), match.group(3)
-                        )
-                    )
-                    continue
-
-                # 12.This is some text
-                # Matches:
-                #   1:
-                #   2: 12
-                #   3: This is some text
-                match = re.search(r"^(\* )?([\d]+)\\*\.(.+)$", item)
-                if match:
-                    section_notes.append(
-                        '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-1"><span>{0}.</span><span>{1}</span></div>'.format(  # noqa: E501
-                            match.group(2), match.group(3)
-                        )
-                    )
-                    continue
-
-                # * (B) This is some text
-                # Matches:
-                #   1: B
-                #   2: This is some text
-                match = re.search(r"^ *\* *\((\w+)\) (.+)", item)
-                if match:
-                    section_notes.append(
-                        '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-2"><span>({0})</span><span>{1}</span></div>'.format(  # noqa: E501
-                            match.group(1), match.group(2)
-                        )
-                    )
-                    continue
-
-                # - This is some text
-                # Matches:
-                #   1: This is some text
-                match = re.search(r"^— (.+)", item)
-                if match:
-                    section_notes.append(
-                        '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-3"><span>{0}</span><span>{1}</span></div>'.format(  # noqa: E501
-                            "-", match.group(1)
-                        )
-                    )
-                    continue
-
-                # * This is some text
-                # Matches:
-                #   1: This is some text
-                match = re.search(r"^\* ([^\d.]+)", item)
-                if match:
-                    section_notes.append(
-                        '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__text"><span>{0}</span><span></span></div>'.format(  # noqa: E501
-                            match.group(1)
-                        )
-                    )
-                    continue
-
-                # ###Note###
-                # Matches:
-                #   1: Note
-                match = re.search(r"^#{2,3} ?([\w ]+)#{2,3} ?", item)
-                if match:
-                    section_notes.append(
-                        '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__heading"><span>{0}</span><span></span></div>'.format(  # noqa: E501
-                            match.group(1)
-                        )
-                    )
-                    continue
-
-                match = re.search(r"^(Subheading note|Additional notes)", item)
-                if match:
-                    section_notes.append(
-                        '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__heading"><span>{0}</span><span></span></div>'.format(  # noqa: E501
-                            match.group(1)
-                        )
-                    )
-                    continue
-
-                section_notes.append(
-                    '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-2"><span></span><span>{0}</span></div>'.format(  # noqa: E501
-                        item
-                    )
-                )
-
-        return section_notes
+        if not self.section_note:
+            return ()
 
-    @property
-    def ancestor_data(self):
-        ancestors = self.get_ancestor_data()
-        ancestors.reverse()
-        return json.dumps(ancestors)
+        return parse_section_note(self.section_note)
 
     def get_ancestor_data(self, parent=None, tree=None, level=0):
         """
@@ -498,6 +653,7 @@ class Chapter(BaseHierarchyModel, TreeSelectorMixin):
     """
 
     COMMODITY_CODE_FIELD = "chapter_code"
+    tts_obj_class = ChapterJson
 
     goods_nomenclature_sid = models.CharField(max_length=10)
     productline_suffix = models.CharField(max_length=2)
@@ -588,12 +744,6 @@ class Chapter(BaseHierarchyModel, TreeSelectorMixin):
 
         return reverse("search:search-hierarchy", kwargs=kwargs)
 
-    @property
-    def ancestor_data(self):
-        ancestors = self.get_ancestor_data()
-        ancestors.reverse()
-        return json.dumps(ancestors)
-
     def get_ancestor_data(self, parent=None, tree=None, level=0):
         """
         Returns the context path of the Commodity showing its level in the hierarchy tree
@@ -608,6 +758,7 @@ class Chapter(BaseHierarchyModel, TreeSelectorMixin):
         if not parent:
             tree = []
             parent = self
+            self.get_ancestors()
 
         if len(tree) < level + 1:
             tree.append([])
@@ -639,6 +790,7 @@ class Chapter(BaseHierarchyModel, TreeSelectorMixin):
         if not parent:
             tree = []
             parent = self
+            self.get_ancestors()
 
         if len(tree) < level + 1:
             tree.append([])
@@ -702,67 +854,16 @@ class Chapter(BaseHierarchyModel, TreeSelectorMixin):
 
         return tts_content
 
-    @property
-    def tts_obj(self):
-        """
-        gets the json object from the tts_json field and converts it to a python CommodityJson class instance
-        used to extract data from the json data structure to display in the template
-        :return: CommodityJson object
-        """
-        return ChapterJson(self, json.loads(self.tts_json))
-
     @property
     def chapter_notes(self):
-
         if not self.tts_json:
-            return []
+            return ()
+
         chapter_note = self.tts_obj.chapter_note
+        if not chapter_note:
+            return ()
 
-        chapter_note_items = chapter_note.split("\r\n")
-
-        chapter_notes = []
-        for item in chapter_note_items:
-            match = re.search(r"^\* (\d)\\. (.*)", item)
-            if match:
-                chapter_notes.append(
-                    '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-1"><span>{0}.</span><span>{1}</span></div>'.format(  # noqa: E501
-                        match.group(1), match.group(2)
-                    )
-                )
-
-            match = re.search(r"^  \* \((\w)\) (.*)", item)
-            if match:
-                chapter_notes.append(
-                    '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-2"><span>({0})</span><span>{1}</span></div>'.format(  # noqa: E501
-                        match.group(1), match.group(2)
-                    )
-                )
-
-            match = re.search(r"^    ([\s*\\-]*)(.*)", item)
-            if match:
-                chapter_notes.append(
-                    '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-3"><span>{0}</span><span>{1}</span></div>'.format(  # noqa: E501
-                        "-", match.group(2)
-                    )
-                )
-
-            match = re.search(r"^\* ([^\d.]+)", item)
-            if match:
-                chapter_notes.append(
-                    '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__text"><span>{0}</span><span></span></div>'.format(  # noqa: E501
-                        match.group(1)
-                    )
-                )
-
-            match = re.search(r"^##(.+)##", item)
-            if match:
-                chapter_notes.append(
-                    '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__heading"><span>{0}</span><span></span></div>'.format(  # noqa: E501
-                        match.group(1)
-                    )
-                )
-
-        return chapter_notes
+        return parse_chapter_note(chapter_note)
 
     def get_parent(self):
         return self.section
@@ -780,6 +881,7 @@ class Chapter(BaseHierarchyModel, TreeSelectorMixin):
 
 class Heading(BaseHierarchyModel, TreeSelectorMixin):
     COMMODITY_CODE_FIELD = "heading_code"
+    tts_obj_class = HeadingJson
 
     goods_nomenclature_sid = models.CharField(max_length=10)
     productline_suffix = models.CharField(max_length=2)
@@ -809,15 +911,6 @@ class Heading(BaseHierarchyModel, TreeSelectorMixin):
     def short_formatted_commodity_code(self):
         return self.heading_code[:4]
 
-    @property
-    def tts_obj(self):
-        """
-        gets the json object from the tts_json field and converts it to a python CommodityJson class instance
-        used to extract data from the json data structure to display in the template
-        :return: CommodityJson object
-        """
-        return HeadingJson(self, json.loads(self.tts_json))
-
     def get_chapter(self):
         return self.chapter
 
@@ -836,6 +929,7 @@ class Heading(BaseHierarchyModel, TreeSelectorMixin):
         if not parent:
             tree = []
             parent = self
+            self.get_ancestors()
 
         if len(tree) < level + 1:
             tree.append([])
@@ -969,12 +1063,6 @@ class Heading(BaseHierarchyModel, TreeSelectorMixin):
         ]
         return True if duplicate_child else False
 
-    @property
-    def ancestor_data(self):
-        ancestors = self.get_ancestor_data()
-        ancestors.reverse()
-        return json.dumps(ancestors)
-
     def get_ancestor_data(self, parent=None, tree=None, level=0):
         """
         Returns the context path of the heading showing its level in the hierarchy tree
@@ -989,6 +1077,7 @@ class Heading(BaseHierarchyModel, TreeSelectorMixin):
         if not parent:
             tree = []
             parent = self
+            self.get_ancestors()
 
         if len(tree) < level + 1:
             tree.append([])
@@ -1106,6 +1195,7 @@ class Heading(BaseHierarchyModel, TreeSelectorMixin):
 
 class SubHeading(BaseHierarchyModel, TreeSelectorMixin):
     COMMODITY_CODE_FIELD = "commodity_code"
+    tts_obj_class = SubHeadingJson
 
     productline_suffix = models.CharField(max_length=2)
     parent_goods_nomenclature_item_id = models.CharField(max_length=10)
@@ -1207,7 +1297,7 @@ class SubHeading(BaseHierarchyModel, TreeSelectorMixin):
         return reverse("search:search-hierarchy", kwargs=kwargs)
 
     def get_hierarchy_context_ids(self):
-        hierarchy_context = flatten(reversed(self.get_ancestor_data()))
+        hierarchy_context = flatten(json.loads(self.ancestor_data))
 
         chapter_id = next(d["id"] for d in hierarchy_context if d["type"] == "chapter")
         heading_id = next(d["id"] for d in hierarchy_context if d["type"] == "heading")
@@ -1261,15 +1351,10 @@ class SubHeading(BaseHierarchyModel, TreeSelectorMixin):
                                 elif isinstance(notes, list):
                                     notes.extend(footnotes)
                             else:
-                                notes = footnotes
+                                # the footnotes belong to the shared tts object
+                                notes = copy.copy(footnotes)
         return notes
 
-    @property
-    def ancestor_data(self):
-        ancestors = self.get_ancestor_data()
-        ancestors.reverse()
-        return json.dumps(ancestors)
-
     def get_ancestor_data(self, parent=None, tree=None, level=0):
         """
         Returns the context path of the Commodity showing its level in the hierarchy tree
@@ -1284,6 +1369,7 @@ class SubHeading(BaseHierarchyModel, TreeSelectorMixin):
         if not parent:
             tree = []
             parent = self
+            self.get_ancestors()
 
         if len(tree) < level + 1:
             tree.append([])
@@ -1346,15 +1432,6 @@ class SubHeading(BaseHierarchyModel, TreeSelectorMixin):
 
         return self._amend_measure_conditions(tts_content)
 
-    @property
-    def tts_obj(self):
-        """
-        gets the json object from the tts_json field and converts it to a python CommodityJson class instance
-        used to extract data from the json data structure to display in the template
-        :return: CommodityJson object
-        """
-        return SubHeadingJson(self, json.loads(self.tts_json))
-
     def get_path(self, parent=None, tree=None, level=0):
         """
         Returns the context path of the Commodity showing its level in the hierarchy tree
@@ -1370,6 +1447,7 @@ class SubHeading(BaseHierarchyModel, TreeSelectorMixin):
         if not parent:
             tree = []
             parent = self
+            self.get_ancestors()
 
         if len(tree) < level + 1:
             tree.append([])
@@ -1418,6 +1496,7 @@ class SubHeading(BaseHierarchyModel, TreeSelectorMixin):
         :return: chapter
         """
         if not ancestor:
+            self.get_ancestors()
             ancestor = self.get_parent()
 
         while not isinstance(ancestor, Heading):
@@ -1506,3 +1585,46 @@ class SubHeading(BaseHierarchyModel, TreeSelectorMixin):
                 "order_number": order_number,
             },
         )
+
+
+ANCESTOR_MODELS = {
+    "section": Section,
+    "chapter": Chapter,
+    "heading": Heading,
+    "sub_heading": SubHeading,
+}
+ANCESTOR_TYPES = {
+    model: hierarchy_type for hierarchy_type, model in ANCESTOR_MODELS.items()
+}
+
+
+def join_ancestor_path(ancestor_path, hierarchy_type, pk):
+    """
+    Returns the ancestor path of the children of a node
+    :param ancestor_path: ancestor path of the node
+    :param hierarchy_type: type of the node, a key of `ANCESTOR_MODELS`
+    :param pk: primary key of the node
+    :return: string
+    """
+    token = f"{hierarchy_type}-{pk}"
+    if not ancestor_path:
+        return token
+
+    return f"{ancestor_path}/{token}"
+
+
+def parse_ancestor_path(ancestor_path):
+    """
+    Splits an ancestor path into its ancestors
+    :param ancestor_path: string
+    :return: list of (type, pk) tuples from the Section down to the parent
+    """
+    if not ancestor_path:
+        return []
+
+    path = []
+    for token in ancestor_path.split("/"):
+        hierarchy_type, pk = token.rsplit("-", 1)
+        path.append((hierarchy_type, int(pk)))
+
+    return path
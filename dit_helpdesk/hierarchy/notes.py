@@ -0,0 +1,95 @@
+"""
+Renders the chapter and section notes of the trade tariff into the html note items shown
+on the detail pages
+"""
+import functools
+import re
+
+# Each rule is a precompiled pattern with the css modifier of the item and the templates of
+# its two spans, see `re.Match.expand`. Every line is rendered by the first rule matching it.
+
+CHAPTER_NOTE_RULES = [
+    # '* 1\\. This is some text'
+    (re.compile(r"^\* (\d)\\. (.*)"), "level-1", r"\1.", r"\2"),
+    # '  * (a) This is some text'
+    (re.compile(r"^  \* \((\w)\) (.*)"), "level-2", r"(\1)", r"\2"),
+    # '    - This is some text'
+    (re.compile(r"^    ([\s*\\-]*)(.*)"), "level-3", "-", r"\2"),
+    # '* This is some text'
+    (re.compile(r"^\* ([^\d.]+)"), "text", r"\1", ""),
+    # '##Note##'
+    (re.compile(r"^##(.+)##"), "heading", r"\1", ""),
+]
+
+SECTION_NOTE_RULES = [
+    # '2.A.'
+    (re.compile(r"^(\d\.[A-Z]\.)$"), "level-1", r"\1", ""),
+    # '* 1\\. This is some text' or '2. This is some text'
+    (re.compile(r"^(\* )?([\dA-Z])\\*\. (.+)"), "level-1", r"\2.", r"\3"),
+    # '12.This is some text'
+    (re.compile(r"^(\* )?([\d]+)\\*\.(.+)$"), "level-1", r"\2.", r"\3"),
+    # '* (B) This is some text'
+    (re.compile(r"^ *\* *\((\w+)\) (.+)"), "level-2", r"(\1)", r"\2"),
+    # '— This is some text'
+    (re.compile(r"^— (.+)"), "level-3", "-", r"\1"),
+    # '* This is some text'
+    (re.compile(r"^\* ([^\d.]+)"), "text", r"\1", ""),
+    # '###Note###'
+    (re.compile(r"^#{2,3} ?([\w ]+)#{2,3} ?"), "heading", r"\1", ""),
+    (re.compile(r"^(Subheading note|Additional notes)"), "heading", r"\1", ""),
+]
+
+NOTE_ITEM_HTML = (
+    '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__{0}">'
+    "<span>{1}</span><span>{2}</span></div>"
+)
+
+
+def _render_note_item(rules, item):
+    for pattern, modifier, label, text in rules:
+        match = pattern.match(item)
+        if match:
+            return NOTE_ITEM_HTML.format(
+                modifier, match.expand(label), match.expand(text)
+            )
+
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def parse_chapter_note(chapter_note):
+    """
+    Renders the note of a chapter, lines not matching any rule are left out
+    The items are memoised against the note so they are only rendered again when the tts
+    content of the chapter changes, they are shared by every caller so mustn't be modified
+    :param chapter_note: string
+    :return: tuple of html strings
+    """
+    chapter_notes = []
+    for item in chapter_note.split("\r\n"):
+        note_item = _render_note_item(CHAPTER_NOTE_RULES, item)
+        if note_item is not None:
+            chapter_notes.append(note_item)
+
+    return tuple(chapter_notes)
+
+
+@functools.lru_cache(maxsize=64)
+def parse_section_note(section_note):
+    """
+    Renders the note of a section, lines not matching any rule are shown as plain items
+    The items are shared by every section with the same note so mustn't be modified
+    :param section_note: string
+    :return: tuple of html strings
+    """
+    section_notes = []
+    for item in section_note.split("\r\n"):
+        if not item:
+            continue
+
+        note_item = _render_note_item(SECTION_NOTE_RULES, item)
+        if note_item is None:
+            note_item = NOTE_ITEM_HTML.format("level-2", "", item)
+        section_notes.append(note_item)
+
+    return tuple(section_notes)
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from flags.models import FlagState
+
+from .models import invalidate_detail_pages
+
+
+def _invalidate_detail_pages(**kwargs):
+    # flags change what the detail pages show, this is only visible to other connections
+    # once the transaction is committed
+    transaction.on_commit(invalidate_detail_pages)
+
+
+def connect_signals():
+    post_save.connect(_invalidate_detail_pages, sender=FlagState)
+    post_delete.connect(_invalidate_detail_pages, sender=FlagState)
@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from mixer.backend.django import mixer
+
+from hierarchy.clients import HierarchyClient
+from hierarchy.helpers import create_nomenclature_tree
+from hierarchy.models import DETAIL_PAGE_TREE_VERSION_CACHE_KEY, Section
+
+
+SECTION_NOTE = "1. Any reference in this section to a particular genus.\r\n"
+
+
+class BackfillSectionNotesTestCase(TestCase):
+    def setUp(self):
+        self.tree = create_nomenclature_tree("UK")
+
+        self.hierarchy_client = mock.Mock()
+        self.hierarchy_client.CommodityType = HierarchyClient.CommodityType
+        self.hierarchy_client.get_item_data.side_effect = lambda _, section_id: {
+            "data": {
+                "attributes": {
+                    "id": section_id,
+                    "section_note": SECTION_NOTE if section_id == 1 else None,
+                }
+            }
+        }
+
+        patcher = mock.patch(
+            "hierarchy.management.commands.backfill_section_notes.get_hierarchy_client",
+            return_value=self.hierarchy_client,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stores_missing_section_notes(self):
+        section = mixer.blend(
+            Section, section_id=1, section_note=None, nomenclature_tree=self.tree
+        )
+        section_without_note = mixer.blend(
+            Section, section_id=2, section_note=None, nomenclature_tree=self.tree
+        )
+        tree_version = cache.get(DETAIL_PAGE_TREE_VERSION_CACHE_KEY)
+
+        call_command("backfill_section_notes", "--region=UK")
+
+        section.refresh_from_db()
+        self.assertEqual(section.section_note, SECTION_NOTE)
+        self.assertEqual(len(section.section_notes), 1)
+        section_without_note.refresh_from_db()
+        self.assertEqual(section_without_note.section_note, "")
+        self.assertEqual(section_without_note.section_notes, ())
+
+        self.assertEqual(self.hierarchy_client.get_item_data.call_count, 2)
+        # the pages cached without the notes are dropped
+        self.assertNotEqual(cache.get(DETAIL_PAGE_TREE_VERSION_CACHE_KEY), tree_version)
+
+        # nothing left to fetch
+        call_command("backfill_section_notes", "--region=UK")
+        self.assertEqual(self.hierarchy_client.get_item_data.call_count, 2)
+
+    def test_skips_stored_section_notes(self):
+        section = mixer.blend(
+            Section, section_id=1, section_note="stored", nomenclature_tree=self.tree
+        )
+
+        call_command("backfill_section_notes", "--region=UK")
+
+        self.hierarchy_client.get_item_data.assert_not_called()
+        section.refresh_from_db()
+        self.assertEqual(section.section_note, "stored")
+
+    def test_skips_failed_sections(self):
+        section = mixer.blend(
+            Section, section_id=1, section_note=None, nomenclature_tree=self.tree
+        )
+        self.hierarchy_client.get_item_data.side_effect = HierarchyClient.ServerError
+
+        call_command("backfill_section_notes", "--region=UK")
+
+        section.refresh_from_db()
+        self.assertIsNone(section.section_note)
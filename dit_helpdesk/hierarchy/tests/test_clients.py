@@ -0,0 +1,110 @@
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests_mock
+
+from django.test import TestCase, override_settings
+
+from hierarchy import clients
+from hierarchy.clients import (
+    HierarchyClient,
+    JSONObjClient,
+    get_session,
+    get_session_stats,
+)
+
+
+class TariffAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    status_codes = []
+
+    def do_GET(self):
+        status_code = self.status_codes.pop(0) if self.status_codes else 200
+        body = b'{"data": []}'
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(
+    TRADE_TARIFF_API_POOL_SIZE=2,
+    TRADE_TARIFF_API_RETRIES=2,
+    TRADE_TARIFF_API_BACKOFF_FACTOR=0,
+)
+class SessionTestCase(TestCase):
+    def setUp(self):
+        clients._sessions.clear()
+        self.addCleanup(clients._sessions.clear)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), TariffAPIHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        TariffAPIHandler.status_codes = []
+
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def test_session_is_shared(self):
+        self.assertIs(get_session(), get_session())
+
+    def test_session_per_process(self):
+        session = get_session()
+
+        with mock.patch("hierarchy.clients.os.getpid", return_value=-1):
+            self.assertIsNot(get_session(), session)
+
+    def test_connections_are_reused(self):
+        json_obj_client = JSONObjClient(self.base_url)
+        hierarchy_client = HierarchyClient(self.base_url)
+
+        for _ in range(3):
+            json_obj_client.get_content(JSONObjClient.CommodityType.CHAPTER, "01")
+            hierarchy_client.get_item_data(HierarchyClient.CommodityType.CHAPTER, "01")
+
+        self.assertEqual(
+            get_session_stats(), {"requests": 6, "connections": 1, "reused": 5}
+        )
+
+    def test_retries_server_errors(self):
+        TariffAPIHandler.status_codes = [503, 500]
+        client = JSONObjClient(self.base_url)
+
+        content = client.get_content(JSONObjClient.CommodityType.CHAPTER, "01")
+
+        self.assertEqual(content, '{"data": []}')
+        self.assertEqual(get_session_stats()["requests"], 3)
+
+    def test_raises_server_error_when_retries_exhausted(self):
+        TariffAPIHandler.status_codes = [500, 500, 500]
+        client = HierarchyClient(self.base_url)
+
+        with self.assertRaises(HierarchyClient.ServerError):
+            client.get_type_data(HierarchyClient.CommodityType.SECTION)
+
+    def test_does_not_retry_not_found(self):
+        TariffAPIHandler.status_codes = [404]
+        client = JSONObjClient(self.base_url)
+
+        with self.assertRaises(JSONObjClient.NotFound):
+            client.get_content(JSONObjClient.CommodityType.CHAPTER, "01")
+
+        self.assertEqual(get_session_stats()["requests"], 1)
+
+    @requests_mock.Mocker()
+    def test_passes_auth_and_params(self, mocked_requests):
+        mocked_requests.get(f"{self.base_url}chapters/01", text="{}")
+        client = JSONObjClient(self.base_url, auth=("user", "pass"), params={"a": "b"})
+
+        client.get_content(JSONObjClient.CommodityType.CHAPTER, "01")
+
+        request = mocked_requests.request_history[0]
+        self.assertEqual(request.qs, {"a": ["b"]})
+        self.assertIn("Authorization", request.headers)
+        self.assertEqual(request.timeout, JSONObjClient.TIMEOUT)
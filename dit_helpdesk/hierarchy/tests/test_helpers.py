@@ -7,6 +7,8 @@ from commodities.models import Commodity
 from datetime import datetime, timedelta
 
 from ..helpers import (
+    build_ancestor_paths,
+    build_hierarchy_contexts,
     create_nomenclature_tree,
     permute_code_hierarchy,
     delete_outdated_trees,
@@ -85,3 +87,178 @@ class DeleteOutdatedTreesTestCase(TestCase):
         # Check the tree table is missing the self.outdated trees
         self.assertNotIn(self.outdated_uk_tree, trees_table_contents)
         self.assertNotIn(self.outdated_eu_tree, trees_table_contents)
+
+
+class BuildAncestorPathsTestCase(TestCase):
+    def setUp(self):
+        self.tree = create_nomenclature_tree("UK")
+        self.section = mixer.blend(Section, nomenclature_tree=self.tree)
+        self.chapter = mixer.blend(
+            Chapter,
+            nomenclature_tree=self.tree,
+            section=self.section,
+            chapter_code="1200000000",
+        )
+        self.heading = mixer.blend(
+            Heading,
+            nomenclature_tree=self.tree,
+            chapter=self.chapter,
+            heading_code="1234000000",
+        )
+        self.sub_heading_1 = mixer.blend(
+            SubHeading,
+            nomenclature_tree=self.tree,
+            heading=self.heading,
+            commodity_code="1234560000",
+        )
+        self.sub_heading_2 = mixer.blend(
+            SubHeading,
+            nomenclature_tree=self.tree,
+            parent_subheading=self.sub_heading_1,
+            commodity_code="1234567800",
+        )
+        self.commodity = mixer.blend(
+            Commodity,
+            nomenclature_tree=self.tree,
+            parent_subheading=self.sub_heading_2,
+            commodity_code="1234567890",
+        )
+
+    def refresh(self, obj):
+        return obj.__class__.objects.get(pk=obj.pk)
+
+    def test_build_ancestor_paths(self):
+        build_ancestor_paths(self.tree)
+
+        section_token = f"section-{self.section.pk}"
+        chapter_token = f"chapter-{self.chapter.pk}"
+        heading_token = f"heading-{self.heading.pk}"
+        sub_heading_1_token = f"sub_heading-{self.sub_heading_1.pk}"
+        sub_heading_2_token = f"sub_heading-{self.sub_heading_2.pk}"
+
+        self.assertEqual(self.refresh(self.section).ancestor_path, "")
+        self.assertEqual(self.refresh(self.chapter).ancestor_path, section_token)
+        self.assertEqual(
+            self.refresh(self.heading).ancestor_path,
+            f"{section_token}/{chapter_token}",
+        )
+        self.assertEqual(
+            self.refresh(self.sub_heading_1).ancestor_path,
+            f"{section_token}/{chapter_token}/{heading_token}",
+        )
+        self.assertEqual(
+            self.refresh(self.sub_heading_2).ancestor_path,
+            f"{section_token}/{chapter_token}/{heading_token}/{sub_heading_1_token}",
+        )
+        self.assertEqual(
+            self.refresh(self.commodity).ancestor_path,
+            f"{section_token}/{chapter_token}/{heading_token}/{sub_heading_1_token}/"
+            f"{sub_heading_2_token}",
+        )
+
+    def test_get_ancestors(self):
+        expected_ancestors = [
+            self.section,
+            self.chapter,
+            self.heading,
+            self.sub_heading_1,
+            self.sub_heading_2,
+        ]
+        self.assertEqual(
+            self.refresh(self.commodity).get_ancestors(), expected_ancestors
+        )
+
+        build_ancestor_paths(self.tree)
+        commodity = self.refresh(self.commodity)
+
+        # one query per type of ancestor
+        with self.assertNumQueries(4):
+            self.assertEqual(commodity.get_ancestors(), expected_ancestors)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(commodity.get_heading(), self.heading)
+            self.assertEqual(commodity.get_depth(), 6)
+
+    def test_output_unchanged_with_ancestor_paths(self):
+        commodity_path = self.refresh(self.commodity).get_path()
+        commodity_ancestor_data = self.refresh(self.commodity).get_ancestor_data()
+        sub_heading_path = self.refresh(self.sub_heading_2).get_path()
+        heading_path = self.refresh(self.heading).get_path()
+
+        build_ancestor_paths(self.tree)
+
+        self.assertEqual(self.refresh(self.commodity).get_path(), commodity_path)
+        self.assertEqual(
+            self.refresh(self.commodity).get_ancestor_data(), commodity_ancestor_data
+        )
+        self.assertEqual(self.refresh(self.sub_heading_2).get_path(), sub_heading_path)
+        self.assertEqual(self.refresh(self.heading).get_path(), heading_path)
+
+
+class BuildHierarchyContextsTestCase(TestCase):
+    def setUp(self):
+        self.tree = create_nomenclature_tree("UK")
+        self.section = mixer.blend(Section, nomenclature_tree=self.tree)
+        self.chapter = mixer.blend(
+            Chapter,
+            nomenclature_tree=self.tree,
+            section=self.section,
+            chapter_code="1200000000",
+        )
+        self.heading = mixer.blend(
+            Heading,
+            nomenclature_tree=self.tree,
+            chapter=self.chapter,
+            heading_code="1234000000",
+        )
+        self.sub_heading = mixer.blend(
+            SubHeading,
+            nomenclature_tree=self.tree,
+            heading=self.heading,
+            commodity_code="1234560000",
+        )
+        self.commodities = [
+            mixer.blend(
+                Commodity,
+                nomenclature_tree=self.tree,
+                parent_subheading=self.sub_heading,
+                commodity_code=f"12345600{i}0",
+            )
+            for i in range(3)
+        ]
+        self.objects = [
+            self.section,
+            self.chapter,
+            self.heading,
+            self.sub_heading,
+        ] + self.commodities
+
+    def refresh(self, obj):
+        return obj.__class__.objects.get(pk=obj.pk)
+
+    def test_build_hierarchy_contexts(self):
+        expected_contexts = [
+            self.refresh(obj).build_hierarchy_context() for obj in self.objects
+        ]
+
+        build_ancestor_paths(self.tree)
+        # a select and an update per model, the siblings of the commodities once and an
+        # update per batch of commodities
+        with self.assertNumQueries(13):
+            build_hierarchy_contexts(self.tree, batch_size=2)
+
+        for obj, expected_context in zip(self.objects, expected_contexts):
+            obj = self.refresh(obj)
+            self.assertEqual(obj.hierarchy_context, expected_context)
+            with self.assertNumQueries(0):
+                self.assertEqual(obj.ancestor_data, expected_context)
+
+    def test_ancestor_data_without_hierarchy_context(self):
+        commodity = self.refresh(self.commodities[0])
+
+        self.assertIsNone(commodity.hierarchy_context)
+        self.assertEqual(commodity.ancestor_data, commodity.build_hierarchy_context())
+        self.assertEqual(
+            commodity.get_hierarchy_context_ids(),
+            (self.chapter.pk, self.heading.pk, self.sub_heading.pk, commodity.pk),
+        )
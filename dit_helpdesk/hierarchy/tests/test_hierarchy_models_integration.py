@@ -51,7 +51,7 @@ class HierarchyModelsTestCase(TestCase):
         self.chapter = create_instance(
             get_data(settings.CHAPTER_STRUCTURE, self.tree), "hierarchy", "Chapter"
         )
-        self.chapter.section_id = self.chapter.pk
+        self.chapter.section_id = self.section.pk
         self.chapter.save()
 
         self.heading = create_instance(
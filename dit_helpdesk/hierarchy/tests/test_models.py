@@ -1,9 +1,18 @@
+import datetime as dt
 import logging
+
+from unittest import mock
+
+import requests_mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
 from django.urls import NoReverseMatch
 from mixer.backend.django import mixer
 from commodities.models import Commodity
-from hierarchy.models import SubHeading, Heading, Section, Chapter
+from hierarchy.clients import JSONObjClient
+from hierarchy.models import SubHeading, Heading, Section, Chapter, get_tts_stats
 from hierarchy.helpers import create_nomenclature_tree
 
 logger = logging.getLogger(__name__)
@@ -100,6 +109,33 @@ class SectionTestCase(TestCase):
         )
         self.assertEquals(self.section.chapter_range_str, "1 to 5")
 
+    def test_section_notes_without_note(self):
+        self.section.section_note = None
+        self.assertEqual(self.section.section_notes, ())
+
+    @requests_mock.Mocker()
+    def test_section_notes(self, mocked_requests):
+        self.section.section_note = (
+            "* 1\\. Any reference to a particular genus.\r\n"
+            "##Subheading note##\r\n"
+            "* (A) A subheading item\r\n"
+        )
+
+        self.assertEqual(
+            self.section.section_notes,
+            (
+                '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-1">'
+                "<span>1.</span><span>Any reference to a particular genus.</span></div>",
+                '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__heading">'
+                "<span>Subheading note</span><span></span></div>",
+                '<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__level-2">'
+                "<span>(A)</span><span>A subheading item</span></div>",
+            ),
+        )
+        # parsed once for every section with the same note
+        self.assertIs(self.section.section_notes, self.section.section_notes)
+        self.assertFalse(mocked_requests.called)
+
 
 class ChapterTestCase(TestCase):
 
@@ -392,3 +428,159 @@ class SubHeadingTestCase(TestCase):
 
     def test_get_hierarchy_children_returns_list_of_child_items(self):
         self.assertTrue(self.subheading.get_hierarchy_children())
+
+
+class TTSContentRefreshTestCase(TestCase):
+
+    """
+    Test refreshing the tts content of hierarchy models
+    """
+
+    def setUp(self):
+        cache.clear()
+
+        self.tree = create_nomenclature_tree("UK")
+        self.chapter = mixer.blend(
+            Chapter, chapter_code="0100000000", nomenclature_tree=self.tree
+        )
+
+        self.tts_client = mock.Mock()
+        self.tts_client.NotFound = JSONObjClient.NotFound
+        self.tts_client.get_content.return_value = '{"new": true}'
+        patcher = mock.patch(
+            "hierarchy.models.NomenclatureTree.get_tts_api_client",
+            return_value=self.tts_client,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # run background refreshes straight away
+        patcher = mock.patch(
+            "hierarchy.models.tts_refresh_executor.submit",
+            side_effect=lambda fn, *args: fn(*args),
+        )
+        self.mock_submit = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_stale(self):
+        self.chapter.tts_json = '{"new": false}'
+        self.chapter.save_cache()
+        cache.set(
+            self.chapter._get_updated_at_cache_key(),
+            (timezone.now() - dt.timedelta(days=2)).isoformat(),
+        )
+
+    def test_fetches_missing_content_straight_away(self):
+        self.chapter.refresh_tts_content()
+
+        self.mock_submit.assert_not_called()
+        self.assertEqual(self.chapter.tts_json, '{"new": true}')
+
+    def test_does_not_refresh_fresh_content(self):
+        self.chapter.tts_json = '{"new": false}'
+        self.chapter.save_cache()
+
+        self.chapter.refresh_tts_content()
+
+        self.tts_client.get_content.assert_not_called()
+        self.assertEqual(self.chapter.tts_json, '{"new": false}')
+
+    def test_refreshes_stale_content_in_background(self):
+        self.make_stale()
+
+        self.chapter.refresh_tts_content()
+
+        self.mock_submit.assert_called_once()
+        # the current instance keeps the content it has already fetched
+        self.assertEqual(self.chapter.tts_json, '{"new": false}')
+        chapter = Chapter.objects.get(pk=self.chapter.pk)
+        self.assertEqual(chapter.tts_json, '{"new": true}')
+        self.assertFalse(chapter.should_update_tts_content())
+        self.assertIsNone(cache.get(self.chapter._get_refresh_lock_cache_key()))
+
+    def test_serves_stale_content_while_refreshing(self):
+        self.make_stale()
+        self.mock_submit.side_effect = None
+
+        self.chapter.refresh_tts_content()
+
+        self.mock_submit.assert_called_once()
+        self.assertEqual(self.chapter.tts_json, '{"new": false}')
+
+    def test_only_one_refresh_per_object(self):
+        self.make_stale()
+        self.mock_submit.side_effect = None
+
+        self.chapter.refresh_tts_content()
+        Chapter.objects.get(pk=self.chapter.pk).refresh_tts_content()
+
+        self.mock_submit.assert_called_once()
+
+    def test_failed_refresh_keeps_lock(self):
+        self.make_stale()
+        self.tts_client.get_content.side_effect = Exception("API down")
+
+        self.chapter.refresh_tts_content()
+        self.chapter.refresh_tts_content()
+
+        self.mock_submit.assert_called_once()
+        self.assertEqual(self.chapter.tts_json, '{"new": false}')
+
+
+class TTSObjTestCase(TestCase):
+
+    """
+    Test the decoded tts content of hierarchy models
+    """
+
+    def setUp(self):
+        cache.clear()
+
+        self.tree = create_nomenclature_tree("UK")
+        self.heading = mixer.blend(
+            Heading, heading_code="0101000000", nomenclature_tree=self.tree
+        )
+        self.heading.tts_json = '{"footnotes": ["a"]}'
+        self.heading.save_cache()
+
+    def get_stats_diff(self, stats):
+        new_stats = get_tts_stats()
+        return {key: new_stats[key] - stats[key] for key in stats}
+
+    def test_fetched_and_decoded_once(self):
+        heading = Heading.objects.get(pk=self.heading.pk)
+        stats = get_tts_stats()
+
+        tts_obj = heading.tts_obj
+        self.assertIs(heading.tts_obj, tts_obj)
+        self.assertEqual(heading.tts_obj.footnotes, ["a"])
+        heading.tts_json
+
+        self.assertEqual(self.get_stats_diff(stats), {"fetches": 1, "decodes": 1})
+
+    def test_decoded_again_when_content_changes(self):
+        stats = get_tts_stats()
+
+        self.assertEqual(self.heading.tts_obj.footnotes, ["a"])
+        self.heading.tts_json = '{"footnotes": ["b"]}'
+        self.assertEqual(self.heading.tts_obj.footnotes, ["b"])
+        self.heading.save_cache()
+        self.assertEqual(self.heading.tts_obj.footnotes, ["b"])
+
+        self.assertEqual(self.get_stats_diff(stats), {"fetches": 0, "decodes": 2})
+
+    def test_missing_content_fetched_again(self):
+        cache.clear()
+        heading = Heading.objects.get(pk=self.heading.pk)
+        stats = get_tts_stats()
+
+        self.assertIsNone(heading.tts_json)
+        self.assertIsNone(heading.tts_json)
+
+        self.assertEqual(self.get_stats_diff(stats), {"fetches": 2, "decodes": 0})
+
+    def test_section_has_no_tts_obj(self):
+        section = mixer.blend(Section, nomenclature_tree=self.tree)
+
+        with self.assertRaises(NotImplementedError):
+            section.tts_obj
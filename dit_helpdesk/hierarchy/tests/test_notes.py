@@ -0,0 +1,77 @@
+from django.test import TestCase
+
+from hierarchy.notes import parse_chapter_note, parse_section_note
+
+
+def note_item(modifier, label, text):
+    return (
+        f'<div class="helpdesk-chapter-note-item helpdesk-chapter-note-item__{modifier}">'
+        f"<span>{label}</span><span>{text}</span></div>"
+    )
+
+
+class ParseChapterNoteTestCase(TestCase):
+    def test_parse_chapter_note(self):
+        chapter_note = "\r\n".join(
+            [
+                "##Chapter notes##",
+                "* 1\\. This chapter does not cover:",
+                "  * (a) fish;",
+                "    * \\- live fish",
+                "* This is some text",
+                "not matching any rule",
+                "* 10\\. not matching either",
+            ]
+        )
+
+        self.assertEqual(
+            parse_chapter_note(chapter_note),
+            (
+                note_item("heading", "Chapter notes", ""),
+                note_item("level-1", "1.", "This chapter does not cover:"),
+                note_item("level-2", "(a)", "fish;"),
+                note_item("level-3", "-", "live fish"),
+                note_item("text", "This is some text", ""),
+            ),
+        )
+
+    def test_parse_chapter_note_is_memoised(self):
+        chapter_note = "* 1\\. Some text"
+
+        self.assertIs(
+            parse_chapter_note(chapter_note), parse_chapter_note(chapter_note)
+        )
+
+    def test_parse_chapter_note_empty(self):
+        self.assertEqual(parse_chapter_note(""), ())
+
+
+class ParseSectionNoteTestCase(TestCase):
+    def test_parse_section_note(self):
+        section_note = "\r\n".join(
+            [
+                "###Notes###",
+                "2.A.",
+                "* 1\\. Any reference to a genus",
+                "12.Some text",
+                "* (B) Some other text",
+                "— A dashed item",
+                "Subheading note",
+                "",
+                "not matching any rule",
+            ]
+        )
+
+        self.assertEqual(
+            parse_section_note(section_note),
+            (
+                note_item("heading", "Notes", ""),
+                note_item("level-1", "2.A.", ""),
+                note_item("level-1", "1.", "Any reference to a genus"),
+                note_item("level-1", "12.", "Some text"),
+                note_item("level-2", "(B)", "Some other text"),
+                note_item("level-3", "-", "A dashed item"),
+                note_item("heading", "Subheading note", ""),
+                note_item("level-2", "", "not matching any rule"),
+            ),
+        )
@@ -0,0 +1,94 @@
+import json
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from mixer.backend.django import mixer
+
+from commodities.models import Commodity
+from hierarchy.clients import JSONObjClient
+from hierarchy.helpers import create_nomenclature_tree
+from hierarchy.models import Chapter, Heading, Section
+
+
+class PrefetchTTSContentTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.tree = create_nomenclature_tree("UK")
+        self.section = mixer.blend(Section, nomenclature_tree=self.tree)
+        self.chapter = mixer.blend(
+            Chapter,
+            chapter_code="0100000000",
+            section=self.section,
+            nomenclature_tree=self.tree,
+        )
+        self.heading = mixer.blend(
+            Heading,
+            heading_code="0101000000",
+            chapter=self.chapter,
+            nomenclature_tree=self.tree,
+        )
+        self.commodity = mixer.blend(
+            Commodity,
+            commodity_code="0101210000",
+            heading=self.heading,
+            nomenclature_tree=self.tree,
+        )
+
+        self.tts_client = mock.Mock()
+        self.tts_client.NotFound = JSONObjClient.NotFound
+        self.tts_client.CommodityType = JSONObjClient.CommodityType
+        self.tts_client.get_content.return_value = json.dumps({"import_measures": []})
+
+        patcher = mock.patch(
+            "hierarchy.models.NomenclatureTree.get_tts_api_client",
+            return_value=self.tts_client,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_prefetches_content_for_active_tree(self):
+        call_command("prefetch_tts_content", "--region=UK")
+
+        self.assertEqual(self.tts_client.get_content.call_count, 3)
+        for obj in [self.chapter, self.heading, self.commodity]:
+            obj = obj.__class__.objects.get(pk=obj.pk)
+            self.assertFalse(obj.should_update_tts_content())
+
+    def test_skips_fresh_content(self):
+        self.heading.tts_json = json.dumps({"import_measures": []})
+        self.heading.save_cache()
+
+        call_command("prefetch_tts_content", "--region=UK")
+
+        self.assertEqual(self.tts_client.get_content.call_count, 2)
+        self.tts_client.get_content.assert_any_call(
+            JSONObjClient.CommodityType.CHAPTER, "01"
+        )
+        self.tts_client.get_content.assert_any_call(
+            JSONObjClient.CommodityType.COMMODITY, "0101210000"
+        )
+
+    def test_force_refetches_fresh_content(self):
+        self.heading.tts_json = json.dumps({"import_measures": []})
+        self.heading.save_cache()
+
+        call_command("prefetch_tts_content", "--region=UK", "--force")
+
+        self.assertEqual(self.tts_client.get_content.call_count, 3)
+
+    def test_carries_on_after_server_error(self):
+        self.tts_client.get_content.side_effect = [
+            JSONObjClient.ServerError("Server error"),
+            json.dumps({"import_measures": []}),
+            json.dumps({"import_measures": []}),
+        ]
+
+        call_command("prefetch_tts_content", "--region=UK", "--workers=1")
+
+        self.assertEqual(self.tts_client.get_content.call_count, 3)
+        self.assertTrue(self.chapter.should_update_tts_content())
+        self.assertFalse(self.commodity.should_update_tts_content())
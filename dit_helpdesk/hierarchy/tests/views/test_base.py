@@ -3,13 +3,17 @@ from unittest import mock
 from mixer.backend.django import mixer
 
 from core.testutils import mock_tts_and_section_responses
+from django.core.cache import cache
 from django.test import modify_settings, override_settings, TestCase
 from django.urls import reverse
+from django.utils import timezone
+from flags.models import FlagState
 
 from countries.models import Country
+from regulations.models import RegulationGroup
 
 from ...helpers import create_nomenclature_tree, TABLE_COLUMN_TITLES
-from ...models import Chapter, Heading, Section
+from ...models import TTS_CONTENT_MAX_AGE, Chapter, Heading, Section
 from ...views.base import (
     BaseCommodityObjectDetailView,
     BaseSectionedCommodityObjectDetailView,
@@ -270,6 +274,8 @@ class BaseSectionedCommodityObjectDetailViewTestCase(TestCase):
             leaf=True,
         )
 
+        cache.clear()
+
         mock_get_commodity_object_path = mock.patch.object(
             TestBaseSectionedCommodityObjectDetailView,
             "get_commodity_object_path",
@@ -366,3 +372,115 @@ class BaseSectionedCommodityObjectDetailViewTestCase(TestCase):
 
         self.assertNotIn("section_modals_not_show_me", modals)
         self.assertNotIn("section_modals_not_show_me", modals)
+
+    @mock_tts_and_section_responses
+    @override_settings(DETAIL_PAGE_CACHE_TIMEOUT=60)
+    def test_page_cached(self):
+        response = self.client.get(self.get_url())
+        self.assertIsNotNone(response.context)
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.get_url())
+
+        self.assertEqual(cached_response.status_code, 200)
+        # nothing was rendered
+        self.assertIsNone(cached_response.context)
+        self.assertEqual(cached_response.content, response.content)
+
+        country = Country.objects.exclude(pk=self.country.pk).first()
+        response = self.client.get(self.get_url(country_code=country.country_code))
+        self.assertIsNotNone(response.context)
+
+    @mock_tts_and_section_responses
+    @override_settings(DETAIL_PAGE_CACHE_TIMEOUT=60)
+    def test_page_not_cached_for_unknown_country(self):
+        with mock.patch("hierarchy.views.base.messages.error"):
+            self.client.get(self.get_url(country_code="XT"))
+
+        Country.objects.create(country_code="XT", name="Test country")
+        response = self.client.get(self.get_url(country_code="XT"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.context)
+
+    @mock_tts_and_section_responses
+    @override_settings(DETAIL_PAGE_CACHE_TIMEOUT=60)
+    def test_page_cache_invalidated_on_save_cache(self):
+        self.client.get(self.get_url())
+
+        self.chapter.tts_json = "{}"
+        self.chapter.save_cache()
+
+        response = self.client.get(self.get_url())
+        self.assertIsNotNone(response.context)
+
+    @mock_tts_and_section_responses
+    @override_settings(DETAIL_PAGE_CACHE_TIMEOUT=60)
+    def test_page_cache_invalidated_on_tree_activation(self):
+        self.client.get(self.get_url())
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.chapter.nomenclature_tree.save()
+
+            # not until the new tree is visible to other requests
+            response = self.client.get(self.get_url())
+            self.assertIsNone(response.context)
+
+        self.assertEqual(len(callbacks), 1)
+
+        response = self.client.get(self.get_url())
+        self.assertIsNotNone(response.context)
+
+    @mock_tts_and_section_responses
+    @override_settings(DETAIL_PAGE_CACHE_TIMEOUT=60)
+    def test_page_cache_refreshes_stale_tts_content(self):
+        self.client.get(self.get_url())
+
+        with mock.patch.object(
+            Chapter, "refresh_tts_content"
+        ) as mock_refresh_tts_content:
+            response = self.client.get(self.get_url())
+            mock_refresh_tts_content.assert_not_called()
+
+            with mock.patch("hierarchy.views.base.timezone") as mock_timezone:
+                mock_timezone.now.return_value = timezone.now() + TTS_CONTENT_MAX_AGE
+                stale_response = self.client.get(self.get_url())
+            mock_refresh_tts_content.assert_called_once_with()
+
+        # still served from the cache until the refresh is done
+        self.assertIsNone(stale_response.context)
+        self.assertEqual(stale_response.content, response.content)
+
+    @mock_tts_and_section_responses
+    @override_settings(DETAIL_PAGE_CACHE_TIMEOUT=60)
+    def test_page_cache_invalidated_on_regulation_change(self):
+        self.client.get(self.get_url())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            regulation_group = mixer.blend(RegulationGroup)
+        response = self.client.get(self.get_url())
+        self.assertIsNotNone(response.context)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            regulation_group.chapters.add(self.chapter)
+        response = self.client.get(self.get_url())
+        self.assertIsNotNone(response.context)
+
+    @mock_tts_and_section_responses
+    @override_settings(DETAIL_PAGE_CACHE_TIMEOUT=60)
+    def test_page_cache_invalidated_on_flag_change(self):
+        self.client.get(self.get_url())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FlagState.objects.create(
+                name="EU_FALLBACK", condition="boolean", value="True"
+            )
+        response = self.client.get(self.get_url())
+        self.assertIsNotNone(response.context)
+
+    @mock_tts_and_section_responses
+    def test_page_not_cached_when_disabled(self):
+        self.client.get(self.get_url())
+
+        response = self.client.get(self.get_url())
+        self.assertIsNotNone(response.context)
@@ -588,11 +588,13 @@ class RulesOfOriginSectionTestCase(BaseSectionTestCase):
         rules = self.rules_document.rule_set.all()
         relevant_footnotes = [self.footnote]
         with mock.patch(
-            "hierarchy.views.sections.get_rules_of_origin"
-        ) as mock_get_rules_of_origin, mock.patch(
+            "hierarchy.views.sections.get_rules_of_origin_by_document"
+        ) as mock_get_rules_of_origin_by_document, mock.patch(
             "hierarchy.views.sections.process_footnotes"
         ) as mock_process_footnotes:
-            mock_get_rules_of_origin.return_value = rules
+            mock_get_rules_of_origin_by_document.return_value = {
+                self.rules_document.pk: rules
+            }
             mock_process_footnotes.return_value = relevant_footnotes
             response = self.client.get(self.get_url())
 
@@ -602,6 +604,43 @@ class RulesOfOriginSectionTestCase(BaseSectionTestCase):
             [(self.rules_document, rules, relevant_footnotes, self.introductory_note)],
         )
 
+    def test_rules_of_origin_fixed_number_of_queries(self):
+        section = RulesOfOriginSection(self.country, self.commodity)
+        with self.assertNumQueries(4):
+            section.get_rules_of_origin(self.country.country_code, "0101000000")
+
+        other_rules_document = mixer.blend(
+            RulesDocument,
+            countries=[self.country],
+        )
+        other_rule = mixer.blend(
+            Rule,
+            is_exclusion=False,
+            rules_document=other_rules_document,
+            hs_from="01",
+            hs_to=None,
+        )
+        mixer.blend(SubRule, rule=other_rule)
+        mixer.blend(RulesDocumentFootnote, rules_document=other_rules_document)
+
+        with self.assertNumQueries(4):
+            rules_of_origin = section.get_rules_of_origin(
+                self.country.country_code, "0101000000"
+            )
+
+        with self.assertNumQueries(0):
+            for _, rules, _, _ in rules_of_origin:
+                for rule in rules:
+                    list(rule.subrules.all())
+
+    def test_rules_of_origin_query_count(self):
+        response = self.client.get(self.get_url())
+        self.assertNotIn("rules_of_origin_query_count", response.context)
+
+        with override_settings(DEBUG=True):
+            response = self.client.get(self.get_url())
+        self.assertEqual(response.context["rules_of_origin_query_count"], 4)
+
     def test_country_specific_rules_of_origin_template(self):
         response = self.client.get(self.get_url())
         country_specific_rules_of_origin_template = response.context[
@@ -5,7 +5,11 @@ from .base import (
     BaseCommodityObjectDetailView,
     BaseSectionedCommodityObjectDetailView,
 )
-from .helpers import _commodity_code_html
+from .helpers import (
+    BLANK_COMMODITY_CODE_HTML,
+    _commodity_code_html,
+    _format_commodity_code_html,
+)
 from .sections import (
     BaseOtherMeasuresNorthernIrelandSection,
     BaseTariffsAndTaxesNorthernIrelandSection,
@@ -1,12 +1,17 @@
+from django.conf import settings
 from django.contrib import messages
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import Http404
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
+from django.template.response import SimpleTemplateResponse
+from django.utils import timezone
 from django.views.generic import TemplateView
 
 from countries.models import Country
 
 from ..helpers import get_eu_commodity_link, TABLE_COLUMN_TITLES
+from ..models import get_detail_page_versions
 
 from .exceptions import Redirect
 from .helpers import get_hierarchy_context, sentry_emit_commodity_not_found
@@ -32,6 +37,9 @@ class BaseCommodityObjectDetailView(GetCommodityObjectMixin, TemplateView):
     context_object_name = None
 
     def initialise(self, request, *args, **kwargs):
+        # the objects whose tts content is shown on the page
+        self.tts_content_objects = []
+
         country_code = kwargs["country_code"]
         try:
             self.country = Country.objects.get(country_code=country_code.upper())
@@ -52,8 +60,19 @@ class BaseCommodityObjectDetailView(GetCommodityObjectMixin, TemplateView):
         self.update_commodity_object_tts_content(self.commodity_object)
 
     def update_commodity_object_tts_content(self, commodity_object):
-        if commodity_object.should_update_tts_content():
-            commodity_object.update_tts_content()
+        commodity_object.refresh_tts_content()
+        self.tts_content_objects.append(commodity_object)
+
+    def get_tts_content_stale_at(self):
+        """
+        Returns when the tts content shown on the page first becomes stale
+        :return: datetime, None if some of the content has never been fetched
+        """
+        stale_at = [obj.get_tts_content_stale_at() for obj in self.tts_content_objects]
+        if not stale_at or None in stale_at:
+            return None
+
+        return min(stale_at)
 
     def get(self, request, *args, **kwargs):
         try:
@@ -132,6 +151,60 @@ class BaseSectionedCommodityObjectDetailView(BaseCommodityObjectDetailView):
             "Add property `sections` as a list of `CommodityDetailSection` classes"
         )
 
+    def get_page_cache_key(self, **kwargs):
+        """
+        Returns the cache key of the rendered page, it changes when a new tree is activated,
+        regulations or flags change or the tts content of the object is refreshed so those
+        never serve a stale page
+        :return: string
+        """
+        commodity_code = kwargs["commodity_code"]
+        nomenclature_sid = kwargs["nomenclature_sid"]
+        tree_version, object_version = get_detail_page_versions(
+            self.model, commodity_code, nomenclature_sid
+        )
+
+        return (
+            f"detail_page__{self.__class__.__name__}_{commodity_code}_"
+            f"{nomenclature_sid}_{kwargs['country_code'].upper()}_"
+            f"{tree_version}_{object_version}"
+        )
+
+    def get(self, request, *args, **kwargs):
+        timeout = settings.DETAIL_PAGE_CACHE_TIMEOUT
+        if not timeout:
+            return super().get(request, *args, **kwargs)
+
+        cached_page = cache.get(self.get_page_cache_key(**kwargs))
+        if cached_page is not None:
+            content, tts_content_stale_at = cached_page
+
+            # stale tts content is still refreshed, the page is dropped once the refresh
+            # is done, see `save_cache`
+            if tts_content_stale_at is None or tts_content_stale_at <= timezone.now():
+                try:
+                    self.initialise(request, *args, **kwargs)
+                except Redirect as r:
+                    return r.redirect_to
+
+            return HttpResponse(content)
+
+        response = super().get(request, *args, **kwargs)
+
+        # redirects for unknown countries aren't cached
+        if isinstance(response, SimpleTemplateResponse):
+            # the key is taken again as content fetched for the first time while
+            # initialising the view changes the version of the object
+            page_cache_key = self.get_page_cache_key(**kwargs)
+            tts_content_stale_at = self.get_tts_content_stale_at()
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    page_cache_key, (response.content, tts_content_stale_at), timeout
+                )
+            )
+
+        return response
+
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
 
@@ -184,8 +257,7 @@ class BaseMeasureConditionDetailView(GetCommodityObjectMixin, TemplateView):
             )
             raise Http404
 
-        if self.commodity_object.should_update_tts_content():
-            self.commodity_object.update_tts_content()
+        self.commodity_object.refresh_tts_content()
 
         measure_id = int(kwargs["measure_id"])
         self.import_measure = self.commodity_object.tts_obj.get_import_measure_by_id(
@@ -259,8 +331,7 @@ class BaseMeasureQuotaDetailView(GetCommodityObjectMixin, TemplateView):
             )
             raise Http404
 
-        if self.commodity_object.should_update_tts_content():
-            self.commodity_object.update_tts_content()
+        self.commodity_object.refresh_tts_content()
 
         measure_id = int(kwargs["measure_id"])
         self.import_measure = self.commodity_object.tts_obj.get_import_measure_by_id(
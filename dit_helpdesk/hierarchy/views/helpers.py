@@ -6,6 +6,12 @@ from commodities.models import Commodity
 from ..models import Chapter, Heading, SubHeading
 
 
+# shown instead of the code of a heading or subheading duplicated by one of its children
+BLANK_COMMODITY_CODE_HTML = (
+    '<span class="app-commodity-code app-hierarchy-tree__commodity-code">&nbsp;</span>'
+)
+
+
 def hierarchy_section_header(reversed_heading_tree):
     """
     View helper function to extract the Section Numeral and title for the hierarchy context of the heading
@@ -58,10 +64,10 @@ def _commodity_code_html(item, ignore_duplicate=True):
 
     if ignore_duplicate:
         if isinstance(item, SubHeading) and item.is_duplicate_heading():
-            return '<span class="app-commodity-code app-hierarchy-tree__commodity-code">&nbsp;</span>'
+            return BLANK_COMMODITY_CODE_HTML
 
         if isinstance(item, Heading) and item.is_duplicate_heading():
-            return '<span class="app-commodity-code app-hierarchy-tree__commodity-code">&nbsp;</span>'
+            return BLANK_COMMODITY_CODE_HTML
 
     leaf = False
 
@@ -81,6 +87,17 @@ def _commodity_code_html(item, ignore_duplicate=True):
     ):
         leaf = True
 
+    return _format_commodity_code_html(code, leaf)
+
+
+def _format_commodity_code_html(code, leaf):
+    """
+    Formats a ten digit commodity code as html, the trailing zeros of a code are shown
+    greyed out unless it is a leaf
+    :param code: string
+    :param leaf: bool
+    :return: html
+    """
     commodity_code_html = (
         '<span class="app-commodity-code app-hierarchy-tree__commodity-code" '
         'aria-label="Commodity code">'
@@ -12,7 +12,6 @@ class EUCommodityObjectMixin:
             commodity_code=commodity_code, goods_nomenclature_sid=nomenclature_sid
         )
 
-        if eu_commodity_object.should_update_tts_content():
-            eu_commodity_object.update_tts_content()
+        eu_commodity_object.refresh_tts_content()
 
         return eu_commodity_object
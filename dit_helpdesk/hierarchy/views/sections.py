@@ -4,12 +4,14 @@ import logging
 from datetime import date
 
 from django.conf import settings
+from django.db import connection
+from django.db.models import Prefetch
 from django.template import engines
 from django.template.exceptions import TemplateDoesNotExist
 
 from regulations.models import RegulationGroup
 from rules_of_origin.hierarchy import (
-    get_rules_of_origin,
+    get_rules_of_origin_by_document,
     process_footnotes,
 )
 from rules_of_origin.models import RulesDocument, RulesDocumentFootnote
@@ -376,7 +378,7 @@ class RulesOfOriginSection(CommodityDetailSection):
         return [("Rules of origin", "rules_of_origin")]
 
     def get_rules_footnotes(self, rules_document, rules):
-        footnotes = rules_document.footnotes.order_by("id")
+        footnotes = rules_document.footnotes.all()
 
         relevant_footnotes = process_footnotes(rules, footnotes)
 
@@ -384,12 +386,11 @@ class RulesOfOriginSection(CommodityDetailSection):
 
     def get_rules_introductory_notes(self, rules_document, footnotes):
         # get introductory notes
-        try:
-            introductory_notes = footnotes.get(
-                identifier="COMM",
-            )
-        except RulesDocumentFootnote.DoesNotExist:
-            introductory_notes = None
+        introductory_notes = next(
+            (footnote for footnote in footnotes if footnote.identifier == "COMM"),
+            None,
+        )
+        if introductory_notes is None:
             logger.error("Could not find introductory notes for %s", rules_document)
 
         return introductory_notes
@@ -400,14 +401,24 @@ class RulesOfOriginSection(CommodityDetailSection):
                 "FR"  # pick one of the EU countries, the RoO are the same for all
             )
 
-        rules_documents = RulesDocument.objects.filter(
-            countries__country_code=country_code,
-            start_date__lte=date.today(),
+        rules_documents = list(
+            RulesDocument.objects.filter(
+                countries__country_code=country_code,
+                start_date__lte=date.today(),
+            ).prefetch_related(
+                Prefetch(
+                    "footnotes",
+                    queryset=RulesDocumentFootnote.objects.order_by("id"),
+                )
+            )
+        )
+        rules_by_document = get_rules_of_origin_by_document(
+            rules_documents, commodity_code
         )
 
         rules_of_origin = []
         for rules_document in rules_documents:
-            rules = get_rules_of_origin(rules_document, commodity_code)
+            rules = rules_by_document[rules_document.pk]
             footnotes, relevant_footnotes = self.get_rules_footnotes(
                 rules_document, rules
             )
@@ -434,9 +445,16 @@ class RulesOfOriginSection(CommodityDetailSection):
     def get_context_data(self):
         ctx = super().get_context_data()
 
+        # the queries are only logged in debug so the count can be checked on the page
+        if settings.DEBUG:
+            initial_query_count = len(connection.queries_log)
         ctx["rules_of_origin"] = self.get_rules_of_origin(
             self.country.country_code, self.commodity_object.commodity_code
         )
+        if settings.DEBUG:
+            ctx["rules_of_origin_query_count"] = (
+                len(connection.queries_log) - initial_query_count
+            )
         ctx["country_name"] = self.country.name
         if self.country.scenario in settings.SCENARIOS_WITH_UK_TRADE_AGREEMENT:
             ctx["display_roo_update_notes"] = True
@@ -477,11 +495,13 @@ class ProductRegulationsSection(CommodityDetailSection):
     def __init__(self, country, commodity_object):
         super().__init__(country, commodity_object)
 
-        self.regulation_groups = RegulationGroup.objects.inherited(commodity_object)
+        self.regulation_groups = list(
+            RegulationGroup.objects.inherited(commodity_object).order_by("title")
+        )
 
     @property
     def should_be_displayed(self):
-        return self.regulation_groups.exists()
+        return bool(self.regulation_groups)
 
     def get_menu_items(self):
         return [("Product-specific regulations", "regulations")]
@@ -489,7 +509,7 @@ class ProductRegulationsSection(CommodityDetailSection):
     def get_context_data(self):
         ctx = super().get_context_data()
 
-        ctx["regulation_groups"] = self.regulation_groups.order_by("title")
+        ctx["regulation_groups"] = self.regulation_groups
 
         return ctx
 
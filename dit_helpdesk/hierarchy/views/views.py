@@ -113,8 +113,7 @@ class HeadingDetailNorthernIrelandView(BaseSectionedHeadingDetailView):
             goods_nomenclature_sid=self.commodity_object.goods_nomenclature_sid,
         )
 
-        if eu_commodity_object.should_update_tts_content():
-            eu_commodity_object.update_tts_content()
+        self.update_commodity_object_tts_content(eu_commodity_object)
 
 
 class BaseSectionedSubHeadingDetailView(BaseSectionedCommodityObjectDetailView):
@@ -172,8 +171,7 @@ class SubHeadingDetailNorthernIrelandView(BaseSectionedSubHeadingDetailView):
             goods_nomenclature_sid=self.commodity_object.goods_nomenclature_sid,
         )
 
-        if eu_commodity_object.should_update_tts_content():
-            eu_commodity_object.update_tts_content()
+        self.update_commodity_object_tts_content(eu_commodity_object)
 
 
 class MeasureConditionDetailView(BaseMeasureConditionDetailView):
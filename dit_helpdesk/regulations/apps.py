@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class RegulationsConfig(AppConfig):
     name = "regulations"
+
+    def ready(self):
+        from .signals import connect_signals
+
+        connect_signals()
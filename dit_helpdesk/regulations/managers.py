@@ -1,4 +1,9 @@
+from collections import defaultdict
+
 from django.db import models
+from django.db.models import Q
+
+from hierarchy.models import ANCESTOR_MODELS, parse_ancestor_path
 
 
 class RegulationGroupManager(models.Manager):
@@ -8,6 +13,9 @@ class RegulationGroupManager(models.Manager):
         The commodity object will get all of its ancestor regulation groups returned
         as well as its own regulations groups.
 
+        The groups are resolved in a single query over the ancestors of the object, taken
+        from its ancestor path when it has been built.
+
         Example:
                             Heading A - <RegulationGroup: A>
                                         |
@@ -24,13 +32,35 @@ class RegulationGroupManager(models.Manager):
             > RegulationGroup.object.inherited(<Commodity B>)
             <Queryset: [RegulationGroup A]>
         """
-        regulation_groups = commodity_object.regulationgroup_set.all()
+        ancestors = [(type(commodity_object), commodity_object.pk)]
+        if commodity_object.ancestor_path is not None:
+            ancestors += [
+                (ANCESTOR_MODELS[hierarchy_type], pk)
+                for hierarchy_type, pk in parse_ancestor_path(
+                    commodity_object.ancestor_path
+                )
+            ]
+        else:
+            parent = commodity_object.get_parent()
+            while parent:
+                ancestors.append((type(parent), parent.pk))
+                parent = parent.get_parent()
+
+        pks_by_model = defaultdict(list)
+        for model, pk in ancestors:
+            pks_by_model[model].append(pk)
 
-        parent = commodity_object.get_parent()
-        if not parent:
-            return regulation_groups
+        # a subquery per relation rather than joining them all, so the groups aren't
+        # duplicated
+        inherited_filter = Q()
+        for field in self.model._meta.many_to_many:
+            pks = pks_by_model.get(field.related_model)
+            if not pks:
+                continue
 
-        parent_regulation_groups = self.inherited(commodity_object.get_parent())
-        regulation_groups = regulation_groups.union(parent_regulation_groups)
+            related_group_ids = field.remote_field.through.objects.filter(
+                **{f"{field.m2m_reverse_field_name()}__in": pks}
+            ).values(field.m2m_field_name())
+            inherited_filter |= Q(pk__in=related_group_ids)
 
-        return regulation_groups
+        return self.filter(inherited_filter)
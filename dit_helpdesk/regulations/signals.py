@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from hierarchy.models import invalidate_detail_pages
+
+from .models import Regulation, RegulationGroup
+
+
+def _invalidate_detail_pages(**kwargs):
+    # regulations are shown on the detail pages of the objects they are linked to, this is
+    # only visible to other connections once the transaction is committed
+    transaction.on_commit(invalidate_detail_pages)
+
+
+def connect_signals():
+    for model in [RegulationGroup, Regulation]:
+        post_save.connect(_invalidate_detail_pages, sender=model)
+        post_delete.connect(_invalidate_detail_pages, sender=model)
+
+    for field in [
+        RegulationGroup.nomenclature_trees,
+        RegulationGroup.sections,
+        RegulationGroup.chapters,
+        RegulationGroup.headings,
+        RegulationGroup.subheadings,
+        RegulationGroup.commodities,
+        Regulation.nomenclature_trees,
+        Regulation.regulation_groups,
+    ]:
+        m2m_changed.connect(_invalidate_detail_pages, sender=field.through)
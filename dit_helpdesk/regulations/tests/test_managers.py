@@ -4,7 +4,7 @@ from django.test import TestCase
 
 from commodities.models import Commodity
 from hierarchy.models import Chapter, Section, Heading, SubHeading
-from hierarchy.helpers import create_nomenclature_tree
+from hierarchy.helpers import build_ancestor_paths, create_nomenclature_tree
 
 from ..models import RegulationGroup
 
@@ -149,6 +149,29 @@ class InheritedRegulationGroupsTestCase(TestCase):
         section_regulation_groups = RegulationGroup.objects.inherited(section)
         self.assertEqual(set(section_regulation_groups), set([regulation]))
 
+    def test_inherited_from_ancestor_path_in_single_query(self):
+        section = self.mixer.blend(Section)
+        section_regulation = self.mixer.blend(RegulationGroup, sections=section)
+        chapter = self.mixer.blend(Chapter, section=section)
+        heading = self.mixer.blend(Heading, chapter=chapter)
+        heading_regulation = self.mixer.blend(RegulationGroup, headings=heading)
+        sub_heading = self.mixer.blend(SubHeading, heading=heading)
+        commodity = self.mixer.blend(Commodity, parent_subheading=sub_heading)
+        commodity_regulation = self.mixer.blend(RegulationGroup, commodities=commodity)
+        self.mixer.blend(RegulationGroup, commodities=self.mixer.blend(Commodity))
+
+        build_ancestor_paths(self.tree)
+        commodity.refresh_from_db()
+
+        with self.assertNumQueries(1):
+            commodity_regulation_groups = list(
+                RegulationGroup.objects.inherited(commodity)
+            )
+        self.assertCountEqual(
+            commodity_regulation_groups,
+            [section_regulation, heading_regulation, commodity_regulation],
+        )
+
     def get_model_multi_level_hierarchy_multiple_regulation_groups(self):
         section = self.mixer.blend(Section)
         section_regulation = self.mixer.blend(RegulationGroup, sections=section)
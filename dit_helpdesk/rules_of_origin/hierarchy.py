@@ -1,41 +1,22 @@
 import logging
 
-from django.db.models import BigIntegerField, Case, IntegerField, Value, When
-from django.db.models.functions import Cast, RPad
+from django.db.models import Q
 
 from rules_of_origin.footnote_processor import FootnoteReferenceProcessor
 
 from core.helpers import chunks, unique
 
-from .models import RulesDocumentFootnote
+from .models import Rule, RulesDocumentFootnote, normalise_commodity_code
 
 
 logger = logging.getLogger(__name__)
 
 
-MAX_COMMODITY_CODE_DIGITS = 12
-
-
-def _normalised_code(commodity_code):
-    return commodity_code.replace(".", "").ljust(MAX_COMMODITY_CODE_DIGITS, "0")
-
-
 def _get_hierarchy_codes(commodity_code):
     current_code = ""
     for chunk in chunks(commodity_code, 2):
         current_code += chunk
-        yield _normalised_code(current_code)
-
-
-def _normalise_commodity_code_field(field_name):
-    return Cast(
-        RPad(
-            field_name,
-            MAX_COMMODITY_CODE_DIGITS,
-            Value("0"),
-        ),
-        output_field=BigIntegerField(),
-    )
+        yield normalise_commodity_code(current_code)
 
 
 def _process_rule_references(rule, footnote_processor):
@@ -91,57 +72,74 @@ def process_footnotes(rules, notes):
     return [note for _, note in filtered_notes]
 
 
-def get_rules_of_origin(rules_document, commodity_code):
-    potential_rules = rules_document.rule_set.annotate(
-        normalised_hs_from=_normalise_commodity_code_field("hs_from"),
-        normalised_hs_to=_normalise_commodity_code_field("hs_to"),
-    )
-    applied_rules = rules_document.rule_set.none()
-
-    for hierarchy_code in unique(_get_hierarchy_codes(commodity_code)):
-        hierarchy_rules = potential_rules.filter(
-            hs_to__isnull=True,
-            normalised_hs_from=int(hierarchy_code),
-        )
-        applied_rules = applied_rules.union(hierarchy_rules)
+def _get_applied_rules_filter(commodity_code):
+    normalised_code = normalise_commodity_code(commodity_code)
+    hierarchy_codes = list(unique(_get_hierarchy_codes(commodity_code)))
 
-    applied_rules = applied_rules.union(
-        potential_rules.filter(
+    return (
+        Q(hs_to__isnull=True, normalised_hs_from__in=hierarchy_codes)
+        | Q(
             hs_to__isnull=False,
-            normalised_hs_from__lte=int(_normalised_code(commodity_code)),
-            normalised_hs_to__gte=int(_normalised_code(commodity_code)),
+            normalised_hs_from__lte=normalised_code,
+            normalised_hs_to__gte=normalised_code,
         )
+        | Q(hs_to__isnull=False, normalised_hs_to__in=hierarchy_codes)
     )
 
-    for hierarchy_code in unique(_get_hierarchy_codes(commodity_code)):
-        hierarchy_rules = potential_rules.filter(
-            hs_to__isnull=False,
-            normalised_hs_to=int(hierarchy_code),
-        )
-        applied_rules = applied_rules.union(hierarchy_rules)
 
-    applied_rules = rules_document.rule_set.filter(
-        pk__in=applied_rules.values_list("pk")
-    ).annotate(
-        normalised_hs_from=_normalise_commodity_code_field("hs_from"),
-        normalised_hs_to=_normalise_commodity_code_field("hs_to"),
-        is_leading_rule=Case(
-            When(rule_text__isnull=True, then=Value(1, output_field=IntegerField())),
-            default=Value(0, output_field=IntegerField()),
-        ),
+def _filter_most_specific_rules(applied_rules):
+    non_extract_rules = [rule for rule in applied_rules if not rule.is_exclusion]
+    if not non_extract_rules:
+        return applied_rules
+
+    # leading rules (without rule text of their own) take precedence over the most
+    # specific rule
+    most_specific_non_extract_rule = max(
+        non_extract_rules,
+        key=lambda rule: (rule.rule_text is None, rule.normalised_hs_from),
     )
-    most_specific_non_extract_rule = (
-        applied_rules.filter(is_exclusion=False)
-        .order_by("-is_leading_rule", "-normalised_hs_from")
-        .first()
+    return [
+        rule
+        for rule in applied_rules
+        if rule.normalised_hs_from >= most_specific_non_extract_rule.normalised_hs_from
+    ]
+
+
+def get_rules_of_origin(rules_document, commodity_code):
+    """
+    Resolves the rules of a rules document applying to a commodity code in a single query
+    against the normalised hs codes of the rules
+    :param rules_document: RulesDocument instance
+    :param commodity_code: string
+    :return: list of Rule instances ordered by their hs code
+    """
+    applied_rules = rules_document.rule_set.filter(
+        _get_applied_rules_filter(commodity_code)
+    ).order_by("hs_from")
+
+    return _filter_most_specific_rules(list(applied_rules))
+
+
+def get_rules_of_origin_by_document(rules_documents, commodity_code):
+    """
+    Resolves the rules of several rules documents applying to a commodity code, the rules of
+    all the documents are fetched together with their subrules in a fixed number of queries
+    :param rules_documents: list of RulesDocument instances
+    :param commodity_code: string
+    :return: dict of lists of Rule instances ordered by their hs code keyed by document id
+    """
+    applied_rules = (
+        Rule.objects.filter(rules_document__in=rules_documents)
+        .filter(_get_applied_rules_filter(commodity_code))
+        .prefetch_related("subrules")
+        .order_by("hs_from")
     )
-    if most_specific_non_extract_rule:
-        applied_rules = applied_rules.filter(
-            normalised_hs_from__gte=int(
-                _normalised_code(most_specific_non_extract_rule.hs_from)
-            )
-        )
 
-    applied_rules = applied_rules.order_by("hs_from")
+    rules_by_document = {rules_document.pk: [] for rules_document in rules_documents}
+    for rule in applied_rules:
+        rules_by_document[rule.rules_document_id].append(rule)
 
-    return applied_rules
+    return {
+        rules_document_id: _filter_most_specific_rules(rules)
+        for rules_document_id, rules in rules_by_document.items()
+    }
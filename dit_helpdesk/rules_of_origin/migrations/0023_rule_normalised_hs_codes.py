@@ -0,0 +1,64 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:21
+import django_migration_linter as linter
+
+from django.db import migrations, models
+
+
+def _normalise_code(code):
+    if code is None:
+        return None
+
+    code = code.replace(".", "")
+    if not code.isdigit():
+        return None
+
+    return int(code.ljust(12, "0"))
+
+
+def populate_normalised_hs_codes(apps, schema_editor):
+    Rule = apps.get_model("rules_of_origin", "Rule")
+
+    rules = list(Rule.objects.only("hs_from", "hs_to"))
+    for rule in rules:
+        rule.normalised_hs_from = _normalise_code(rule.hs_from)
+        rule.normalised_hs_to = _normalise_code(rule.hs_to)
+
+    Rule.objects.bulk_update(
+        rules, ["normalised_hs_from", "normalised_hs_to"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rules_of_origin", "0022_auto_20211230_1541"),
+    ]
+
+    operations = [
+        linter.IgnoreMigration(),
+        migrations.AddField(
+            model_name="rule",
+            name="normalised_hs_from",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="rule",
+            name="normalised_hs_to",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="rule",
+            index=models.Index(
+                fields=["rules_document", "normalised_hs_from"],
+                name="rules_of_or_rules_d_75c2ae_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rule",
+            index=models.Index(
+                fields=["rules_document", "normalised_hs_to"],
+                name="rules_of_or_rules_d_61adac_idx",
+            ),
+        ),
+        migrations.RunPython(populate_normalised_hs_codes, migrations.RunPython.noop),
+    ]
@@ -25,6 +25,25 @@ class RulesDocument(models.Model):
 
 
 MAX_RULES_CODE_DIGITS = 6
+MAX_COMMODITY_CODE_DIGITS = 12
+
+
+def normalise_commodity_code(commodity_code):
+    """
+    Pads a code to the length of the longest commodity code so codes of different lengths
+    can be compared as numbers, e.g. `0102` becomes `10200000000`
+    Anything that isn't a code can't be matched against a commodity code so isn't normalised
+    :param commodity_code: string or None
+    :return: int or None
+    """
+    if commodity_code is None:
+        return None
+
+    commodity_code = commodity_code.replace(".", "")
+    if not commodity_code.isdigit():
+        return None
+
+    return int(commodity_code.ljust(MAX_COMMODITY_CODE_DIGITS, "0"))
 
 
 class Rule(models.Model):
@@ -44,13 +63,27 @@ class Rule(models.Model):
     hs_from_type = models.CharField(null=True, max_length=2)
     hs_to = models.CharField(null=True, max_length=MAX_RULES_CODE_DIGITS)
     hs_to_type = models.CharField(null=True, max_length=2)
+    # `hs_from` and `hs_to` as comparable numbers, kept in sync on save so rules can be
+    # matched against a commodity code with an index
+    normalised_hs_from = models.BigIntegerField(null=True)
+    normalised_hs_to = models.BigIntegerField(null=True)
 
     class Meta:
         verbose_name_plural = "rules of origin"
+        indexes = [
+            models.Index(fields=["rules_document", "normalised_hs_from"]),
+            models.Index(fields=["rules_document", "normalised_hs_to"]),
+        ]
 
     def __str__(self):
         return f"{self.rules_document} - {self.code}"
 
+    def save(self, *args, **kwargs):
+        self.normalised_hs_from = normalise_commodity_code(self.hs_from)
+        self.normalised_hs_to = normalise_commodity_code(self.hs_to)
+
+        super().save(*args, **kwargs)
+
     @property
     def num_rules(self):
         return 1 + self.subrules.count()
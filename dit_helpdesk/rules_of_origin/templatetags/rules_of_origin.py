@@ -7,7 +7,12 @@ from django import template
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 
-from hierarchy.models import Chapter, Heading, SubHeading
+from hierarchy.models import (
+    Chapter,
+    Heading,
+    SubHeading,
+    get_active_tree_version,
+)
 from commodities.models import Commodity
 
 
@@ -36,46 +41,70 @@ CODES_REGEX = re.compile(
 HS_LEN_MAPPING = {2: [Chapter], 4: [SubHeading, Heading], 6: [Commodity, SubHeading]}
 
 
+# The hierarchy objects HS codes in rule texts link to and their urls, loaded in bulk the
+# first time a code is looked up after a tree is activated, see `_get_hs_code_lookup`
+_hs_code_lookup = (object(), {}, {})
+
+
 class HierarchyModelNotFound(Exception):
     pass
 
 
-def _find_hierarchy_model(code):
-    models = HS_LEN_MAPPING[len(code)]
+def _load_hs_code_objects():
+    """
+    Loads the hierarchy objects of the active tree that HS codes can link to, keyed by their
+    HS code
+    Where several objects share a code the first model in `HS_LEN_MAPPING` wins and, for
+    the same model (usually differing by productline suffix), the one lowest in hierarchy
+    :return: dict of model instances
+    """
+    hs_code_objects = {}
+    for code_length, models in HS_LEN_MAPPING.items():
+        for model_class in models:
+            code_field = model_class.COMMODITY_CODE_FIELD
+            objs = (
+                model_class.objects.filter(
+                    **{f"{code_field}__endswith": "0" * (10 - code_length)}
+                )
+                .only(code_field, "goods_nomenclature_sid", "number_indents")
+                .order_by("-number_indents", "pk")
+            )
+            for obj in objs:
+                hs_code_objects.setdefault(obj.commodity_code[:code_length], obj)
 
-    code_norm = code.ljust(10, "0")
+    return hs_code_objects
 
-    for model_class in models:
-        try:
-            return model_class.objects.get_by_commodity_code(code_norm)
-        except model_class.DoesNotExist:
-            logger.warning(
-                "Couldn't find %s object for HS code %s", model_class, code_norm
-            )
-            continue
-        except model_class.MultipleObjectsReturned:
-            # if multiple objects with the same HS code (usually differing by productline suffix)
-            # choose the one lowest in hierarchy
-            objs = model_class.objects.filter_by_commodity_code(code_norm).order_by(
-                "-number_indents"
-            )
-            return objs.first()
 
-    raise HierarchyModelNotFound()
+def _get_hs_code_lookup():
+    global _hs_code_lookup
 
+    # bumped every time a tree is activated, see `NomenclatureTree.save`
+    tree_version = get_active_tree_version()
+    if _hs_code_lookup[0] != tree_version:
+        _hs_code_lookup = (tree_version, _load_hs_code_objects(), {})
 
-def _replace_hs_code(country_code, code_match):
-    full_code = code_match.group()
-    code = next(code for code in code_match.groups() if code)
-    code_stripped = code.replace(".", "").strip()
+    return _hs_code_lookup[1:]
 
-    if len(code) == 1:
-        code_stripped = f"0{code_stripped}"
+
+def _get_hs_code_urls(code, country_code):
+    """
+    Returns the urls an HS code links to, memoised until the next tree is activated
+    :param code: string
+    :param country_code: string
+    :return: tuple of the detail url and the hierarchy context url
+    """
+    hs_code_objects, hs_code_urls = _get_hs_code_lookup()
 
     try:
-        obj = _find_hierarchy_model(code_stripped)
-    except HierarchyModelNotFound:
-        return full_code
+        return hs_code_urls[code, country_code]
+    except KeyError:
+        pass
+
+    try:
+        obj = hs_code_objects[code]
+    except KeyError:
+        logger.warning("Couldn't find object for HS code %s", code)
+        raise HierarchyModelNotFound()
 
     detail_url = obj.get_detail_url(country_code)
     hierarchy_context_url = reverse(
@@ -87,6 +116,26 @@ def _replace_hs_code(country_code, code_match):
             "country_code": country_code.lower(),
         },
     )
+    hs_code_urls[code, country_code] = detail_url, hierarchy_context_url
+
+    return detail_url, hierarchy_context_url
+
+
+def _replace_hs_code(country_code, code_match):
+    full_code = code_match.group()
+    code = next(code for code in code_match.groups() if code)
+    code_stripped = code.replace(".", "").strip()
+
+    if len(code) == 1:
+        code_stripped = f"0{code_stripped}"
+
+    try:
+        detail_url, hierarchy_context_url = _get_hs_code_urls(
+            code_stripped, country_code
+        )
+    except HierarchyModelNotFound:
+        return full_code
+
     url_element = (
         f'<a class="govuk-link hierarchy-modal" data-toggle="modal" data-target="hierarchy-modal" '
         f'data-href="{hierarchy_context_url}" href="{detail_url}">{code}</a>'
@@ -5,7 +5,11 @@ from mixer.backend.django import mixer
 
 from rules_of_origin.models import Rule, RulesDocument, RulesDocumentFootnote
 
-from rules_of_origin.hierarchy import get_rules_of_origin, process_footnotes
+from rules_of_origin.hierarchy import (
+    get_rules_of_origin,
+    get_rules_of_origin_by_document,
+    process_footnotes,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -487,6 +491,84 @@ class GetRulesOfOriginTestCase(TestCase):
         rules_of_origin = get_rules_of_origin(other_rules_document, "01")
         self.assertCountEqual(rules_of_origin, [other_rules_document_chapter_rule])
 
+    def test_rules_resolved_in_single_query(self):
+        rules_document = mixer.blend(RulesDocument)
+        chapter_rule = mixer.blend(
+            Rule,
+            hs_from="01",
+            hs_to=None,
+            is_exclusion=False,
+            rules_document=rules_document,
+            rule_text=mixer.RANDOM,
+        )
+        ranged_rule = mixer.blend(
+            Rule,
+            hs_from="0101",
+            hs_to="0103",
+            is_exclusion=True,
+            rules_document=rules_document,
+            rule_text=mixer.RANDOM,
+        )
+        mixer.blend(
+            Rule,
+            hs_from="0104",
+            hs_to="0106",
+            is_exclusion=True,
+            rules_document=rules_document,
+            rule_text=mixer.RANDOM,
+        )
+
+        with self.assertNumQueries(1):
+            rules_of_origin = get_rules_of_origin(rules_document, "010290")
+
+        self.assertEqual(rules_of_origin, [chapter_rule, ranged_rule])
+
+
+class GetRulesOfOriginByDocumentTestCase(TestCase):
+    def test_rules_by_document(self):
+        rules_document = mixer.blend(RulesDocument)
+        mixer.blend(
+            Rule,
+            hs_from="01",
+            hs_to=None,
+            is_exclusion=False,
+            rules_document=rules_document,
+            rule_text=mixer.RANDOM,
+        )
+        heading_rule = mixer.blend(
+            Rule,
+            hs_from="0102",
+            hs_to=None,
+            is_exclusion=False,
+            rules_document=rules_document,
+            rule_text=mixer.RANDOM,
+        )
+        other_rules_document = mixer.blend(RulesDocument)
+        other_chapter_rule = mixer.blend(
+            Rule,
+            hs_from="01",
+            hs_to=None,
+            is_exclusion=False,
+            rules_document=other_rules_document,
+            rule_text=mixer.RANDOM,
+        )
+        empty_rules_document = mixer.blend(RulesDocument)
+
+        with self.assertNumQueries(2):
+            rules_by_document = get_rules_of_origin_by_document(
+                [rules_document, other_rules_document, empty_rules_document],
+                "010290",
+            )
+
+        self.assertEqual(
+            rules_by_document,
+            {
+                rules_document.pk: [heading_rule],
+                other_rules_document.pk: [other_chapter_rule],
+                empty_rules_document.pk: [],
+            },
+        )
+
 
 class GetRulesFootnotes(TestCase):
     def test_process_footnotes_no_footnotes(self):
@@ -45,6 +45,19 @@ class RuleTestCase(TestCase):
             "RULES DOCUMENT DESCRIPTION - RULE CODE",
         )
 
+    def test_save_normalises_hs_codes(self):
+        rule = mixer.blend(Rule, hs_from="0102", hs_to="010599")
+
+        self.assertEqual(rule.normalised_hs_from, 10200000000)
+        self.assertEqual(rule.normalised_hs_to, 10599000000)
+
+        rule.hs_to = None
+        rule.save()
+        rule.refresh_from_db()
+
+        self.assertEqual(rule.normalised_hs_from, 10200000000)
+        self.assertIsNone(rule.normalised_hs_to)
+
 
 class RulesDocumentFootnoteTestCase(TestCase):
     """
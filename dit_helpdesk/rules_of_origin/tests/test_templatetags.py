@@ -8,10 +8,22 @@ from parameterized import parameterized
 from commodities.models import Commodity
 from countries.models import Country
 from hierarchy.helpers import create_nomenclature_tree
-from hierarchy.models import Chapter, Heading, SubHeading
+from hierarchy.models import (
+    Chapter,
+    Heading,
+    SubHeading,
+    invalidate_active_trees,
+    invalidate_detail_pages,
+)
 
 
 class LinkifyHsCodesTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        # the linked objects are only loaded again once a tree is activated
+        invalidate_active_trees()
+
     def render_linkify_hs_codes(self, value, country_code):
         template_string = f'{{% load rules_of_origin %}}{{{{value|linkify_hs_codes:"{country_code}"}}}}'
         template = Template(template_string)
@@ -622,6 +634,63 @@ class LinkifyHsCodesTestCase(TestCase):
         )
         self.assertEqual(result, f"Subheading {commodity_010101_link_element}")
 
+    def test_linked_objects_loaded_once_per_tree(self):
+        tree = create_nomenclature_tree("UK")
+        country = mixer.blend(Country, country_code="XX")
+        heading = mixer.blend(
+            Heading,
+            heading_code="0101000000",
+            goods_nomenclature_sid="0101",
+            nomenclature_tree=tree,
+        )
+        heading_link_element = self.get_link_element(
+            "0101", *self.get_object_urls("heading", heading, country)
+        )
+
+        with self.assertNumQueries(5):
+            result = self.render_linkify_hs_codes(
+                "Heading 0101",
+                country.country_code,
+            )
+        self.assertEqual(result, f"Heading {heading_link_element}")
+
+        with self.assertNumQueries(0):
+            result = self.render_linkify_hs_codes(
+                "Headings 0101 and 0202",
+                country.country_code,
+            )
+        self.assertEqual(result, f"Headings {heading_link_element} and 0202")
+
+        other_heading = mixer.blend(
+            Heading,
+            heading_code="0202000000",
+            goods_nomenclature_sid="0202",
+            nomenclature_tree=tree,
+        )
+        other_heading_link_element = self.get_link_element(
+            "0202", *self.get_object_urls("heading", other_heading, country)
+        )
+
+        # regulation and flag changes don't load the linked objects again
+        invalidate_detail_pages()
+        with self.assertNumQueries(0):
+            result = self.render_linkify_hs_codes(
+                "Headings 0101 and 0202",
+                country.country_code,
+            )
+        self.assertEqual(result, f"Headings {heading_link_element} and 0202")
+
+        invalidate_active_trees()
+
+        result = self.render_linkify_hs_codes(
+            "Headings 0101 and 0202",
+            country.country_code,
+        )
+        self.assertEqual(
+            result,
+            f"Headings {heading_link_element} and {other_heading_link_element}",
+        )
+
 
 class AnnotateAbbreviations(TestCase):
     def render_annotate_abbreviations(self, value):
@@ -0,0 +1,88 @@
+"""
+Loads the NLTK corpora used to generate the search keywords from `NLTK_DATA_PATH`, they are
+downloaded ahead of time with the `download_nltk_corpora` command so generating the keywords
+never needs the network
+"""
+import functools
+import os
+
+import nltk
+from django.conf import settings
+from nltk.corpus import stopwords, wordnet
+
+
+# The resource of each corpus as looked up by nltk
+CORPORA = {
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+    "omw-1.4": "corpora/omw-1.4",
+}
+
+WORDNET_CORPORA = ["wordnet", "omw-1.4"]
+
+
+class CorpusNotFound(Exception):
+    pass
+
+
+def _use_data_path():
+    if settings.NLTK_DATA_PATH not in nltk.data.path:
+        nltk.data.path.insert(0, settings.NLTK_DATA_PATH)
+
+
+@functools.lru_cache(maxsize=None)
+def ensure_corpus(name):
+    """
+    Checks a corpus is available locally, only once per process
+    :param name: key of `CORPORA`
+    """
+    _use_data_path()
+
+    try:
+        nltk.data.find(CORPORA[name])
+    except LookupError:
+        raise CorpusNotFound(
+            f"NLTK corpus {name} not found in {nltk.data.path}, "
+            "download it with `manage.py download_nltk_corpora`"
+        )
+
+
+def download_corpora():
+    """
+    Downloads the corpora missing from `NLTK_DATA_PATH`
+    :return: list of the names of the downloaded corpora
+    """
+    os.makedirs(settings.NLTK_DATA_PATH, exist_ok=True)
+
+    downloaded = []
+    for name, resource in CORPORA.items():
+        try:
+            nltk.data.find(resource, paths=[settings.NLTK_DATA_PATH])
+            continue
+        except LookupError:
+            pass
+
+        nltk.download(name, download_dir=settings.NLTK_DATA_PATH, raise_on_error=True)
+        downloaded.append(name)
+
+    return downloaded
+
+
+def get_stop_words():
+    """
+    :return: set of the english stop words
+    """
+    ensure_corpus("stopwords")
+
+    return set(stopwords.words("english"))
+
+
+def get_wordnet():
+    """
+    Returns the WordNet reader, which is only loaded on first use
+    :return: WordNetCorpusReader
+    """
+    for name in WORDNET_CORPORA:
+        ensure_corpus(name)
+
+    return wordnet
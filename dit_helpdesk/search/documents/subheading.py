@@ -1,8 +1,8 @@
 from django.conf import settings
-from django_elasticsearch_dsl import Document, Index, fields
+from django_elasticsearch_dsl import Index, fields
 
 from hierarchy.models import SubHeading
-from search.documents.util import html_strip
+from search.documents.util import HierarchyContextDocument, html_strip
 
 alias = settings.ELASTICSEARCH_INDEX_NAMES[__name__]
 INDEX = Index(alias)
@@ -12,7 +12,7 @@ INDEX.settings(number_of_shards=1, number_of_replicas=0)
 
 
 @INDEX.doc_type
-class SubHeadingDocument(Document):
+class SubHeadingDocument(HierarchyContextDocument):
     """
     SubHeading elasticsearch document
     """
@@ -30,8 +30,6 @@ class SubHeadingDocument(Document):
 
     keywords = fields.TextField(analyzer=html_strip)
 
-    hierarchy_context = fields.TextField(attr="ancestor_data")
-
     node_id = fields.TextField(attr="hierarchy_key")
 
     ranking = fields.IntegerField()
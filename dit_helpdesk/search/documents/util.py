@@ -1,3 +1,6 @@
+import json
+
+from django_elasticsearch_dsl import Document, fields
 from elasticsearch_dsl import analyzer
 
 html_strip = analyzer(
@@ -6,3 +9,17 @@ html_strip = analyzer(
     filter=["lowercase", "stop", "snowball", "asciifolding"],
     char_filter=["html_strip"],
 )
+
+
+class HierarchyContextDocument(Document):
+    """
+    Base document storing the hierarchy context of the indexed object
+    The field is declared on a document rather than a plain mixin so it's picked up in the
+    mapping of the documents inheriting it
+    """
+
+    # stored as is rather than JSON encoded so hits need no decoding, it isn't searched
+    hierarchy_context = fields.ObjectField(enabled=False)
+
+    def prepare_hierarchy_context(self, instance):
+        return json.loads(instance.ancestor_data)
@@ -1,6 +1,5 @@
 import logging
 import json
-import re
 
 from collections import defaultdict
 
@@ -11,15 +10,17 @@ from elasticsearch_dsl.response.hit import Hit
 from elasticsearch import Elasticsearch
 
 from django.conf import settings
+from django.db.models import Count, Exists, OuterRef
 
 from commodities.models import Commodity
-from hierarchy.models import Heading, Section, SubHeading, Chapter
-from hierarchy.views import _commodity_code_html
+from hierarchy.models import Heading, SubHeading, Chapter
+from hierarchy.views import BLANK_COMMODITY_CODE_HTML, _format_commodity_code_html
 
 from search.documents.chapter import INDEX as chapter_index
 from search.documents.heading import INDEX as heading_index
 from search.documents.subheading import INDEX as sub_heading_index
 from search.documents.commodity import INDEX as commodity_index
+from search.hierarchy_index import ROOT_KEY, get_hierarchy_index
 
 
 logger = logging.getLogger(__name__)
@@ -35,6 +36,10 @@ indices = [
 alias_names = [idx._name for idx in indices]
 
 
+# enough buckets to hold every heading of the nomenclature
+GROUP_AGGREGATION_SIZE = 10000
+
+
 class HierarchyIntegrityError(Exception):
     pass
 
@@ -62,6 +67,47 @@ def _build_search_request(query, sort_key, sort_order, filter_on_leaf=None):
     return request
 
 
+def _code_prefix_aggregation(length):
+    return {
+        "terms": {
+            "script": {
+                "source": "doc['commodity_code'].value.substring(0, params.length)",
+                "params": {"length": length},
+            },
+            "size": GROUP_AGGREGATION_SIZE,
+        }
+    }
+
+
+def _add_group_aggregations(request):
+    """Adds the aggregations needed by `get_group_result_count` to the search request, the hits
+    are bucketed by index and then by the codes of their chapter and heading
+    :param request: Search
+    """
+    indices_aggregation = request.aggs.bucket(
+        "indices", "terms", field="_index", size=len(alias_names)
+    )
+    indices_aggregation.bucket("chapters", _code_prefix_aggregation(2))
+    indices_aggregation.bucket("headings", _code_prefix_aggregation(4))
+
+
+def get_group_result_count(aggregations):
+    """Returns the number of chapter and heading groups `group_search_by_term` would sort all of
+    the hits of a search into
+    :param aggregations: aggregations of a response to a request from `_add_group_aggregations`
+    :return: int
+    """
+    chapter_codes = set()
+    heading_codes = set()
+
+    for bucket in aggregations.indices.buckets:
+        chapter_codes.update(code.key for code in bucket.chapters.buckets)
+        if bucket.key.split("-")[0] != "chapter":
+            heading_codes.update(code.key for code in bucket.headings.buckets)
+
+    return len(chapter_codes) + len(heading_codes)
+
+
 def _choose_max_score(prev_score, new_score):
     return max(prev_score, new_score)
 
@@ -74,6 +120,18 @@ def _no_score(prev_score, new_score):
     return 0
 
 
+def _load_hierarchy_context(hit):
+    """
+    Loads the hierarchy context of a hit in place, it's indexed as an object but hits from
+    indexes built before it was are still JSON encoded
+    :param hit: Hit
+    :raises KeyError: if the hit has no hierarchy context
+    """
+    hierarchy_context = hit["hierarchy_context"]
+    if isinstance(hierarchy_context, (bytes, str)):
+        hit["hierarchy_context"] = json.loads(hierarchy_context)
+
+
 def group_hits_by_chapter_heading(hits, score_strategy=_no_score):
 
     hits_by_chapter_heading = defaultdict(lambda: defaultdict(list))
@@ -96,9 +154,7 @@ def group_hits_by_chapter_heading(hits, score_strategy=_no_score):
             continue
 
         try:
-            hierarchy_context = hit["hierarchy_context"]
-            if isinstance(hierarchy_context, (bytes, str)):
-                hit["hierarchy_context"] = json.loads(hierarchy_context)
+            _load_hierarchy_context(hit)
         except KeyError as exception:
             logger.warning(
                 "%s has no hierarchy context: %s", commodity_code, exception.args
@@ -151,18 +207,18 @@ def search_by_term(form_data=None, page_size=None):
     page_size = page_size or settings.RESULTS_PER_PAGE
     end = start + page_size
 
-    total_results = len(list(request.scan()))
+    request = request[start:end].extra(track_total_hits=True)
+    _add_group_aggregations(request)
+
+    hits = request.execute()
+
+    total_results = hits.hits.total.value
     total_full_pages = int(total_results / settings.RESULTS_PER_PAGE)
     orphan_results = total_results % settings.RESULTS_PER_PAGE
-    total = request.count()
-    request = request[0:total]
-
-    hits = request[start:end].execute()
-    all_hits = request[0:total].execute()
 
     for hit in hits:
         try:
-            hit["hierarchy_context"] = json.loads(hit["hierarchy_context"])
+            _load_hierarchy_context(hit)
         except KeyError as exception:
             logger.info("{0} {1}".format(hit["commodity_code"], exception.args))
 
@@ -172,7 +228,7 @@ def search_by_term(form_data=None, page_size=None):
 
     return {
         "results": hits,
-        "_all_results": all_hits,
+        "group_result_count": get_group_result_count(hits.aggregations),
         "page_range_start": page_range_start,
         "page_range_end": page_range_end,
         "total_pages": total_pages,
@@ -197,10 +253,8 @@ def group_search_by_term(form_data=None, page_size=None, hits=None):
             filter_on_leaf=True if form_data.get("toggle_headings") == "1" else False,
         )
 
-        total_results = len(list(request.scan()))
-        total = request.count()
-        request = request[0:total]
-        hits = request.execute()
+        total_results = request.count()
+        hits = request[0:total_results].execute()
     else:
         total_results = len(hits)
 
@@ -244,7 +298,7 @@ def search_by_code(code):
     hits = Search().index(*alias_names).using(client).query(query_object)
     for hit in hits:
         try:
-            hit["hierarchy_context"] = json.loads(hit["hierarchy_context"])
+            _load_hierarchy_context(hit)
         except KeyError as exception:
             logger.info("{0} {1}".format(hit["commodity_code"], exception.args))
     return hits
@@ -330,6 +384,115 @@ def get_object_from_hit(hit: Hit) -> Union[Chapter, Heading, SubHeading, Commodi
     return model
 
 
+def _annotate_hierarchy_children(queryset):
+    """
+    Annotates the objects with their number of children and, for headings and subheadings,
+    whether one of their children duplicates them, see `get_commodity_code_html`
+    :param queryset: QuerySet of a hierarchy model
+    :return: QuerySet
+    """
+    model_class = queryset.model
+
+    if model_class is Chapter:
+        return queryset.annotate(hierarchy_children_count=Count("headings"))
+
+    if model_class in (Heading, SubHeading):
+        duplicate_children = SubHeading.objects.filter(
+            commodity_code=OuterRef(model_class.COMMODITY_CODE_FIELD),
+            leaf=False,
+            **{
+                "heading"
+                if model_class is Heading
+                else "parent_subheading": OuterRef("pk")
+            },
+        )
+
+        return queryset.annotate(
+            hierarchy_children_count=(
+                Count("child_subheadings", distinct=True)
+                + Count("children_concrete", distinct=True)
+            ),
+            has_duplicate_child=Exists(duplicate_children),
+        )
+
+    return queryset
+
+
+def get_commodity_code_html(obj, ignore_duplicate=True):
+    """
+    Returns the html of the code of an object annotated by `_annotate_hierarchy_children`,
+    the same as `_commodity_code_html` without querying the children of the object
+    :param obj: model instance
+    :param ignore_duplicate: bool whether duplicated headings and subheadings have no code
+    :return: html
+    """
+    if ignore_duplicate and getattr(obj, "has_duplicate_child", False):
+        return BLANK_COMMODITY_CODE_HTML
+
+    leaf = isinstance(obj, Commodity) or obj.hierarchy_children_count == 0
+
+    return _format_commodity_code_html(obj.commodity_code, leaf)
+
+
+def get_objects_from_hits(hits):
+    """
+    Returns the commodity objects related to the hits, loaded with a query per index rather
+    than a query per hit, see `get_object_from_hit`
+    The objects are annotated for `get_commodity_code_html`
+    :param hits: iterable of Hit
+    :return: list of model instances in the order of the hits, None where no object is found
+    """
+    hit_keys = [
+        (get_alias_from_hit(hit), str(hit.id), hit["commodity_code"]) for hit in hits
+    ]
+
+    sids_by_alias = defaultdict(set)
+    for alias, goods_nomenclature_sid, _ in hit_keys:
+        sids_by_alias[alias].add(goods_nomenclature_sid)
+
+    objects = {}
+    for alias, goods_nomenclature_sids in sids_by_alias.items():
+        model_class = INDEX_TO_MODEL_CLASS_MAP[alias]
+        objs = _annotate_hierarchy_children(
+            model_class.objects.filter(
+                goods_nomenclature_sid__in=goods_nomenclature_sids
+            )
+        ).order_by("pk")
+        for obj in objs:
+            objects.setdefault(
+                (alias, obj.goods_nomenclature_sid, obj.commodity_code), obj
+            )
+
+    return [objects.get(hit_key) for hit_key in hit_keys]
+
+
+def get_group_objects(chapter_codes, heading_codes):
+    """
+    Returns the chapters and headings the hits of a grouped search are sorted into, annotated
+    for `get_commodity_code_html`
+    :param chapter_codes: iterable of chapter codes
+    :param heading_codes: iterable of heading codes
+    :return: tuple of dicts of Chapter and Heading instances keyed by code
+    """
+    chapters = _annotate_hierarchy_children(
+        Chapter.objects.filter(chapter_code__in=chapter_codes)
+    )
+    headings = _annotate_hierarchy_children(
+        Heading.objects.filter(heading_code__in=heading_codes)
+    )
+
+    return (
+        {
+            chapter.chapter_code: chapter
+            for chapter in chapters.order_by("chapter_code")
+        },
+        {
+            heading.heading_code: heading
+            for heading in headings.order_by("heading_code")
+        },
+    )
+
+
 def normalise_commodity_code(code: str) -> str:
     """
     Normalises a string which is a candidate for a commodity code.
@@ -340,7 +503,7 @@ def normalise_commodity_code(code: str) -> str:
     return code
 
 
-def _get_expanded_context(selected_node_id):
+def _get_expanded_context(selected_node_id, hierarchy_index):
     """
     Given a selected_node_id (a location in the hierarchy), return
     a list of hierarchy ids that make up the path to the currently expanded context.
@@ -348,136 +511,76 @@ def _get_expanded_context(selected_node_id):
     if selected_node_id == "root":
         return []
 
-    expanded = []
     node_type, node_pk = selected_node_id.split("-")
-
     if node_type == "section":
-        expanded.append(selected_node_id)
-
-    elif node_type == "chapter":
-        chapter_obj = Chapter.objects.get(goods_nomenclature_sid=node_pk)
-        expanded.append("section-{0}".format(chapter_obj.section.section_id))
-        expanded.append("chapter-{0}".format(node_pk))
+        return [selected_node_id]
 
-    elif node_type == "heading":
-        heading_obj = Heading.objects.get(goods_nomenclature_sid=node_pk)
-
-        expanded.append("section-{0}".format(heading_obj.chapter.section.section_id))
-        expanded.append(
-            "chapter-{0}".format(heading_obj.chapter.goods_nomenclature_sid)
-        )
-        expanded.append("heading-{0}".format(heading_obj.goods_nomenclature_sid))
-
-    elif node_type == "sub_heading":
-
-        current = SubHeading.objects.get(goods_nomenclature_sid=node_pk)
-        while True:
-            expanded.append("sub_heading-{0}".format(current.goods_nomenclature_sid))
-            current = current.get_parent()
-            if type(current) is Heading:
-                break
-        heading_obj = current
-
-        expanded.append("section-{0}".format(heading_obj.chapter.section.section_id))
-        expanded.append(
-            "chapter-{0}".format(heading_obj.chapter.goods_nomenclature_sid)
-        )
-        expanded.append("heading-{0}".format(heading_obj.goods_nomenclature_sid))
+    if node_type not in ("chapter", "heading", "sub_heading"):
+        return []
 
-    return expanded
+    return hierarchy_index.get_expanded_context(selected_node_id)
 
 
-def _get_hierarchy_level_html(node, expanded, origin_country):
+def _get_hierarchy_level_html(node, expanded, origin_country, hierarchy_index):
     """
     View helper function to return the html for the selected hierarchy node
     :param node: string or model instance the current node
     :param expanded: list of hierarchy ids that make up the currently expanded path
     :param origin_country: string representing the origin country code
+    :param hierarchy_index: HierarchyIndex of the active tree
     :return: html snippet that represents the expanded section of the hierarchy
     """
     if node == "root":  # if root it list only sections
-        children = (
-            Section.objects.all().order_by("section_id").prefetch_related("chapter_set")
-        )
-        html = '<ul class="app-hierarchy-tree">'
+        children = hierarchy_index.children[ROOT_KEY]
+        html = ['<ul class="app-hierarchy-tree">']
         end = "\n</ul>"
     else:
-        children = node.get_hierarchy_children()
-        html = '\n<ul class="app-hierarchy-tree--child">'
+        children = hierarchy_index.children[node.hierarchy_key]
+        html = ['\n<ul class="app-hierarchy-tree--child">']
         end = "\n</ul>\n</li>"
 
     for child in children:
-        if child.hierarchy_key in expanded:
-            openclass = "open"
-        else:
-            openclass = "closed"
-
-        if type(child) is Section:
-            li = f'<li id="{child.hierarchy_key}" class="app-hierarchy-tree__part app-hierarchy-tree__section app-hierarchy-tree__parent--{openclass}"><a href="{child.get_hierarchy_url(origin_country)}" class="app-hierarchy-tree__link app-hierarchy-tree__link--parent">{child.title.capitalize()}</a> <span class="app-hierarchy-tree__section-numbers">Section {child.roman_numeral}</span> <span class="app-hierarchy-tree__chapter-range">{child.chapter_range_str}</span>'  # noqa: E501
-        elif type(child) in [Commodity, Heading, SubHeading] and (
-            type(child) is Commodity or child.get_hierarchy_children_count() == 0
-        ):
-            li = f'<li id="{child.hierarchy_key}" class="app-hierarchy-tree__part app-hierarchy-tree__commodity"><div class="app-hierarchy-tree__link"><a href="{child.get_absolute_url(origin_country)}" class="app-hierarchy-tree__link--child">{child.description}<span class="govuk-visually-hidden"> &ndash; </span></a></div>{_commodity_code_html(child)}</li>'  # noqa: E501
-        else:
-            li = f'<li id="{child.hierarchy_key}" class="app-hierarchy-tree__part app-hierarchy-tree__chapter app-hierarchy-tree__parent--{openclass}"><a href="{child.get_hierarchy_url(origin_country)}" class="app-hierarchy-tree__link app-hierarchy-tree__link--parent">{child.description.capitalize()}</a>{_commodity_code_html(child)}'  # noqa: E501
-        html = html + li
-
-        if child.hierarchy_key in expanded:
-            html = html + _get_hierarchy_level_html(child, expanded, origin_country)
+        is_expanded = child.hierarchy_key in expanded
+        html.append(hierarchy_index.get_html_item(child, origin_country, is_expanded))
+
+        if is_expanded:
+            html.append(
+                _get_hierarchy_level_html(
+                    child, expanded, origin_country, hierarchy_index
+                )
+            )
 
-    html = html + end
+    html.append(end)
 
-    return html
+    return "".join(html)
 
 
-def _get_hierarchy_level_json(node, expanded, origin_country):
+def _get_hierarchy_level_json(node, expanded, origin_country, hierarchy_index):
     """
     View helper function to return the JSON for the selected hierarchy node
     :param node: string or model instance the current node
     :param expanded: list of hierarchy ids that make up the currently expanded path
     :param origin_country: string representing the origin country code
+    :param hierarchy_index: HierarchyIndex of the active tree
     :return: dict that represents the expanded section of the hierarchy
     """
 
     serialized = []
 
     if node == "root":  # if root it list only sections
-        children = (
-            Section.objects.all().order_by("section_id").prefetch_related("chapter_set")
-        )
+        children = hierarchy_index.children[ROOT_KEY]
     else:
-        children = node.get_hierarchy_children()
+        children = hierarchy_index.children[node.hierarchy_key]
 
     for child in children:
-        element = {"key": child.hierarchy_key}
-        if type(child) is Section:
-            element.update(
-                {
-                    "type": "branch",
-                    "roman_numeral": child.roman_numeral,
-                    "chapter_range_str": child.chapter_range_str,
-                    "label": child.title,
-                }
-            )
-        else:
-            if type(child) is Commodity or child.get_hierarchy_children_count() == 0:
-                element["type"] = "leaf"
-            else:
-                element["type"] = "parent"
-            code = (
-                child.commodity_code
-                if isinstance(child, Commodity)
-                else child.harmonized_code
-            )
-            code_regex = re.compile(
-                "([0-9]{2})([0-9]{2})([0-9]{2})([0-9]{2})([0-9]{2})"
-            )
-            element["commodity_code"] = code_regex.search(code).groups()
-            element["label"] = child.description
+        element = dict(hierarchy_index.get_json_item(child))
 
         if child.hierarchy_key in expanded:
             element["children"] = _get_hierarchy_level_json(
-                node=child, expanded=expanded, origin_country=origin_country
+                node=child,
+                expanded=expanded,
+                origin_country=origin_country,
+                hierarchy_index=hierarchy_index,
             )
 
         serialized.append(element)
@@ -487,12 +590,20 @@ def _get_hierarchy_level_json(node, expanded, origin_country):
 def hierarchy_data(country_code, node_id="root", content_type="html"):
     """
     View helper function
+    The hierarchy is rendered from the index of the active tree so no queries are made
+    once it's built, see `get_hierarchy_index`
     :param country_code: string representing country code
     :param node_id: string representing hierarchy node id
     :return: html snippet that represents the expanded section of the hierarchy
     """
     node_id = node_id.rstrip("/")
-    expanded = _get_expanded_context(node_id)
+    hierarchy_index = get_hierarchy_index()
+    expanded = _get_expanded_context(node_id, hierarchy_index)
     serializers = {"html": _get_hierarchy_level_html, "json": _get_hierarchy_level_json}
     serializer = serializers[content_type]
-    return serializer(node="root", expanded=expanded, origin_country=country_code)
+    return serializer(
+        node="root",
+        expanded=expanded,
+        origin_country=country_code,
+        hierarchy_index=hierarchy_index,
+    )
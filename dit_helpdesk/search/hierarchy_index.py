@@ -0,0 +1,240 @@
+"""
+In-memory index of the active nomenclature tree used to render the hierarchy browser of
+the search pages, see `search.helpers.hierarchy_data`
+"""
+import re
+
+from collections import defaultdict
+
+
+from commodities.models import Commodity
+from hierarchy.models import (
+    Chapter,
+    Heading,
+    Section,
+    SubHeading,
+    get_active_tree_version,
+)
+from hierarchy.views import BLANK_COMMODITY_CODE_HTML, _format_commodity_code_html
+
+
+ROOT_KEY = "root"
+
+# stands for the origin country in the urls of the memoised html items, it's only ever used
+# in place of a country code so it must match the country code of the url patterns
+ORIGIN_COUNTRY_PLACEHOLDER = "__origin_country__"
+
+CODE_REGEX = re.compile("([0-9]{2})([0-9]{2})([0-9]{2})([0-9]{2})([0-9]{2})")
+
+# The index of the active tree, built the first time the hierarchy is rendered after a tree
+# is activated, see `get_hierarchy_index`
+_hierarchy_index = (object(), None)
+
+
+class HierarchyIndex:
+    """
+    The sections, chapters, headings, subheadings and commodities of the active tree keyed
+    by their hierarchy key, along with their children in the order they are shown in
+    The html and json of each node are rendered the first time they are needed and shared
+    by every request until the next tree is activated
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.parents = {}
+        self.children = defaultdict(list)
+        self.chapter_ranges = {}
+
+        self._html_items = {}
+        self._json_items = {}
+
+        self._load()
+
+    def _add(self, obj, parent_key):
+        key = obj.hierarchy_key
+        self.objects[key] = obj
+        if parent_key is None:
+            return
+
+        # the first parent is the one returned by `get_parent`
+        self.parents.setdefault(key, parent_key)
+        self.children[parent_key].append(obj)
+
+    def _load(self):
+        sections = list(Section.objects.order_by("section_id"))
+        for section in sections:
+            self._add(section, ROOT_KEY)
+
+        section_keys = {section.pk: section.hierarchy_key for section in sections}
+        chapters = list(
+            Chapter.objects.only(
+                "chapter_code", "goods_nomenclature_sid", "description", "section_id"
+            ).order_by("chapter_code")
+        )
+        for chapter in chapters:
+            self._add(chapter, section_keys.get(chapter.section_id))
+
+        for key in section_keys.values():
+            self.chapter_ranges[key] = self._get_chapter_range_str(self.children[key])
+
+        chapter_keys = {chapter.pk: chapter.hierarchy_key for chapter in chapters}
+        headings = list(
+            Heading.objects.only(
+                "heading_code", "goods_nomenclature_sid", "description", "chapter_id"
+            ).order_by("heading_code")
+        )
+        for heading in headings:
+            self._add(heading, chapter_keys.get(heading.chapter_id))
+
+        heading_keys = {heading.pk: heading.hierarchy_key for heading in headings}
+        subheadings = list(
+            SubHeading.objects.only(
+                "commodity_code",
+                "goods_nomenclature_sid",
+                "description",
+                "leaf",
+                "heading_id",
+                "parent_subheading_id",
+            ).order_by("commodity_code")
+        )
+        subheading_keys = {obj.pk: obj.hierarchy_key for obj in subheadings}
+        commodities = Commodity.objects.only(
+            "commodity_code",
+            "goods_nomenclature_sid",
+            "description",
+            "heading_id",
+            "parent_subheading_id",
+        ).order_by("commodity_code")
+
+        # headings list their subheadings before their commodities while subheadings list
+        # their commodities first, see `get_hierarchy_children`
+        for obj in subheadings:
+            self._add(obj, heading_keys.get(obj.heading_id))
+        for obj in commodities:
+            self._add(obj, heading_keys.get(obj.heading_id))
+            self._add(obj, subheading_keys.get(obj.parent_subheading_id))
+        for obj in subheadings:
+            self._add(obj, subheading_keys.get(obj.parent_subheading_id))
+
+    @staticmethod
+    def _get_chapter_range_str(chapters):
+        """
+        Returns the range of chapters of a section, see `Section.chapter_range_str`
+        :param chapters: list of Chapter instances
+        :return: string
+        """
+        chapter_codes = [int(chapter.chapter_code[:2]) for chapter in chapters]
+        if len(chapter_codes) == 0:
+            return "None"
+        if len(chapter_codes) == 1:
+            return str(chapter_codes[0])
+        return "%s to %s" % (min(chapter_codes), max(chapter_codes))
+
+    def get_expanded_context(self, node_key):
+        """
+        Returns the hierarchy keys of a node and its ancestors, the path expanded when the
+        node is selected
+        :param node_key: string
+        :return: list of hierarchy keys
+        """
+        expanded = []
+        while node_key is not None and node_key != ROOT_KEY:
+            expanded.append(node_key)
+            node_key = self.parents.get(node_key)
+
+        return expanded
+
+    def _is_leaf(self, obj):
+        return type(obj) is Commodity or not self.children[obj.hierarchy_key]
+
+    def _is_duplicate_heading(self, obj):
+        return any(
+            child.commodity_code == obj.commodity_code and not child.leaf
+            for child in self.children[obj.hierarchy_key]
+        )
+
+    def _get_commodity_code_html(self, obj):
+        """
+        Returns the html of the code of a node, see `_commodity_code_html`
+        :param obj: model instance
+        :return: html
+        """
+        if isinstance(obj, (Heading, SubHeading)) and self._is_duplicate_heading(obj):
+            return BLANK_COMMODITY_CODE_HTML
+
+        return _format_commodity_code_html(obj.commodity_code, self._is_leaf(obj))
+
+    def get_html_item(self, obj, origin_country, is_open):
+        """
+        Returns the opening html of the item of a node in the hierarchy browser, memoised
+        :param obj: model instance
+        :param origin_country: string representing the origin country code
+        :param is_open: bool whether the node is expanded
+        :return: html
+        """
+        item_key = (obj.hierarchy_key, is_open)
+        try:
+            return origin_country.lower().join(self._html_items[item_key])
+        except KeyError:
+            pass
+
+        # the item is rendered for a placeholder country, which is swapped for the origin
+        # country on every call, so the memoised items don't grow with the countries
+        key = obj.hierarchy_key
+        openclass = "open" if is_open else "closed"
+        if type(obj) is Section:
+            li = f'<li id="{key}" class="app-hierarchy-tree__part app-hierarchy-tree__section app-hierarchy-tree__parent--{openclass}"><a href="{obj.get_hierarchy_url(ORIGIN_COUNTRY_PLACEHOLDER)}" class="app-hierarchy-tree__link app-hierarchy-tree__link--parent">{obj.title.capitalize()}</a> <span class="app-hierarchy-tree__section-numbers">Section {obj.roman_numeral}</span> <span class="app-hierarchy-tree__chapter-range">{self.chapter_ranges[key]}</span>'  # noqa: E501
+        elif type(obj) is not Chapter and self._is_leaf(obj):
+            li = f'<li id="{key}" class="app-hierarchy-tree__part app-hierarchy-tree__commodity"><div class="app-hierarchy-tree__link"><a href="{obj.get_absolute_url(ORIGIN_COUNTRY_PLACEHOLDER)}" class="app-hierarchy-tree__link--child">{obj.description}<span class="govuk-visually-hidden"> &ndash; </span></a></div>{self._get_commodity_code_html(obj)}</li>'  # noqa: E501
+        else:
+            li = f'<li id="{key}" class="app-hierarchy-tree__part app-hierarchy-tree__chapter app-hierarchy-tree__parent--{openclass}"><a href="{obj.get_hierarchy_url(ORIGIN_COUNTRY_PLACEHOLDER)}" class="app-hierarchy-tree__link app-hierarchy-tree__link--parent">{obj.description.capitalize()}</a>{self._get_commodity_code_html(obj)}'  # noqa: E501
+
+        self._html_items[item_key] = li.split(ORIGIN_COUNTRY_PLACEHOLDER)
+
+        return origin_country.lower().join(self._html_items[item_key])
+
+    def get_json_item(self, obj):
+        """
+        Returns the serialized node without its children, memoised so mustn't be modified
+        :param obj: model instance
+        :return: dict
+        """
+        key = obj.hierarchy_key
+        try:
+            return self._json_items[key]
+        except KeyError:
+            pass
+
+        element = {"key": key}
+        if type(obj) is Section:
+            element.update(
+                {
+                    "type": "branch",
+                    "roman_numeral": obj.roman_numeral,
+                    "chapter_range_str": self.chapter_ranges[key],
+                    "label": obj.title,
+                }
+            )
+        else:
+            element["type"] = "leaf" if self._is_leaf(obj) else "parent"
+            element["commodity_code"] = CODE_REGEX.search(obj.commodity_code).groups()
+            element["label"] = obj.description
+
+        self._json_items[key] = element
+
+        return element
+
+
+def get_hierarchy_index():
+    """
+    Returns the index of the active tree, rebuilt when the next tree is activated
+    :return: HierarchyIndex
+    """
+    global _hierarchy_index
+
+    # bumped every time a tree is activated, see `NomenclatureTree.save`
+    tree_version = get_active_tree_version()
+    if _hierarchy_index[0] != tree_version:
+        _hierarchy_index = (tree_version, HierarchyIndex())
+
+    return _hierarchy_index[1]
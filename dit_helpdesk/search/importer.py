@@ -1,14 +1,13 @@
 import json
 import logging
+from collections import defaultdict
 from pathlib import Path
 
 import pandas
-from django.apps import apps
 from django.conf import settings
-from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
 
 from commodities.models import Commodity
-from hierarchy.models import Heading, SubHeading, Section, Chapter
+from hierarchy.models import Heading, SubHeading, Chapter
 
 logger = logging.getLogger(__name__)
 logging.disable(logging.NOTSET)
@@ -34,21 +33,69 @@ def data_loader(file_path):
         return data_frame
 
 
+# The models keywords are imported for, keyed by the name `load` files their rows under
+KEYWORD_MODELS = {
+    "Chapter": Chapter,
+    "Heading": Heading,
+    "SubHeading": SubHeading,
+    "Commodity": Commodity,
+}
+
+# The foreign keys from the children of a node to it, see `get_hierarchy_children_count`
+CHILD_RELATIONS = {
+    Chapter: [(Heading, "chapter")],
+    Heading: [(SubHeading, "heading"), (Commodity, "heading")],
+    SubHeading: [(SubHeading, "parent_subheading"), (Commodity, "parent_subheading")],
+}
+
+
+def _get_objects_by_code(model):
+    """
+    Indexes the objects of the active tree by their code, only loading the fields updated
+    by the import
+    :param model: hierarchy model class
+    :return: dict of lists of model instances keyed by code
+    """
+    code_field = model.COMMODITY_CODE_FIELD
+    fields = ["keywords", "ranking"]
+    if model in CHILD_RELATIONS:
+        fields.append("leaf")
+
+    objects_by_code = defaultdict(list)
+    for obj in model.objects.only(code_field, *fields):
+        objects_by_code[getattr(obj, code_field)].append(obj)
+
+    return objects_by_code
+
+
+def _get_parent_ids(model):
+    """
+    Returns the ids of the objects of the active tree with children, aggregated over all the
+    children instead of counting the children of each object
+    :param model: hierarchy model class
+    :return: set of ids
+    """
+    parent_ids = set()
+    for child_model, field_name in CHILD_RELATIONS[model]:
+        parent_ids.update(
+            child_model.objects.filter(**{f"{field_name}__isnull": False})
+            .values_list(f"{field_name}_id", flat=True)
+            .distinct()
+        )
+
+    return parent_ids
+
+
 class SearchKeywordsImporter:
     def __init__(self):
         self.data = {}
         self.documents = None
         self.app_label = __package__.rsplit(".", 1)[-1]
         self.data_path = settings.SEARCH_DATA_PATH
-        self.section_codes = [section.section_id for section in Section.objects.all()]
-        self.chapter_codes = [chapter.chapter_code for chapter in Chapter.objects.all()]
-        self.heading_codes = [heading.heading_code for heading in Heading.objects.all()]
-        self.subheading_codes = [
-            subheading.commodity_code for subheading in SubHeading.objects.all()
-        ]
-        self.commodity_codes = [
-            commodity.commodity_code for commodity in Commodity.objects.all()
-        ]
+        self.objects_by_code = {
+            model_name: _get_objects_by_code(model)
+            for model_name, model in KEYWORD_MODELS.items()
+        }
 
     def load(self, file_path):
         f = self.data_path.format(file_path)
@@ -77,108 +124,47 @@ class SearchKeywordsImporter:
         for commodity_code in instance_data.keys():
 
             instance = {commodity_code: instance_data[commodity_code]}
-            if commodity_code in self.chapter_codes:
-                if "Chapter" in self.data.keys() and isinstance(
-                    self.data["Chapter"], list
-                ):
-                    self.data["Chapter"].append(instance)
-                else:
-                    self.data["Chapter"] = [instance]
-
-            if commodity_code in self.heading_codes:
-                if "Heading" in self.data.keys() and isinstance(
-                    self.data["Heading"], list
-                ):
-                    self.data["Heading"].append(instance)
-                else:
-                    self.data["Heading"] = [instance]
-
-            if commodity_code in self.subheading_codes:
-                if "SubHeading" in self.data.keys() and isinstance(
-                    self.data["SubHeading"], list
-                ):
-                    self.data["SubHeading"].append(instance)
-                else:
-                    self.data["SubHeading"] = [instance]
-
-            if commodity_code in self.commodity_codes:
-                if "Commodity" in self.data.keys() and isinstance(
-                    self.data["Commodity"], list
-                ):
-                    self.data["Commodity"].append(instance)
-                else:
-                    self.data["Commodity"] = [instance]
-
-    def process(self):
+            for model_name, objects_by_code in self.objects_by_code.items():
+                if commodity_code in objects_by_code:
+                    self.data.setdefault(model_name, []).append(instance)
+
+    def process(self, batch_size=1000):
 
         multiples_found = []
         not_found = []
 
         for model_name in self.data.keys():
-            for item in self.data[model_name]:
-                field_data = {}
+            model = KEYWORD_MODELS[model_name]
+            objects_by_code = self.objects_by_code[model_name]
 
+            updated_objs = []
+            for item in self.data[model_name]:
                 commodity_code = next(iter(item.keys()))
-                field_data["keywords"] = " ".join(item[commodity_code]["keywords"])
-                field_data["ranking"] = item[commodity_code]["ranking_score"]
-
-                app_label = "commodities" if model_name == "Commodity" else "hierarchy"
-                model = apps.get_model(app_label=app_label, model_name=model_name)
-                obj = created = None
-                if model_name == "Chapter":
-                    obj, created = model.objects.update_or_create(
-                        chapter_code=commodity_code, defaults=field_data
-                    )
-                elif model_name == "Heading":
-                    try:
-                        obj, created = model.objects.update_or_create(
-                            heading_code=commodity_code, defaults=field_data
-                        )
-                    except ObjectDoesNotExist as err:
-                        not_found.append((model_name, commodity_code))
-                        logger.debug(
-                            "update or create {0} {1}".format(err.args, commodity_code)
-                        )
-                    except MultipleObjectsReturned as m_err:
-                        multiples_found.append((model_name, commodity_code))
-                        logger.debug(
-                            "multiple found {0} {1}".format(m_err.args, commodity_code)
-                        )
-                    except Exception as ex:
-                        logger.debug(ex.args)
-                else:
-                    try:
-                        obj, created = model.objects.update_or_create(
-                            commodity_code=commodity_code, defaults=field_data
-                        )
-                    except ObjectDoesNotExist as err:
-                        not_found.append((model_name, commodity_code))
-                        logger.debug(
-                            "update or create {0} {1}".format(err.args, commodity_code)
-                        )
-                    except MultipleObjectsReturned as m_err:
-                        multiples_found.append((model_name, commodity_code))
-                        logger.debug(
-                            "multiple found {0} {1}".format(m_err.args, commodity_code)
-                        )
-                    except Exception as ex:
-                        logger.debug(ex.args)
-
-                # explicitly set branch items as leafs where they have no children nad have commodity detail data
-                if not isinstance(obj, Commodity):
-                    try:
-                        if obj.get_hierarchy_children_count() > 0:
-                            obj.leaf = False
-                        else:
-                            obj.leaf = True
-                        obj.save()
-                    except AttributeError as ae:
-                        logger.debug(ae.args)
-
-                if not created:
-                    logger.info("{0} instance updated".format(obj))
-                else:
-                    logger.info("{0} instance created".format(obj))
+                objs = objects_by_code.get(commodity_code, [])
+                if not objs:
+                    not_found.append((model_name, commodity_code))
+                    continue
+                if len(objs) > 1:
+                    multiples_found.append((model_name, commodity_code))
+                    continue
+
+                obj = objs[0]
+                obj.keywords = " ".join(item[commodity_code]["keywords"])
+                obj.ranking = item[commodity_code]["ranking_score"]
+                updated_objs.append(obj)
+
+            fields = ["keywords", "ranking"]
+            # explicitly set branch items as leafs where they have no children
+            if model in CHILD_RELATIONS and updated_objs:
+                parent_ids = _get_parent_ids(model)
+                for obj in updated_objs:
+                    obj.leaf = obj.pk not in parent_ids
+                fields.append("leaf")
+
+            model.all_objects.bulk_update(updated_objs, fields, batch_size=batch_size)
+            logger.info(
+                "{0} {1} instances updated".format(len(updated_objs), model_name)
+            )
 
         logger.info("Multiples Found: {0}".format(multiples_found))
         logger.info("Not founds: {0}".format(not_found))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from core.helpers import Timer
+from search.search_keyword_generator import KEYWORD_COLUMNS, SearchKeywordGenerator
+
+from .generate_search_keywords import GA_SEARCH_TERMS, HEADINGS_CSV
+
+
+class Command(BaseCommand):
+    help = """Compares the wall time of building the search keyword columns row by row and
+    with the batched pipeline, checking both come out the same"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Only use the first headings, the row by row version takes minutes",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes the headings are split across by the pipeline",
+        )
+
+    def handle(self, *args, **options):
+        # the keywords aren't written out so neither synonyms nor an output file are needed
+        generator = SearchKeywordGenerator(HEADINGS_CSV, GA_SEARCH_TERMS, [], None)
+        if options["limit"]:
+            generator.subhead = generator.subhead.head(options["limit"])
+        subhead = generator.subhead.copy()
+
+        by_row_timer = Timer()
+        by_row_timer.start()
+        generator.create_clean_content_by_row()
+        by_row_timer.stop()
+        by_row_columns = generator.subhead[KEYWORD_COLUMNS]
+
+        generator.subhead = subhead
+        pipeline_timer = Timer()
+        pipeline_timer.start()
+        generator.create_clean_content(workers=options["workers"])
+        pipeline_timer.stop()
+        pipeline_columns = generator.subhead[KEYWORD_COLUMNS]
+
+        self.stdout.write(f"Headings: {len(subhead)}")
+        self.stdout.write(f"Row by row: {by_row_timer.elapsed():.2f}s")
+        self.stdout.write(
+            f"Pipeline ({options['workers']} workers): {pipeline_timer.elapsed():.2f}s"
+        )
+        if pipeline_columns.equals(by_row_columns):
+            self.stdout.write(self.style.SUCCESS("Keyword columns match"))
+        else:
+            self.stdout.write(self.style.ERROR("Keyword columns differ"))
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from search.corpora import download_corpora
+
+
+class Command(BaseCommand):
+    help = """Downloads the NLTK corpora used by `generate_search_keywords` to NLTK_DATA_PATH"""
+
+    def handle(self, *args, **options):
+        downloaded = download_corpora()
+
+        self.stdout.write(
+            f"NLTK corpora downloaded to {settings.NLTK_DATA_PATH}: "
+            f"{', '.join(downloaded) or 'none missing'}"
+        )
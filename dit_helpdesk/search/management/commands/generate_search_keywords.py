@@ -22,6 +22,12 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("-f", "--data_path", type=str, nargs="?", required=False)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes the headings are split across",
+        )
 
     def handle(self, *args, **options):
         synonym_builder = SynonymBuilder()
@@ -30,4 +36,4 @@ class Command(BaseCommand):
         generator = SearchKeywordGenerator(
             HEADINGS_CSV, GA_SEARCH_TERMS, synonym_list, OUTPUT_FILE
         )
-        generator.process()
+        generator.process(workers=options["workers"])
@@ -2,6 +2,8 @@ import datetime as dt
 import logging
 import contextlib
 
+from itertools import islice
+
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from django.db import transaction
@@ -37,6 +39,10 @@ indices = {
 # was the actual datetime in the name of the index
 PATTERN = "{}-*"
 
+DEFAULT_WORKERS = 4
+
+DEFAULT_CHUNK_SIZE = 500
+
 
 timer = Timer()
 
@@ -51,7 +57,73 @@ def swap_index_name(document, new_name):
     document._index._name = old_name
 
 
-def rebuild():
+@contextlib.contextmanager
+def bulk_load_settings(es, index_name):
+    """Switch off refreshing and replication of `index_name` while it's being populated and
+    restore its previous settings afterwards, which also makes the loaded documents searchable.
+
+    """
+    index_settings = es.indices.get_settings(index=index_name)[index_name]["settings"][
+        "index"
+    ]
+    es.indices.put_settings(
+        index=index_name,
+        body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}},
+    )
+
+    try:
+        yield
+    finally:
+        # a `None` refresh interval resets it to the elasticsearch default
+        es.indices.put_settings(
+            index=index_name,
+            body={
+                "index": {
+                    "refresh_interval": index_settings.get("refresh_interval"),
+                    "number_of_replicas": index_settings["number_of_replicas"],
+                }
+            },
+        )
+        es.indices.refresh(index=index_name)
+
+
+def populate(doc_inst, parallel=False, workers=DEFAULT_WORKERS, chunk_size=None):
+    """Index every object of the document's queryset and return how many were indexed.
+
+    In parallel mode the queryset is streamed in chunks and the documents are sent by several
+    threads at once. The documents are prepared on the calling thread as the worker threads
+    have their own database connections, which can't see the tree activated by the
+    uncommitted transaction of the rebuild.
+
+    """
+    qs = doc_inst.get_queryset()
+    indexed = 0
+
+    def iter_objects(objects):
+        nonlocal indexed
+        for obj in objects:
+            indexed += 1
+            yield obj
+
+    if not parallel:
+        doc_inst.update(iter_objects(qs))
+        return indexed
+
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    objects = iter_objects(qs.iterator(chunk_size=chunk_size))
+    while True:
+        # enough documents for every worker to send a bulk request
+        batch = list(islice(objects, workers * chunk_size))
+        if not batch:
+            break
+
+        actions = list(doc_inst._get_actions(batch, "index"))
+        doc_inst.parallel_bulk(actions, thread_count=workers, chunk_size=chunk_size)
+
+    return indexed
+
+
+def rebuild(parallel=False, workers=DEFAULT_WORKERS, chunk_size=None):
     """Create a new index with a unique name, populate it with objects from database and
     create / reassign an alias once the population is done.
     From inside the application only the alias should be referred to.
@@ -92,12 +164,26 @@ def rebuild():
         # `doc` is e.g. `SectionDocument`
         doc_inst = doc()
 
+        index_timer = Timer()
+        index_timer.start()
+
         with swap_index_name(doc_inst, new_index_name):
             doc_inst._index._name = new_index_name
-            qs = doc_inst.get_queryset()
 
-            doc_inst.update(qs)
-        logger.info("Done!")
+            if parallel:
+                with bulk_load_settings(es, new_index_name):
+                    indexed = populate(doc_inst, True, workers, chunk_size)
+            else:
+                indexed = populate(doc_inst)
+
+        index_timer.stop()
+        logger.info(
+            "Done! Indexed %s documents into %s in %.1fs (%.0f docs/s)",
+            indexed,
+            new_index_name,
+            index_timer.elapsed(),
+            indexed / max(index_timer.elapsed(), 0.001),
+        )
 
         if is_alias:
             update_aliases_actions.extend(
@@ -152,6 +238,25 @@ class Command(BaseCommand):
             default=False,
             help="Keep previous ElasticSearch indices, even if no alias points to them anymore",
         )
+        parser.add_argument(
+            "--parallel",
+            action="store_true",
+            default=False,
+            help="Stream the documents to ElasticSearch from several threads, with refreshes "
+            "and replicas switched off until each index is populated",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help="Number of indexing threads in parallel mode",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of objects per database fetch and bulk request in parallel mode",
+        )
 
     def handle(self, *args, **options):
         # initiate the default connection to elasticsearch
@@ -175,7 +280,11 @@ class Command(BaseCommand):
             # yet visible in the app since the transaction didn't finish)
             new_tree.end_date = None
             new_tree.save()
-            indices_names_to_remove_conditionally = rebuild()
+            indices_names_to_remove_conditionally = rebuild(
+                parallel=options["parallel"],
+                workers=options["workers"],
+                chunk_size=options["chunk_size"],
+            )
         timer.stop()
 
         logger.info("Time spent in inconsistent state: %sms", timer.elapsed() * 1000)
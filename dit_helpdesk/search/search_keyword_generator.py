@@ -1,34 +1,121 @@
+import functools
+import itertools
 import re
 import warnings
 
 import logging
 
-import nltk
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 from nltk import ngrams
-from nltk.corpus import stopwords
-from nltk.corpus import wordnet
 from textblob import Word
 
-nltk.download("stopwords")
-nltk.download("wordnet")
-nltk.download("omw-1.4")
+from search.corpora import get_stop_words, get_wordnet
 
 warnings.filterwarnings("ignore")
 
 SYNONYM_LIMIT = 0
 
+# The columns built from the description of each heading, see `get_keyword_columns`
+KEYWORD_COLUMNS = [
+    "clean_content",
+    "searched_unique_single_word",
+    "un_searched_unique_single_word",
+    "searched_pair_word",
+    "searched_unique_single_word_synonym",
+]
+
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def singularize(word):
+    return str(Word(word).singularize())
+
+
+@functools.lru_cache(maxsize=None)
+def get_synonyms(word):
+    """
+    Returns the names of the lemmas of every synset of a word, memoised as the same words
+    come up across thousands of headings
+    :param word: string
+    :return: tuple of strings
+    """
+    return tuple(
+        lemma.name()
+        for synset in get_wordnet().synsets(word)
+        for lemma in synset.lemmas()
+    )
+
+
+def get_keyword_columns(contents, stop_words, searched_words, searched_pair_words):
+    """
+    Builds the keyword columns for a batch of heading descriptions, each description is
+    only tokenised once and the words are singularized through a cache
+    This is a module level function so batches can be fanned out to worker processes
+    :param contents: Series of descriptions
+    :param stop_words: set of the stop words
+    :param searched_words: set of the singularized words searched for
+    :param searched_pair_words: set of the singularized pairs of words searched for
+    :return: dict of lists keyed by the names in `KEYWORD_COLUMNS`
+    """
+    columns = {column: [] for column in KEYWORD_COLUMNS}
+
+    words = (
+        contents.str.replace(r"[^\w\s]", "", regex=True)
+        .str.replace(r"[0-9]+", "", regex=True)
+        .str.lower()
+        .str.split()
+    )
+    for content_words in words:
+        clean_content = " ".join(
+            word for word in map(singularize, content_words) if word not in stop_words
+        )
+        clean_words = clean_content.split()
+
+        # the words are singularized again before being matched against the searches
+        single_words = [singularize(word) for word in clean_words]
+        searched_single_words = [
+            word for word in single_words if word in searched_words
+        ]
+        un_searched_single_words = [
+            word for word in single_words if word not in searched_words
+        ]
+
+        pair_words = (" ".join(pair) for pair in ngrams(clean_words, 2))
+        searched_pair_word = dict.fromkeys(
+            pair_word for pair_word in pair_words if pair_word in searched_pair_words
+        )
+
+        synonyms = itertools.islice(
+            itertools.chain.from_iterable(map(get_synonyms, searched_single_words)),
+            SYNONYM_LIMIT,
+        )
+
+        columns["clean_content"].append(clean_content)
+        columns["searched_unique_single_word"].append(
+            " ".join(dict.fromkeys(searched_single_words))
+        )
+        columns["un_searched_unique_single_word"].append(
+            " ".join(un_searched_single_words)
+        )
+        columns["searched_pair_word"].append(" ".join(searched_pair_word))
+        columns["searched_unique_single_word_synonym"].append(
+            " ".join(dict.fromkeys(synonyms))
+        )
+
+    return columns
+
+
 class SearchKeywordGenerator:
     def __init__(
         self, headings_file, ga_search_terms_file, trade_tariff_synonyms, output_file
     ):
 
-        self.stop_words = set(stopwords.words("english"))
+        self.stop_words = get_stop_words()
         self.subhead = pd.read_csv(headings_file)
         self.google_analytics_searched_words = pd.read_excel(
             ga_search_terms_file, sheet_name="Dataset1"
@@ -38,6 +125,8 @@ class SearchKeywordGenerator:
 
         self.searched_words = self.get_searched_words()
         self.searched_pair_words = self.get_searched_pair_words()
+        self.searched_word_set = set(self.searched_words)
+        self.searched_pair_word_set = set(self.searched_pair_words)
 
     def get_searched_words(self):
         """
@@ -191,19 +280,63 @@ class SearchKeywordGenerator:
         ]
 
         syn = []
-        for w in new_sent:
-            for s in wordnet.synsets(w):
-                for lemma in s.lemmas():
-                    if len(syn) == SYNONYM_LIMIT:
-                        break
-                    syn.append(lemma.name())
+        # WordNet is only loaded when synonyms are generated
+        if SYNONYM_LIMIT:
+            wordnet = get_wordnet()
+            for w in new_sent:
+                for s in wordnet.synsets(w):
+                    for lemma in s.lemmas():
+                        if len(syn) == SYNONYM_LIMIT:
+                            break
+                        syn.append(lemma.name())
         syn = list(dict.fromkeys(syn))  #
         syn = " ".join(syn)
         return syn
 
-    def create_clean_content(self):
+    def create_clean_content(self, workers=1, batch_size=1000):
         """
         create clean_content, searched_unique_singleword, unsearched_unique_singleword and searched_pairword columns
+        The headings are processed in batches, fanned out to a pool of processes when there
+        is more than one worker
+        :param workers: number of processes
+        :param batch_size: number of headings per batch
+        """
+        contents = self.subhead.Col7
+        batches = [
+            batch
+            for _, batch in contents.groupby(np.arange(len(contents)) // batch_size)
+        ]
+        batch_args = (
+            self.stop_words,
+            self.searched_word_set,
+            self.searched_pair_word_set,
+        )
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                batch_columns = list(
+                    executor.map(
+                        get_keyword_columns,
+                        batches,
+                        *(itertools.repeat(arg) for arg in batch_args),
+                    )
+                )
+        else:
+            batch_columns = [
+                get_keyword_columns(batch, *batch_args) for batch in batches
+            ]
+
+        for column in KEYWORD_COLUMNS:
+            self.subhead[column] = list(
+                itertools.chain.from_iterable(
+                    columns[column] for columns in batch_columns
+                )
+            )
+
+    def create_clean_content_by_row(self):
+        """
+        Row by row version of `create_clean_content`, kept as the reference the pipeline is
+        benchmarked against, see the `benchmark_search_keywords` command
         """
         clean_content = []
         searched_unique_single_word = []
@@ -253,8 +386,8 @@ class SearchKeywordGenerator:
             code = str(code)
         return code
 
-    def process(self):
-        self.create_clean_content()
+    def process(self, workers=1):
+        self.create_clean_content(workers=workers)
 
         logger.info("Setting subhead searched words..")
         self.set_subhead_searched_words()
@@ -306,23 +439,16 @@ class SearchKeywordGenerator:
         final_category, otherwise, use searched_words
         """
 
-        final_category_temp = []
-        for i in range(self.subhead.shape[0]):
-            if self.subhead["searched_words"][i] == "":
-                final_category_temp.append(
-                    self.subhead["un_searched_unique_single_word"][i]
-                )
-            else:
-                final_category_temp.append(self.subhead["searched_words"][i])
+        final_category = np.where(
+            self.subhead["searched_words"] == "",
+            self.subhead["un_searched_unique_single_word"],
+            self.subhead["searched_words"],
+        )
 
-        # if final_category_temp is still empty, 'other' will be assigned to it
-        final_category = []
-        for i in range(self.subhead.shape[0]):
-            if final_category_temp[i] == "":
-                final_category.append("other")
-            else:
-                final_category.append(final_category_temp[i])
-        self.subhead["final_category"] = final_category
+        # if final_category is still empty, 'other' will be assigned to it
+        self.subhead["final_category"] = np.where(
+            final_category == "", "other", final_category
+        )
 
     def set_subhead_ranking(self):
         """
@@ -345,18 +471,10 @@ class SearchKeywordGenerator:
         searched single word, then append pair word to single word's synonym, otherwise, nothing to do
         """
 
-        searched_words = []
-        for i in range(self.subhead.shape[0]):
-            if (
-                self.subhead["searched_pair_word"][i]
-                in self.subhead["searched_unique_single_word_synonym"][i]
-            ):
-                searched_words.append(
-                    self.subhead["searched_unique_single_word_synonym"][i]
-                )
-            else:
-                searched_words.append(
-                    self.subhead["searched_unique_single_word_synonym"][i]
-                    + self.subhead["searched_pair_word"][i]
-                )
-        self.subhead["searched_words"] = searched_words
+        self.subhead["searched_words"] = [
+            synonyms if pair_word in synonyms else synonyms + pair_word
+            for synonyms, pair_word in zip(
+                self.subhead["searched_unique_single_word_synonym"],
+                self.subhead["searched_pair_word"],
+            )
+        ]
@@ -0,0 +1,83 @@
+import importlib
+import tempfile
+from unittest import mock
+
+import nltk
+import pandas as pd
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from search import corpora, search_keyword_generator
+
+
+class EnsureCorpusTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        corpora.ensure_corpus.cache_clear()
+        self.addCleanup(corpora.ensure_corpus.cache_clear)
+
+    @mock.patch("search.corpora.nltk.data.find")
+    def test_ensure_corpus(self, mock_find):
+        corpora.ensure_corpus("stopwords")
+        corpora.ensure_corpus("stopwords")
+
+        mock_find.assert_called_once_with("corpora/stopwords")
+        self.assertIn(settings.NLTK_DATA_PATH, nltk.data.path)
+
+    @mock.patch("search.corpora.nltk.data.find")
+    def test_ensure_corpus_not_found(self, mock_find):
+        mock_find.side_effect = LookupError
+
+        with self.assertRaises(corpora.CorpusNotFound):
+            corpora.ensure_corpus("wordnet")
+
+
+class DownloadCorporaTestCase(TestCase):
+    @mock.patch("search.corpora.nltk.download")
+    @mock.patch("search.corpora.nltk.data.find")
+    def test_download_corpora_skips_existing(self, mock_find, mock_download):
+        # only the stopwords are already downloaded
+        mock_find.side_effect = [None, LookupError, LookupError]
+
+        with tempfile.TemporaryDirectory() as data_path:
+            with override_settings(NLTK_DATA_PATH=data_path):
+                self.assertEqual(corpora.download_corpora(), ["wordnet", "omw-1.4"])
+
+        mock_find.assert_any_call("corpora/stopwords", paths=[data_path])
+        self.assertEqual(
+            [call.args[0] for call in mock_download.call_args_list],
+            ["wordnet", "omw-1.4"],
+        )
+
+
+class SearchKeywordGeneratorCorporaTestCase(TestCase):
+    @mock.patch("nltk.download")
+    def test_import_does_not_download(self, mock_download):
+        importlib.reload(search_keyword_generator)
+
+        mock_download.assert_not_called()
+
+    @mock.patch("search.search_keyword_generator.get_wordnet")
+    def test_wordnet_only_loaded_for_synonyms(self, mock_get_wordnet):
+        contents = pd.Series(["Live horses"])
+
+        with mock.patch("search.search_keyword_generator.SYNONYM_LIMIT", 0):
+            search_keyword_generator.get_keyword_columns(
+                contents, set(), {"horse"}, set()
+            )
+        mock_get_wordnet.assert_not_called()
+
+    @mock.patch("search.search_keyword_generator.get_wordnet")
+    def test_wordnet_only_loaded_for_synonyms_by_row(self, mock_get_wordnet):
+        generator = search_keyword_generator.SearchKeywordGenerator.__new__(
+            search_keyword_generator.SearchKeywordGenerator
+        )
+        generator.searched_words = ["horse"]
+
+        with mock.patch("search.search_keyword_generator.SYNONYM_LIMIT", 0):
+            synonyms = generator.get_searched_single_word_synonym("Live horses", set())
+
+        self.assertEqual(synonyms, "")
+        mock_get_wordnet.assert_not_called()
@@ -3,11 +3,14 @@ from unittest import mock
 from mixer.backend.django import mixer
 from parameterized import parameterized
 
+from elasticsearch_dsl.response import Response
+
 from django.test import TestCase
 
 from commodities.models import Commodity
 from hierarchy.helpers import create_nomenclature_tree
 from hierarchy.models import Heading, SubHeading, Chapter
+from hierarchy.views import BLANK_COMMODITY_CODE_HTML, _commodity_code_html
 
 from search import helpers
 
@@ -87,3 +90,222 @@ class GetObjectFromHitTestCase(TestCase):
         hit = self._get_hit("chapter", "1234", "0100000000")
         with self.assertRaises(helpers.ObjectNotFoundFromHit):
             helpers.get_object_from_hit(hit)
+
+    def test_get_objects_from_hits(self):
+        tree = create_nomenclature_tree("UK")
+
+        chapter = mixer.blend(
+            Chapter,
+            chapter_code="0100000000",
+            goods_nomenclature_sid="1234",
+            nomenclature_tree=tree,
+        )
+        headings = [
+            mixer.blend(
+                Heading,
+                heading_code=heading_code,
+                goods_nomenclature_sid="1234",
+                nomenclature_tree=tree,
+            )
+            for heading_code in ["0101000000", "0102000000"]
+        ]
+        hits = [
+            self._get_hit("heading", "1234", "0102000000"),
+            self._get_hit("chapter", "1234", "0100000000"),
+            self._get_hit("heading", "1234", "0101000000"),
+            self._get_hit("heading", "5678", "0103000000"),
+        ]
+
+        # a query per index
+        with self.assertNumQueries(2):
+            objects = helpers.get_objects_from_hits(hits)
+
+        self.assertEqual(objects, [headings[1], chapter, headings[0], None])
+
+    def test_get_commodity_code_html(self):
+        tree = create_nomenclature_tree("UK")
+
+        heading = mixer.blend(
+            Heading,
+            heading_code="0101000000",
+            goods_nomenclature_sid="1",
+            nomenclature_tree=tree,
+        )
+        duplicate_subheading = mixer.blend(
+            SubHeading,
+            commodity_code="0101000000",
+            goods_nomenclature_sid="2",
+            heading=heading,
+            parent_subheading=None,
+            leaf=False,
+            nomenclature_tree=tree,
+        )
+        subheading = mixer.blend(
+            SubHeading,
+            commodity_code="0101210000",
+            goods_nomenclature_sid="3",
+            heading=None,
+            parent_subheading=duplicate_subheading,
+            leaf=True,
+            nomenclature_tree=tree,
+        )
+        hits = [
+            self._get_hit("heading", "1", "0101000000"),
+            self._get_hit("subheading", "2", "0101000000"),
+            self._get_hit("subheading", "3", "0101210000"),
+        ]
+
+        expected_html = [
+            BLANK_COMMODITY_CODE_HTML,
+            _commodity_code_html(duplicate_subheading),
+            _commodity_code_html(subheading),
+        ]
+        expected_heading_html = _commodity_code_html(heading, ignore_duplicate=False)
+
+        objects = helpers.get_objects_from_hits(hits)
+
+        # annotated by `get_objects_from_hits`
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [helpers.get_commodity_code_html(obj) for obj in objects],
+                expected_html,
+            )
+            self.assertEqual(
+                helpers.get_commodity_code_html(objects[0], ignore_duplicate=False),
+                expected_heading_html,
+            )
+
+
+class GetGroupObjectsTestCase(TestCase):
+    def test_get_group_objects(self):
+        tree = create_nomenclature_tree("UK")
+
+        chapter = mixer.blend(
+            Chapter, chapter_code="0100000000", nomenclature_tree=tree
+        )
+        heading = mixer.blend(
+            Heading, heading_code="0101000000", chapter=chapter, nomenclature_tree=tree
+        )
+        mixer.cycle(2).blend(
+            SubHeading, heading=heading, parent_subheading=None, nomenclature_tree=tree
+        )
+        mixer.blend(
+            Commodity, heading=heading, parent_subheading=None, nomenclature_tree=tree
+        )
+        empty_heading = mixer.blend(
+            Heading, heading_code="0102000000", chapter=chapter, nomenclature_tree=tree
+        )
+
+        with self.assertNumQueries(2):
+            chapters, headings = helpers.get_group_objects(
+                ["0100000000"], ["0101000000", "0102000000"]
+            )
+
+        self.assertEqual(chapters, {"0100000000": chapter})
+        self.assertEqual(headings, {"0101000000": heading, "0102000000": empty_heading})
+        self.assertEqual(chapters["0100000000"].hierarchy_children_count, 2)
+        self.assertEqual(headings["0101000000"].hierarchy_children_count, 3)
+        self.assertEqual(headings["0102000000"].hierarchy_children_count, 0)
+
+
+def _get_response(search, hits, total, index_buckets):
+    return Response(
+        search,
+        {
+            "hits": {
+                "total": {"value": total, "relation": "eq"},
+                "hits": hits,
+            },
+            "aggregations": {"indices": {"buckets": index_buckets}},
+        },
+    )
+
+
+def _get_index_bucket(index, chapter_codes, heading_codes):
+    return {
+        "key": index,
+        "chapters": {"buckets": [{"key": code} for code in chapter_codes]},
+        "headings": {"buckets": [{"key": code} for code in heading_codes]},
+    }
+
+
+class SearchByTermTestCase(TestCase):
+    form_data = {
+        "q": "steel",
+        "sort": "ranking",
+        "sort_order": "desc",
+        "page": 2,
+        "toggle_headings": "0",
+    }
+
+    def test_search_by_term(self):
+        hit = {
+            "_index": "commodity-20200101000000",
+            "_id": "1",
+            "_score": 1,
+            "_source": {"commodity_code": "7208000000", "hierarchy_context": "[]"},
+        }
+        index_buckets = [
+            _get_index_bucket("chapter-20200101000000", ["72", "73"], ["7200", "7300"]),
+            _get_index_bucket("commodity-20200101000000", ["72"], ["7208", "7209"]),
+        ]
+
+        with mock.patch.object(
+            helpers.Search,
+            "execute",
+            autospec=True,
+            side_effect=lambda search: _get_response(search, [hit], 42, index_buckets),
+        ) as mock_execute:
+            context = helpers.search_by_term(form_data=self.form_data)
+
+        mock_execute.assert_called_once()
+        request_body = mock_execute.call_args[0][0].to_dict()
+        self.assertEqual(request_body["from"], 20)
+        self.assertEqual(request_body["size"], 20)
+        self.assertTrue(request_body["track_total_hits"])
+        self.assertIn("indices", request_body["aggs"])
+
+        self.assertEqual(len(context["results"]), 1)
+        self.assertEqual(context["results"][0]["hierarchy_context"], [])
+        self.assertEqual(context["total_results"], 42)
+        self.assertEqual(context["total_pages"], 3)
+        self.assertEqual(context["page_range_start"], 20)
+        self.assertEqual(context["page_range_end"], 21)
+        # chapters 72 and 73, headings 7208 and 7209
+        self.assertEqual(context["group_result_count"], 4)
+        self.assertFalse(context["no_results"])
+
+    def test_search_by_term_hierarchy_context_object(self):
+        hierarchy_context = [[{"type": "chapter", "commodity_code": "7200000000"}]]
+        hit = {
+            "_index": "commodity-20200101000000",
+            "_id": "1",
+            "_score": 1,
+            "_source": {
+                "commodity_code": "7208000000",
+                "hierarchy_context": hierarchy_context,
+            },
+        }
+
+        with mock.patch.object(
+            helpers.Search,
+            "execute",
+            autospec=True,
+            side_effect=lambda search: _get_response(search, [hit], 1, []),
+        ):
+            context = helpers.search_by_term(form_data=self.form_data)
+
+        self.assertEqual(context["results"][0]["hierarchy_context"], hierarchy_context)
+
+    def test_search_by_term_no_results(self):
+        with mock.patch.object(
+            helpers.Search,
+            "execute",
+            autospec=True,
+            side_effect=lambda search: _get_response(search, [], 0, []),
+        ):
+            context = helpers.search_by_term(form_data=self.form_data)
+
+        self.assertEqual(context["total_results"], 0)
+        self.assertEqual(context["group_result_count"], 0)
+        self.assertTrue(context["no_results"])
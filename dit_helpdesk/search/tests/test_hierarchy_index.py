@@ -0,0 +1,128 @@
+from mixer.backend.django import mixer
+
+from django.test import TestCase
+
+from commodities.models import Commodity
+from hierarchy.helpers import create_nomenclature_tree
+from hierarchy.models import (
+    Chapter,
+    Heading,
+    Section,
+    SubHeading,
+    invalidate_active_trees,
+    invalidate_detail_pages,
+)
+
+from search.hierarchy_index import ROOT_KEY, get_hierarchy_index
+
+
+class HierarchyIndexTestCase(TestCase):
+    def setUp(self):
+        invalidate_active_trees()
+
+        self.tree = create_nomenclature_tree("UK")
+
+        self.section = mixer.blend(Section, section_id=1, nomenclature_tree=self.tree)
+        self.chapter = mixer.blend(
+            Chapter,
+            chapter_code="0100000000",
+            section=self.section,
+            nomenclature_tree=self.tree,
+        )
+        self.heading = mixer.blend(
+            Heading,
+            heading_code="0101000000",
+            chapter=self.chapter,
+            nomenclature_tree=self.tree,
+        )
+        self.subheading = mixer.blend(
+            SubHeading,
+            commodity_code="0101210000",
+            heading=self.heading,
+            parent_subheading=None,
+            leaf=False,
+            nomenclature_tree=self.tree,
+        )
+        self.heading_commodity = mixer.blend(
+            Commodity,
+            commodity_code="0101900000",
+            heading=self.heading,
+            parent_subheading=None,
+            nomenclature_tree=self.tree,
+        )
+        self.child_subheading = mixer.blend(
+            SubHeading,
+            commodity_code="0101290000",
+            heading=None,
+            parent_subheading=self.subheading,
+            leaf=True,
+            nomenclature_tree=self.tree,
+        )
+        self.subheading_commodity = mixer.blend(
+            Commodity,
+            commodity_code="0101210000",
+            heading=None,
+            parent_subheading=self.subheading,
+            nomenclature_tree=self.tree,
+        )
+
+    def test_children(self):
+        hierarchy_index = get_hierarchy_index()
+
+        self.assertEqual(hierarchy_index.children[ROOT_KEY], [self.section])
+        self.assertEqual(
+            hierarchy_index.children[self.heading.hierarchy_key],
+            [self.subheading, self.heading_commodity],
+        )
+        self.assertEqual(
+            hierarchy_index.children[self.subheading.hierarchy_key],
+            [self.subheading_commodity, self.child_subheading],
+        )
+        self.assertEqual(hierarchy_index.chapter_ranges["section-1"], "1")
+
+    def test_get_expanded_context(self):
+        hierarchy_index = get_hierarchy_index()
+
+        self.assertEqual(
+            hierarchy_index.get_expanded_context(self.child_subheading.hierarchy_key),
+            [
+                self.child_subheading.hierarchy_key,
+                self.subheading.hierarchy_key,
+                self.heading.hierarchy_key,
+                self.chapter.hierarchy_key,
+                self.section.hierarchy_key,
+            ],
+        )
+
+    def test_index_built_once_per_tree(self):
+        hierarchy_index = get_hierarchy_index()
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_hierarchy_index(), hierarchy_index)
+
+        # regulation and flag changes only drop the detail pages
+        invalidate_detail_pages()
+        with self.assertNumQueries(0):
+            self.assertIs(get_hierarchy_index(), hierarchy_index)
+
+        invalidate_active_trees()
+        self.assertIsNot(get_hierarchy_index(), hierarchy_index)
+
+    def test_html_items_memoised_across_countries(self):
+        hierarchy_index = get_hierarchy_index()
+
+        html_item = hierarchy_index.get_html_item(self.heading, "au", True)
+        self.assertIn('id="{0}"'.format(self.heading.hierarchy_key), html_item)
+        self.assertIn("app-hierarchy-tree__parent--open", html_item)
+        self.assertIn(self.heading.get_hierarchy_url("au"), html_item)
+
+        with self.assertNumQueries(0):
+            other_html_item = hierarchy_index.get_html_item(self.heading, "FR", True)
+        self.assertEqual(
+            other_html_item,
+            html_item.replace(
+                self.heading.get_hierarchy_url("au"),
+                self.heading.get_hierarchy_url("fr"),
+            ),
+        )
+        self.assertEqual(len(hierarchy_index._html_items), 1)
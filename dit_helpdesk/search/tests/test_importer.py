@@ -0,0 +1,116 @@
+import os
+import tempfile
+
+from mixer.backend.django import mixer
+
+from django.test import TestCase, override_settings
+
+from commodities.models import Commodity
+from hierarchy.helpers import create_nomenclature_tree
+from hierarchy.models import Chapter, Heading, SubHeading
+
+from search.importer import SearchKeywordsImporter
+
+
+class SearchKeywordsImporterTestCase(TestCase):
+    def setUp(self):
+        self.tree = create_nomenclature_tree("UK")
+
+        self.chapter = mixer.blend(
+            Chapter,
+            chapter_code="0100000000",
+            leaf=True,
+            nomenclature_tree=self.tree,
+        )
+        self.heading = mixer.blend(
+            Heading,
+            heading_code="0101000000",
+            chapter=self.chapter,
+            leaf=True,
+            nomenclature_tree=self.tree,
+        )
+        self.subheading = mixer.blend(
+            SubHeading,
+            commodity_code="0101210000",
+            heading=self.heading,
+            parent_subheading=None,
+            leaf=False,
+            nomenclature_tree=self.tree,
+        )
+        self.commodity = mixer.blend(
+            Commodity,
+            commodity_code="0101290000",
+            heading=self.heading,
+            parent_subheading=None,
+            nomenclature_tree=self.tree,
+        )
+        # headings sharing a code, usually differing by productline suffix
+        for _ in range(2):
+            mixer.blend(
+                Heading,
+                heading_code="0202000000",
+                leaf=True,
+                nomenclature_tree=self.tree,
+            )
+
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.data_dir.cleanup)
+
+    def import_keywords(self, rows):
+        with open(os.path.join(self.data_dir.name, "keywords.csv"), "w") as f:
+            f.write("Code,final_category,ranking_score\n")
+            for row in rows:
+                f.write(",".join(str(value) for value in row) + "\n")
+
+        with override_settings(SEARCH_DATA_PATH=self.data_dir.name + "/{0}"):
+            importer = SearchKeywordsImporter()
+            importer.load("keywords.csv")
+            importer.process()
+
+        return importer
+
+    def test_import_keywords(self):
+        self.import_keywords(
+            [
+                (100000000, "animals", 1),
+                (101000000, "horses", 2),
+                (101000000, "donkeys", 3),
+                (101210000, "pure-bred", 4),
+                (101290000, "other", 5),
+                (9999000000, "unknown", 6),
+            ]
+        )
+
+        self.chapter.refresh_from_db()
+        self.assertEqual(self.chapter.keywords, "animals")
+        self.assertEqual(self.chapter.ranking, 1)
+        self.assertFalse(self.chapter.leaf)
+
+        self.heading.refresh_from_db()
+        self.assertEqual(self.heading.keywords, "horses donkeys")
+        self.assertEqual(self.heading.ranking, 3)
+        self.assertFalse(self.heading.leaf)
+
+        self.subheading.refresh_from_db()
+        self.assertEqual(self.subheading.keywords, "pure-bred")
+        self.assertEqual(self.subheading.ranking, 4)
+        self.assertTrue(self.subheading.leaf)
+
+        self.commodity.refresh_from_db()
+        self.assertEqual(self.commodity.keywords, "other")
+        self.assertEqual(self.commodity.ranking, 5)
+
+    def test_import_keywords_skips_multiple_objects(self):
+        self.import_keywords([(202000000, "meat", 1)])
+
+        self.assertFalse(
+            Heading.objects.filter(heading_code="0202000000", keywords="meat").exists()
+        )
+
+    def test_import_keywords_number_of_queries(self):
+        rows = [(100000000, "animals", 1), (101000000, "horses", 2)]
+
+        # loading the objects of each model, then finding the parents among the children
+        # of the chapter and the heading and updating them
+        with self.assertNumQueries(4 + 2 + 3):
+            self.import_keywords(rows)
@@ -0,0 +1,105 @@
+from unittest import mock
+
+import pandas as pd
+
+from django.test import TestCase
+
+from search import search_keyword_generator
+from search.search_keyword_generator import KEYWORD_COLUMNS, SearchKeywordGenerator
+
+
+STOP_WORDS = {"and", "of", "the", "for", "or", "other", "with"}
+
+SEARCHED_WORDS = ["horse", "cattle", "live animal", "fresh", "pure-bred"]
+
+DESCRIPTIONS = [
+    "Live horses, asses, mules and hinnies",
+    "Pure-bred breeding animals (for 2 years or less)",
+    "Live bovine animals; cattle, other than pure-bred",
+    "Meat of bovine animals, fresh or chilled",
+    "Horses and other live animals, for the horse trade",
+    "",
+]
+
+
+class FakeLemma:
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        return self._name
+
+
+class FakeSynset:
+    def __init__(self, *names):
+        self._names = names
+
+    def lemmas(self):
+        return [FakeLemma(name) for name in self._names]
+
+
+class FakeWordNet:
+    def synsets(self, word):
+        return [FakeSynset(word, f"{word}_like"), FakeSynset(f"{word}_kind")]
+
+
+class SearchKeywordGeneratorTestCase(TestCase):
+    def setUp(self):
+        search_keyword_generator.get_synonyms.cache_clear()
+        self.addCleanup(search_keyword_generator.get_synonyms.cache_clear)
+
+        mock_get_wordnet = mock.patch(
+            "search.search_keyword_generator.get_wordnet", return_value=FakeWordNet()
+        )
+        mock_get_wordnet.start()
+        self.addCleanup(mock_get_wordnet.stop)
+
+    def get_generator(self):
+        # skips reading the input files
+        generator = SearchKeywordGenerator.__new__(SearchKeywordGenerator)
+        generator.stop_words = STOP_WORDS
+        generator.subhead = pd.DataFrame({"Col7": DESCRIPTIONS})
+        generator.google_analytics_searched_words = pd.DataFrame(
+            {"Search Term": SEARCHED_WORDS}
+        )
+        generator.searched_words = generator.get_searched_words()
+        generator.searched_pair_words = generator.get_searched_pair_words()
+        generator.searched_word_set = set(generator.searched_words)
+        generator.searched_pair_word_set = set(generator.searched_pair_words)
+
+        return generator
+
+    def assert_same_keyword_columns(self, **kwargs):
+        by_row_generator = self.get_generator()
+        by_row_generator.create_clean_content_by_row()
+
+        generator = self.get_generator()
+        generator.create_clean_content(**kwargs)
+
+        for column in KEYWORD_COLUMNS:
+            self.assertEqual(
+                list(generator.subhead[column]),
+                list(by_row_generator.subhead[column]),
+                column,
+            )
+
+    def test_create_clean_content(self):
+        self.assert_same_keyword_columns()
+
+    def test_create_clean_content_batches(self):
+        self.assert_same_keyword_columns(batch_size=4)
+
+    def test_create_clean_content_workers(self):
+        self.assert_same_keyword_columns(workers=2, batch_size=2)
+
+    @mock.patch("search.search_keyword_generator.SYNONYM_LIMIT", 3)
+    def test_create_clean_content_synonyms(self):
+        self.assert_same_keyword_columns()
+        self.assert_same_keyword_columns(workers=2, batch_size=2)
+
+        generator = self.get_generator()
+        generator.create_clean_content()
+        self.assertEqual(
+            generator.subhead["searched_unique_single_word_synonym"][0],
+            "horse horse_like horse_kind",
+        )
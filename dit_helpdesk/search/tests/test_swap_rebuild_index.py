@@ -0,0 +1,128 @@
+import threading
+
+from unittest import mock
+
+from mixer.backend.django import mixer
+
+from django import db
+from django.test import TestCase
+
+from hierarchy.helpers import create_nomenclature_tree
+from hierarchy.models import Section
+from search.documents.section import SectionDocument
+from search.management.commands.swap_rebuild_index import (
+    bulk_load_settings,
+    populate,
+)
+
+
+class BulkLoadSettingsTestCase(TestCase):
+    def setUp(self):
+        self.es = mock.Mock()
+        self.es.indices.get_settings.return_value = {
+            "section-1": {
+                "settings": {
+                    "index": {"refresh_interval": "30s", "number_of_replicas": "1"}
+                }
+            }
+        }
+
+    def test_settings_restored(self):
+        with bulk_load_settings(self.es, "section-1"):
+            self.es.indices.put_settings.assert_called_once_with(
+                index="section-1",
+                body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}},
+            )
+
+        self.es.indices.put_settings.assert_called_with(
+            index="section-1",
+            body={"index": {"refresh_interval": "30s", "number_of_replicas": "1"}},
+        )
+        self.es.indices.refresh.assert_called_once_with(index="section-1")
+
+    def test_default_refresh_interval_restored_on_error(self):
+        del self.es.indices.get_settings.return_value["section-1"]["settings"]["index"][
+            "refresh_interval"
+        ]
+
+        with self.assertRaises(ValueError):
+            with bulk_load_settings(self.es, "section-1"):
+                raise ValueError
+
+        self.es.indices.put_settings.assert_called_with(
+            index="section-1",
+            body={"index": {"refresh_interval": None, "number_of_replicas": "1"}},
+        )
+
+
+class PopulateTestCase(TestCase):
+    def setUp(self):
+        self.doc_inst = mock.Mock()
+        self.doc_inst.update.side_effect = lambda objects, **kwargs: list(objects)
+        self.qs = self.doc_inst.get_queryset.return_value
+        self.qs.__iter__ = mock.Mock(return_value=iter(range(3)))
+        self.qs.iterator.return_value = iter(range(5))
+
+    def test_populate(self):
+        self.assertEqual(populate(self.doc_inst), 3)
+        self.qs.iterator.assert_not_called()
+
+    def test_populate_parallel(self):
+        self.doc_inst._get_actions.side_effect = lambda objects, action: [
+            (action, obj) for obj in objects
+        ]
+
+        self.assertEqual(
+            populate(self.doc_inst, parallel=True, workers=2, chunk_size=2), 5
+        )
+
+        self.qs.iterator.assert_called_once_with(chunk_size=2)
+        self.doc_inst.update.assert_not_called()
+        self.assertEqual(
+            self.doc_inst.parallel_bulk.call_args_list,
+            [
+                mock.call(
+                    [("index", 0), ("index", 1), ("index", 2), ("index", 3)],
+                    thread_count=2,
+                    chunk_size=2,
+                ),
+                mock.call([("index", 4)], thread_count=2, chunk_size=2),
+            ],
+        )
+
+
+class PopulateUncommittedTreeTestCase(TestCase):
+    def test_populate_parallel_in_uncommitted_tree(self):
+        # the tree and its objects are only visible to the connection of this test's
+        # transaction, as they are to the rebuild's
+        tree = create_nomenclature_tree("UK")
+        sections = mixer.cycle(3).blend(Section, nomenclature_tree=tree)
+
+        sent_actions = []
+
+        def parallel_bulk(client, actions, **kwargs):
+            # like the elasticsearch helper, consume the actions from another thread
+            def send():
+                try:
+                    sent_actions.extend(actions)
+                finally:
+                    db.connection.close()
+
+            thread = threading.Thread(target=send)
+            thread.start()
+            thread.join()
+
+            return iter([])
+
+        with mock.patch(
+            "django_elasticsearch_dsl.documents.parallel_bulk", parallel_bulk
+        ):
+            indexed = populate(
+                SectionDocument(), parallel=True, workers=2, chunk_size=2
+            )
+
+        self.assertEqual(indexed, 3)
+        self.assertEqual(
+            sorted(action["_id"] for action in sent_actions),
+            sorted(section.pk for section in sections),
+        )
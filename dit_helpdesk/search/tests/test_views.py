@@ -5,17 +5,27 @@ from unittest import mock
 
 from django.conf import settings
 from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import connection
 from django.test import TestCase, RequestFactory, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from elasticsearch_dsl.response import Response
 from mixer.backend.django import mixer
 
 from commodities.models import Commodity
-from hierarchy.models import Section, Chapter, Heading, SubHeading
+from hierarchy.models import (
+    Section,
+    Chapter,
+    Heading,
+    SubHeading,
+    invalidate_active_trees,
+)
 from hierarchy.helpers import create_nomenclature_tree
 from hierarchy.views import _commodity_code_html
 from search.forms import CommoditySearchForm
 from search.views import search_hierarchy
-from search.helpers import process_commodity_code
+from search import helpers
+from search.helpers import hierarchy_data, process_commodity_code
 
 from search.documents.section import INDEX as section_index
 from search.documents.chapter import INDEX as chapter_index
@@ -37,6 +47,9 @@ logger = logging.getLogger(__name__)
 
 class CommoditySetupTestCase(TestCase):
     def setUp(self):
+        # the hierarchy index is only rebuilt when a tree is activated
+        invalidate_active_trees()
+
         self.tree = create_nomenclature_tree("UK")
         self.section = mixer.blend(
             Section,
@@ -212,7 +225,7 @@ class CommoditySearchViewTestCase(CommoditySetupTestCase):
             hits = [mock_hit for _ in range(10)]
             mock_search_by_term.return_value = {
                 "results": hits,
-                "_all_results": hits,
+                "group_result_count": 2,
                 "page_range_start": 1,
                 "page_range_end": 1,
                 "total_pages": 1,
@@ -245,7 +258,7 @@ class CommoditySearchViewTestCase(CommoditySetupTestCase):
 
             mock_search_by_term.return_value = {
                 "results": [],
-                "_all_results": [],
+                "group_result_count": 0,
                 "page_range_start": 1,
                 "page_range_end": 1,
                 "total_pages": 1,
@@ -281,6 +294,62 @@ class CommoditySearchViewTestCase(CommoditySetupTestCase):
         )
         self.assertEqual(response.context["title_suffix"], " (no results)")
 
+    def _get_results_page(self, objects):
+        hits = [
+            {
+                "_index": f"{type(obj).__name__.lower()}-20200101000000",
+                "_id": str(obj.goods_nomenclature_sid),
+                "_score": 1,
+                "_source": {
+                    "id": obj.goods_nomenclature_sid,
+                    "commodity_code": obj.commodity_code,
+                    "description": obj.description,
+                    "hierarchy_context": "[]",
+                },
+            }
+            for obj in objects
+        ]
+        response_body = {
+            "hits": {
+                "total": {"value": len(hits), "relation": "eq"},
+                "hits": hits,
+            },
+            "aggregations": {"indices": {"buckets": []}},
+        }
+
+        with mock.patch("search.views.track_event"), mock.patch.object(
+            helpers.Search,
+            "execute",
+            autospec=True,
+            side_effect=lambda search: Response(search, response_body),
+        ):
+            return self.client.get(
+                self.url,
+                data={
+                    "q": "paper",
+                    "toggle_headings": 0,
+                    "sort": "ranking",
+                    "sort_order": "desc",
+                    "country": "au",
+                    "page": 1,
+                },
+            )
+
+    def test_search_view_number_of_queries(self):
+        # a heading and a subheading hit, a query per index
+        self._get_results_page([self.headings[0], self.parent_subheadings[0]])
+        with CaptureQueriesContext(connection) as queries:
+            self._get_results_page([self.headings[0], self.parent_subheadings[0]])
+
+        objects = [self.headings[0], self.headings[10]] + self.parent_subheadings
+        with self.assertNumQueries(len(queries)):
+            response = self._get_results_page(objects)
+
+        self.assertEqual(
+            [result["commodity_code_html"] for result in response.context["results"]],
+            [_commodity_code_html(obj) for obj in objects],
+        )
+
 
 class CommodityTermSearchAPIViewTestCase(CommoditySetupTestCase):
     """
@@ -524,6 +593,8 @@ class TestHierarchyData(TestCase):
         relationships between the three model instances
         :return:
         """
+        invalidate_active_trees()
+
         self.tree = create_nomenclature_tree(region="UK")
 
         self.section = create_instance(
@@ -645,6 +716,19 @@ class TestHierarchyData(TestCase):
             response.context["country_code"], settings.TEST_COUNTRY_CODE.lower()
         )
 
+    def test_hierarchy_data_number_of_queries(self):
+        subheading_id = SubHeading.objects.get(
+            commodity_code="0101210000"
+        ).goods_nomenclature_sid
+        node_id = "sub_heading-{0}".format(subheading_id)
+        hierarchy_data("au", node_id)
+
+        # the hierarchy index is only built once per tree
+        with self.assertNumQueries(0):
+            hierarchy_html = hierarchy_data("au", node_id)
+            hierarchy_data("au", node_id, content_type="json")
+        self.assertInHTML(settings.TEST_SUBHEADING_DESCRIPTION, hierarchy_html)
+
 
 class TestSearchHierarchyAPITestCase(CommoditySetupTestCase):
     """
@@ -14,8 +14,6 @@ from django_ga_measurement_protocol.track import track_event
 from django_elasticsearch_dsl_drf.viewsets import DocumentViewSet
 
 from countries.models import Country
-from hierarchy.models import Chapter, Heading
-from hierarchy.views import _commodity_code_html
 from search import helpers
 
 from search.documents.commodity import CommodityDocument
@@ -113,17 +111,6 @@ class CommoditySearchView(FormView):
                 term_search_context = helpers.search_by_term(form_data=form_data)
                 context.update(term_search_context)
 
-                hits = term_search_context["_all_results"]
-
-                # since we are supplying hits the function will not hit ES again
-                grouped_search_context = helpers.group_search_by_term(
-                    form_data, hits=hits
-                )
-
-                context["group_result_count"] = grouped_search_context[
-                    "group_result_count"
-                ]
-
                 curr_url_items = dict((x, y) for x, y in request.GET.items())
 
                 next_urls_items = curr_url_items.copy()
@@ -157,15 +144,15 @@ class CommoditySearchView(FormView):
                     value=total_results,
                 )
 
-                for hit in context["results"]:
-                    if isinstance(hit["commodity_code"], str):
-                        try:
-                            item = helpers.get_object_from_hit(hit)
-                        except helpers.ObjectNotFoundFromHit:
-                            item = None
-
-                        hit.meta["index"] = helpers.get_alias_from_hit(hit)
-                        hit["commodity_code_html"] = _commodity_code_html(item)
+                hits = [
+                    hit
+                    for hit in context["results"]
+                    if isinstance(hit["commodity_code"], str)
+                ]
+                items = helpers.get_objects_from_hits(hits)
+                for hit, item in zip(hits, items):
+                    hit.meta["index"] = helpers.get_alias_from_hit(hit)
+                    hit["commodity_code_html"] = helpers.get_commodity_code_html(item)
 
                 return self.render_to_response(context)
 
@@ -206,7 +193,10 @@ def _construct_result(item):
         "description": item.description,
         "id": item.goods_nomenclature_sid,
         "commodity_code": item.commodity_code,
-        "commodity_code_html": _commodity_code_html(item, ignore_duplicate=False),
+        # annotated by `get_group_objects`
+        "commodity_code_html": helpers.get_commodity_code_html(
+            item, ignore_duplicate=False
+        ),
     }
 
     return result
@@ -279,26 +269,11 @@ class GroupedCommoditySearchView(FormView):
 
                 context.update(grouped_context)
 
-                chapters = (
-                    Chapter.objects.filter(
-                        chapter_code__in=grouped_context["group_chapters"]
-                    )
-                    .order_by("chapter_code")
-                    .all()
-                )
-
-                headings = (
-                    Heading.objects.filter(
-                        heading_code__in=grouped_context["group_headings"]
-                    )
-                    .order_by("heading_code")
-                    .all()
+                chapters_dict, headings_dict = helpers.get_group_objects(
+                    grouped_context["group_chapters"],
+                    grouped_context["group_headings"],
                 )
 
-                # to facilitate lookup
-                chapters_dict = {ch.chapter_code: ch for ch in chapters}
-                headings_dict = {h.heading_code: h for h in headings}
-
                 results = []
                 for chapter_code in chapter_sort_order:
                     chapter = chapters_dict[chapter_code]
@@ -3,6 +3,7 @@ import json
 import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from django.apps import apps
@@ -15,7 +16,7 @@ from commodities.models import Commodity
 from hierarchy.clients import get_hierarchy_client
 from hierarchy.models import Section, Chapter, Heading, SubHeading, NomenclatureTree
 from hierarchy.helpers import create_nomenclature_tree, fill_tree_in_json_data
-from .utils import createDir
+from .utils import createDir, get_host_rate_limiter, iter_json_array
 
 logger = logging.getLogger(__name__)
 logging.disable(logging.NOTSET)
@@ -24,6 +25,9 @@ logger.setLevel(logging.INFO)
 
 DEFAULT_REGION = settings.PRIMARY_REGION
 
+BULK_CREATE_BATCH_SIZE = 1000
+BULK_UPDATE_BATCH_SIZE = 1000
+
 
 # When an item in the hierarchy is missing a description in the data provided by the trade-tariff-api, we can manually
 # patch it in using the following variable. Check Check-How-To-Export-Goods (CHEG)
@@ -87,6 +91,9 @@ class HierarchyBuilder:
         self.hierarchy_client_not_found_errors = []
         self.hierarchy_client_server_errors = []
 
+        # model name -> {goods_nomenclature_sid: pk} for the objects already created
+        self.sid_index = {}
+
     @property
     def new_tree(self):
         """Sometimes HierarchyBuilder is used without having to create new objects, so the
@@ -116,6 +123,22 @@ class HierarchyBuilder:
 
         return json_data
 
+    def iter_data(self, model_name, tree: Optional[NomenclatureTree] = None):
+        """
+        given a model name stream json data from the file system to import one record at a time
+        :param model_name:
+        :param tree: tree the records are assigned to
+        :return: generator of records
+        """
+
+        file_name = settings.HIERARCHY_MODEL_MAP[model_name]["file_name"]
+        file_path = self.get_data_path(file_name)
+
+        for data in iter_json_array(file_path):
+            if tree:
+                data["nomenclature_tree_id"] = tree.pk
+            yield data
+
     @staticmethod
     def rename_key(old_dict, old_name, new_name):
         """
@@ -205,23 +228,26 @@ class HierarchyBuilder:
         :param model: model type of instance being created
         :return: parent instance for the moel being created
         """
-        parent = None
+        parent_model = parent_pk = None
         if model is Chapter:
-            parent = self.lookup_parent(Section, data["goods_nomenclature_sid"])
+            parent_model = Section
+            parent_pk = self.lookup_parent_pk(Section, data["goods_nomenclature_sid"])
 
         elif model is Heading:
-            parent = self.lookup_parent(Chapter, data["parent_goods_nomenclature_sid"])
+            parent_model = Chapter
+            parent_pk = self.lookup_parent_pk(
+                Chapter, data["parent_goods_nomenclature_sid"]
+            )
 
         elif model is SubHeading:
-            parent = self.lookup_parent(Heading, data["goods_nomenclature_sid"])
+            parent_model = Heading
+            parent_pk = self.lookup_parent_pk(Heading, data["goods_nomenclature_sid"])
 
         elif model is Commodity:
-            try:
-                parent = self.lookup_parent(Heading, data["goods_nomenclature_sid"])
-            except ObjectDoesNotExist as exception:
-                logger.info("No Heading for commodity: {0}".format(exception.args))
-                parent = self.lookup_parent(SubHeading, data["goods_nomenclature_sid"])
-        return parent
+            parent_model = Heading
+            parent_pk = self.lookup_parent_pk(Heading, data["goods_nomenclature_sid"])
+
+        return parent_model(pk=parent_pk) if parent_pk is not None else None
 
     def data_scanner(self, model_names=None):
         """
@@ -237,32 +263,43 @@ class HierarchyBuilder:
         for model_name in model_names:
             logger.info("creating {0} instances".format(model_name))
 
-            json_data = self.load_data(model_name)
-
             model = apps.get_model(
                 app_label=settings.HIERARCHY_MODEL_MAP[model_name]["app_name"],
                 model_name=model_name,
             )
 
-            for data in json_data:
+            # records are read and created in batches rather than all at once, Sections are
+            # the exception as their list of children is needed to find the Chapters' parents
+            self.data[model_name] = {"data": [], "objects": []}
+            data_count = instance_count = 0
+            for data in self.iter_data(model_name, self.new_tree):
+                data_count += 1
+                if model is Section:
+                    self.data[model_name]["data"].append(data)
+
                 instance = self.instance_builder(model, data)
                 if isinstance(instance, model):
                     logger.info("CODE: storing instance {0}".format(str(instance)))
                     self.data[model_name]["objects"].append(instance)
+                    instance_count += 1
+
+                if len(self.data[model_name]["objects"]) >= BULK_CREATE_BATCH_SIZE:
+                    model.all_objects.bulk_create(self.data[model_name]["objects"])
+                    self.data[model_name]["objects"] = []
 
             logger.info(
                 "CODE: model data items {0} == model instances {1}".format(
-                    len(self.data[model_name]["data"]),
-                    len(self.data[model_name]["objects"]),
+                    data_count, instance_count
                 )
             )
 
-            if len(self.data[model_name]["data"]) == len(
-                self.data[model_name]["objects"]
-            ):
+            if data_count == instance_count:
                 logger.info("CODE: creating instances")
                 model.all_objects.bulk_create(self.data[model_name]["objects"])
+                self.data[model_name]["objects"] = []
+                self.build_sid_index(model)
             else:
+                # batches already created are rolled back with the surrounding transaction
                 sys.exit()
 
     def load_data(self, model_name):
@@ -359,18 +396,33 @@ class HierarchyBuilder:
         if data_type not in data_type_mapper:
             raise ValueError(f"Invalid data type {data_type}")
 
-        for item_id in item_ids:
+        rate_limiter = get_host_rate_limiter(
+            hierarchy_client.base_url, settings.TRADE_TARIFF_API_RATE_LIMIT
+        )
+
+        def _get_item_data(item_id):
+            rate_limiter.wait()
             try:
-                item_json = hierarchy_client.get_item_data(
+                return hierarchy_client.get_item_data(
                     data_type_mapper[data_type], item_id
                 )
             except hierarchy_client.NotFound as e:
                 self.hierarchy_client_not_found_errors.append(e)
                 logger.debug("Not found", exc_info=e)
-                continue
             except hierarchy_client.ServerError as e:
                 self.hierarchy_client_server_errors.append(e)
                 logger.debug("Server error", exc_info=e)
+
+            return None
+
+        # `map` keeps the results in the same order as `item_ids`
+        with ThreadPoolExecutor(
+            max_workers=settings.TRADE_TARIFF_API_DOWNLOAD_WORKERS
+        ) as executor:
+            items_json = list(executor.map(_get_item_data, item_ids))
+
+        for item_json in items_json:
+            if item_json is None:
                 continue
 
             data.append(item_json)
@@ -437,6 +489,9 @@ class HierarchyBuilder:
                             if item["type"] == "chapter"
                         ],
                         "position": section["data"]["attributes"]["position"],
+                        "section_note": section["data"]["attributes"].get(
+                            "section_note"
+                        ),
                     }
                 )
 
@@ -904,6 +959,57 @@ class HierarchyBuilder:
                     logger.debug("{0} lookup parent:{1} ".format(item, exception.args))
                     return None
 
+    def build_sid_index(self, model):
+        """
+        build an in-memory index of the objects of a model in the tree being built so parents can be
+        resolved without a query per child
+        - for Sections it maps the `goods_nomenclature_sid` of each child in `child_goods_nomenclature_sids`
+        to the Section's pk
+        - for the other models it maps `goods_nomenclature_sid` to pk
+        :param model: model to index
+        :return: the index
+        """
+        objects = model.get_active_objects(region=self.region)
+
+        if model is Section:
+            section_pks = dict(objects.values_list("section_id", "pk"))
+            index = {}
+            for item in self.data["Section"]["data"]:
+                section_pk = section_pks.get(int(item["section_id"]))
+                for child_sid in item["child_goods_nomenclature_sids"]:
+                    index.setdefault(str(child_sid), section_pk)
+        else:
+            index = dict(objects.values_list("goods_nomenclature_sid", "pk"))
+
+        self.sid_index[model.__name__] = index
+
+        return index
+
+    def get_sid_index(self, model):
+        try:
+            return self.sid_index[model.__name__]
+        except KeyError:
+            return self.build_sid_index(model)
+
+    def lookup_parent_pk(self, parent_model, child_parent_code):
+        """
+        find the pk of a parent instance, using the in-memory index when the parent model has already
+        been created by `data_scanner` and falling back to `lookup_parent` otherwise
+        :param parent_model: Parent model
+        :param child_parent_code: parent code from child data
+        :return: pk of the parent or None
+        """
+        try:
+            index = self.sid_index[parent_model.__name__]
+        except KeyError:
+            if not self.data[parent_model.__name__]["data"]:
+                return None
+
+            parent = self.lookup_parent(parent_model, child_parent_code)
+            return parent.pk if parent else None
+
+        return index.get(str(child_parent_code))
+
     def build_search_data(self):
         hierarchy_model_map = settings.HIERARCHY_MODEL_MAP
         file_list = [
@@ -970,34 +1076,32 @@ class HierarchyBuilder:
             heading_id=None, parent_subheading_id=None
         )
 
+        subheading_pks = self.get_sid_index(SubHeading)
+        heading_pks = self.get_sid_index(Heading)
+
         count = 0
+        updated_subheadings = []
         for subheading in subheadings:
             parent_sid = subheading.parent_goods_nomenclature_sid
-            try:
-                parent = SubHeading.get_active_objects(region=self.region).get(
-                    goods_nomenclature_sid=parent_sid
-                )
-                subheading.parent_subheading_id = parent.pk
-                subheading.save()
-            except ObjectDoesNotExist as exception:
+            if parent_sid in subheading_pks:
+                subheading.parent_subheading_id = subheading_pks[parent_sid]
+                updated_subheadings.append(subheading)
+            elif parent_sid in heading_pks:
+                logger.info("{0} has no parent SubHeading".format(subheading))
+                subheading.heading_id = heading_pks[parent_sid]
+                updated_subheadings.append(subheading)
+            else:
                 logger.info(
-                    "{0} has no parent SubHeading {1}".format(
-                        subheading, exception.args
-                    )
+                    "{0} has no parent SubHeading or Heading".format(subheading)
                 )
-                try:
-                    parent = Heading.get_active_objects(region=self.region).get(
-                        goods_nomenclature_sid=parent_sid
-                    )
-                    subheading.heading_id = parent.pk
-                    subheading.save()
-                except ObjectDoesNotExist as exception:
-                    logger.info(
-                        "{0} has no parent Heading {1}".format(
-                            subheading, exception.args
-                        )
-                    )
             count = count + 1
+
+        SubHeading.all_objects.bulk_update(
+            updated_subheadings,
+            ["parent_subheading_id", "heading_id"],
+            batch_size=BULK_UPDATE_BATCH_SIZE,
+        )
+
         return count
 
     def process_orphaned_commodities(self, skip_commodity=False):
@@ -1012,39 +1116,55 @@ class HierarchyBuilder:
             heading_id=None, parent_subheading_id=None
         )
 
+        subheading_pks = self.get_sid_index(SubHeading)
+        heading_pks = self.get_sid_index(Heading)
+        subheading_sids = dict(
+            SubHeading.get_active_objects(region=self.region).values_list(
+                "commodity_code", "goods_nomenclature_sid"
+            )
+        )
+        heading_sids = dict(
+            Heading.get_active_objects(region=self.region).values_list(
+                "heading_code", "goods_nomenclature_sid"
+            )
+        )
+
+        updated_commodities = []
         for commodity in commodities:
             parent_sid = commodity.parent_goods_nomenclature_sid
+            parent_code = commodity.parent_goods_nomenclature_item_id
 
-            try:
-                if parent_sid is None:
-                    subheading = SubHeading.get_active_objects(region=self.region).get(
-                        commodity_code=commodity.parent_goods_nomenclature_item_id
-                    )
-                    parent_sid = subheading.goods_nomenclature_sid
-
-                parent = SubHeading.get_active_objects(region=self.region).get(
-                    goods_nomenclature_sid=parent_sid
-                )
-                commodity.parent_subheading_id = parent.pk
+            if parent_sid is None:
+                parent_sid = subheading_sids.get(parent_code)
 
-            except ObjectDoesNotExist as exception:
+            if parent_sid in subheading_pks:
+                commodity.parent_subheading_id = subheading_pks[parent_sid]
+            else:
                 if skip_commodity:
                     continue
                 logger.debug(
-                    "Commodity {0} has no subheading parent parant {1}".format(
-                        commodity, exception.args
+                    "Commodity {0} has no subheading parent {1}".format(
+                        commodity, parent_sid
                     )
                 )
 
                 if parent_sid is None:
-                    heading = Heading.get_active_objects(region=self.region).get(
-                        heading_code=commodity.parent_goods_nomenclature_item_id
+                    if parent_code not in heading_sids:
+                        raise Heading.DoesNotExist(
+                            f"No Heading with heading_code {parent_code}"
+                        )
+                    parent_sid = heading_sids[parent_code]
+
+                if parent_sid not in heading_pks:
+                    raise Heading.DoesNotExist(
+                        f"No Heading with goods_nomenclature_sid {parent_sid}"
                     )
-                    parent_sid = heading.goods_nomenclature_sid
+                commodity.heading_id = heading_pks[parent_sid]
 
-                parent = Heading.get_active_objects(region=self.region).get(
-                    goods_nomenclature_sid=parent_sid
-                )
-                commodity.heading_id = parent.pk
+            updated_commodities.append(commodity)
 
-            commodity.save()
+        Commodity.all_objects.bulk_update(
+            updated_commodities,
+            ["parent_subheading_id", "heading_id"],
+            batch_size=BULK_UPDATE_BATCH_SIZE,
+        )
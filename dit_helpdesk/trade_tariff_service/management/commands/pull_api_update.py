@@ -3,6 +3,7 @@ import logging
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
+from hierarchy.clients import get_session_stats
 from trade_tariff_service.HierarchyBuilder import HierarchyBuilder
 
 logger = logging.getLogger(__name__)
@@ -19,3 +20,5 @@ class Command(BaseCommand):
         logger.info(f"Pulling API data for {settings.SECONDARY_REGION}")
         builder = HierarchyBuilder(region=settings.SECONDARY_REGION)
         builder.save_trade_tariff_service_api_data_json_to_file()
+
+        logger.info(f"API connection stats: {get_session_stats()}")
@@ -6,7 +6,11 @@ from django.conf import settings
 from django.utils import timezone
 
 from hierarchy.models import NomenclatureTree
-from hierarchy.helpers import create_nomenclature_tree
+from hierarchy.helpers import (
+    build_ancestor_paths,
+    build_hierarchy_contexts,
+    create_nomenclature_tree,
+)
 from trade_tariff_service.HierarchyBuilder import HierarchyBuilder
 
 logger = logging.getLogger(__name__)
@@ -53,6 +57,8 @@ class Command(BaseCommand):
                 builder.data_scanner(model_names)
                 builder.process_orphaned_subheadings()
                 builder.process_orphaned_commodities(options["skip_commodity"])
+                build_ancestor_paths(builder.new_tree)
+                build_hierarchy_contexts(builder.new_tree)
 
                 if not options["activate_new_tree"]:
                     # switch back active tree to previous since we only want to properly activate
@@ -72,3 +78,5 @@ class Command(BaseCommand):
                 builder.data_scanner(model_names)
                 builder.process_orphaned_subheadings()
                 builder.process_orphaned_commodities(options["skip_commodity"])
+                build_ancestor_paths(builder.new_tree)
+                build_hierarchy_contexts(builder.new_tree)
@@ -1,10 +1,16 @@
 import logging
 
+from unittest import mock
+
 from django.apps import apps
 from django.conf import settings
 from django.test import override_settings, TestCase
+from mixer.backend.django import mixer
 
 from hierarchy.helpers import create_nomenclature_tree
+from commodities.models import Commodity
+from hierarchy.clients import HierarchyClient
+from hierarchy.models import Chapter, Heading, Section, SubHeading
 from trade_tariff_service.HierarchyBuilder import HierarchyBuilder
 
 logger = logging.getLogger(__name__)
@@ -344,3 +350,261 @@ class HierarchyBuilderTestCase(TestCase):
     #         model.objects.create(**subheading)
     #
     #     self.assertTrue(builder.process_orphaned_subheadings() >= 3)
+
+
+@override_settings(TRADE_TARIFF_API_DOWNLOAD_WORKERS=4, TRADE_TARIFF_API_RATE_LIMIT=0)
+class HierarchyBuilderDownloadTestCase(TestCase):
+    """
+    Test downloading the hierarchy from the API
+    """
+
+    def setUp(self):
+        self.builder = HierarchyBuilder(region="UK")
+
+    def get_heading_json(self, item_id):
+        return {
+            "data": {"id": item_id},
+            "included": [
+                {
+                    "type": "commodity",
+                    "attributes": {"goods_nomenclature_item_id": f"{item_id}000000"},
+                },
+                {
+                    "type": "chapter",
+                    "attributes": {"goods_nomenclature_item_id": "0100000000"},
+                },
+            ],
+        }
+
+    def test_get_item_data_from_api_keeps_order(self):
+        item_ids = [f"01{i:02}" for i in range(20)]
+
+        with mock.patch.object(
+            HierarchyClient,
+            "get_item_data",
+            side_effect=lambda commodity_type, item_id: self.get_heading_json(item_id),
+        ):
+            data, child_ids = self.builder.get_item_data_from_api("headings", item_ids)
+
+        self.assertEqual([item["data"]["id"] for item in data], item_ids)
+        self.assertEqual(child_ids, [f"{item_id}000000" for item_id in item_ids])
+
+    def test_get_item_data_from_api_collects_errors(self):
+        def get_item_data(commodity_type, item_id):
+            if item_id == "0101":
+                raise HierarchyClient.NotFound(item_id)
+            if item_id == "0102":
+                raise HierarchyClient.ServerError(item_id)
+            return self.get_heading_json(item_id)
+
+        with mock.patch.object(
+            HierarchyClient, "get_item_data", side_effect=get_item_data
+        ):
+            data, child_ids = self.builder.get_item_data_from_api(
+                "headings", ["0101", "0102", "0103"]
+            )
+
+        self.assertEqual([item["data"]["id"] for item in data], ["0103"])
+        self.assertEqual(child_ids, ["0103000000"])
+        self.assertEqual(
+            [str(e) for e in self.builder.hierarchy_client_not_found_errors], ["0101"]
+        )
+        self.assertEqual(
+            [str(e) for e in self.builder.hierarchy_client_server_errors], ["0102"]
+        )
+
+    def test_get_item_data_from_api_invalid_data_type(self):
+        with self.assertRaises(ValueError):
+            self.builder.get_item_data_from_api("sub_chapters", ["01"])
+
+
+class HierarchyBuilderSIDIndexTestCase(TestCase):
+    """
+    Test resolving parents through the in-memory SID index
+    """
+
+    def setUp(self):
+        self.tree = create_nomenclature_tree(region="UK")
+        self.builder = HierarchyBuilder(new_tree=self.tree)
+
+        self.section = mixer.blend(Section, section_id=1, nomenclature_tree=self.tree)
+        self.chapter = mixer.blend(
+            Chapter,
+            chapter_code="0100000000",
+            goods_nomenclature_sid="27623",
+            section=self.section,
+            nomenclature_tree=self.tree,
+        )
+        self.heading = mixer.blend(
+            Heading,
+            heading_code="0101000000",
+            goods_nomenclature_sid="27624",
+            chapter=self.chapter,
+            nomenclature_tree=self.tree,
+        )
+        self.subheading = mixer.blend(
+            SubHeading,
+            commodity_code="0101210000",
+            goods_nomenclature_sid="27625",
+            parent_goods_nomenclature_sid="27624",
+            heading=None,
+            parent_subheading=None,
+            nomenclature_tree=self.tree,
+        )
+
+    def test_build_sid_index_for_section(self):
+        self.builder.data["Section"]["data"] = [
+            {"section_id": 1, "child_goods_nomenclature_sids": [27623, 27700]}
+        ]
+
+        index = self.builder.build_sid_index(Section)
+
+        self.assertEqual(index, {"27623": self.section.pk, "27700": self.section.pk})
+
+    def test_build_sid_index(self):
+        index = self.builder.build_sid_index(Heading)
+
+        self.assertEqual(index, {"27624": self.heading.pk})
+
+    def test_lookup_parent_pk_uses_index(self):
+        self.builder.data["Chapter"]["data"] = [{}]
+        self.builder.build_sid_index(Chapter)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.builder.lookup_parent_pk(Chapter, 27623), self.chapter.pk
+            )
+            self.assertIsNone(self.builder.lookup_parent_pk(Chapter, 99999))
+
+    def test_lookup_parent_pk_without_index(self):
+        self.builder.data["Chapter"]["data"] = [{}]
+
+        self.assertEqual(self.builder.lookup_parent_pk(Chapter, 27623), self.chapter.pk)
+
+    def test_lookup_parent_pk_without_data(self):
+        self.assertIsNone(self.builder.lookup_parent_pk(Chapter, 27623))
+
+    def test_process_orphaned_subheadings(self):
+        child_subheading = mixer.blend(
+            SubHeading,
+            commodity_code="0101210010",
+            goods_nomenclature_sid="27626",
+            parent_goods_nomenclature_sid="27625",
+            heading=None,
+            parent_subheading=None,
+            nomenclature_tree=self.tree,
+        )
+
+        self.assertEqual(self.builder.process_orphaned_subheadings(), 2)
+
+        self.subheading.refresh_from_db()
+        self.assertEqual(self.subheading.heading, self.heading)
+        self.assertIsNone(self.subheading.parent_subheading)
+        child_subheading.refresh_from_db()
+        self.assertEqual(child_subheading.parent_subheading, self.subheading)
+        self.assertIsNone(child_subheading.heading)
+
+    def test_process_orphaned_commodities(self):
+        subheading_commodity = mixer.blend(
+            Commodity,
+            commodity_code="0101210010",
+            parent_goods_nomenclature_sid="27625",
+            heading=None,
+            parent_subheading=None,
+            nomenclature_tree=self.tree,
+        )
+        heading_commodity = mixer.blend(
+            Commodity,
+            commodity_code="0101300000",
+            parent_goods_nomenclature_sid="27624",
+            heading=None,
+            parent_subheading=None,
+            nomenclature_tree=self.tree,
+        )
+
+        self.builder.process_orphaned_commodities()
+
+        subheading_commodity.refresh_from_db()
+        self.assertEqual(subheading_commodity.parent_subheading, self.subheading)
+        heading_commodity.refresh_from_db()
+        self.assertEqual(heading_commodity.heading, self.heading)
+
+    def test_process_orphaned_commodities_skip_commodity(self):
+        heading_commodity = mixer.blend(
+            Commodity,
+            commodity_code="0101300000",
+            parent_goods_nomenclature_sid="27624",
+            heading=None,
+            parent_subheading=None,
+            nomenclature_tree=self.tree,
+        )
+
+        self.builder.process_orphaned_commodities(skip_commodity=True)
+
+        heading_commodity.refresh_from_db()
+        self.assertIsNone(heading_commodity.heading)
+
+
+subsets_hierarchy_model_map = {
+    model_name: {
+        "file_name": item["file_name"].replace("test_prepared", "test_subsets"),
+        "app_name": item["app_name"],
+    }
+    for model_name, item in mock_hierarchy_model_map.items()
+}
+
+
+@override_settings(HIERARCHY_MODEL_MAP=subsets_hierarchy_model_map)
+class HierarchyBuilderDataScannerTestCase(TestCase):
+    """
+    Test creating the hierarchy from the prepared files
+    """
+
+    model_names = ["Section", "Chapter", "Heading", "SubHeading", "Commodity"]
+
+    def setUp(self):
+        self.tree = create_nomenclature_tree(region="UK")
+
+    def get_sids(self, model_name, tree):
+        model = apps.get_model(
+            app_label=subsets_hierarchy_model_map[model_name]["app_name"],
+            model_name=model_name,
+        )
+
+        return sorted(
+            model.all_objects.filter(nomenclature_tree=tree).values_list(
+                "goods_nomenclature_sid", flat=True
+            )
+        )
+
+    def test_iter_data(self):
+        builder = HierarchyBuilder(new_tree=self.tree)
+
+        data = list(builder.iter_data("Chapter", self.tree))
+
+        self.assertEqual(data, builder.file_loader("Chapter", self.tree))
+
+    def test_data_scanner_in_batches(self):
+        HierarchyBuilder(new_tree=self.tree).data_scanner(self.model_names)
+
+        batched_tree = create_nomenclature_tree(region="UK")
+        with mock.patch(
+            "trade_tariff_service.HierarchyBuilder.BULK_CREATE_BATCH_SIZE", 2
+        ):
+            builder = HierarchyBuilder(new_tree=batched_tree)
+            builder.data_scanner(self.model_names)
+
+        for model_name in self.model_names[1:]:
+            self.assertTrue(self.get_sids(model_name, batched_tree))
+            self.assertEqual(
+                self.get_sids(model_name, batched_tree),
+                self.get_sids(model_name, self.tree),
+            )
+            self.assertEqual(builder.data[model_name]["objects"], [])
+
+        self.assertFalse(
+            Chapter.objects.filter(nomenclature_tree=batched_tree, section=None)
+        )
+        self.assertFalse(
+            Heading.objects.filter(nomenclature_tree=batched_tree, chapter=None)
+        )
@@ -1,7 +1,10 @@
 import json
 import logging
 
+from unittest import mock
+
 from django.conf import settings
+from django.template import loader
 from django.test import TestCase
 from mixer.backend.django import mixer
 
@@ -98,6 +101,106 @@ class CommodityJsonTestCase(TestCase):
             self.commodity.tts_obj.get_import_measure_by_id(10, "AF"), None
         )
 
+    def get_country_codes(self):
+        country_codes = set()
+        for measure in self.commodity_data["import_measures"]:
+            geo_area = measure["geographical_area"]
+            country_codes.add(geo_area["id"])
+            country_codes.update(
+                area["id"] for area in geo_area["children_geographical_areas"]
+            )
+            country_codes.update(
+                area["geographical_area_id"] for area in measure["excluded_countries"]
+            )
+
+        return country_codes
+
+    def test_commodity_get_import_measures_matches_every_relevant_measure(self):
+        for country_code in self.get_country_codes():
+            expected_measure_ids = [
+                measure["measure_id"]
+                for measure in self.commodity_data["import_measures"]
+                if ImportMeasureJson(
+                    self.commodity, measure, "", "", country_code
+                ).is_relevant_for_origin_country(country_code)
+            ]
+
+            self.assertEqual(
+                [
+                    measure.measure_id
+                    for measure in self.commodity.tts_obj.get_import_measures(
+                        country_code.lower()
+                    )
+                ],
+                expected_measure_ids,
+            )
+
+    def test_commodity_get_group_import_measures(self):
+        type_ids = {"103", "142", "VTS"}
+
+        for country_code in self.get_country_codes():
+            expected_measure_ids = [
+                measure.measure_id
+                for measure in self.commodity.tts_obj.get_import_measures(country_code)
+                if measure.type_id in type_ids
+                and country_code not in measure.excluded_country_area_ids
+            ]
+
+            self.assertEqual(
+                [
+                    measure.measure_id
+                    for measure in self.commodity.tts_obj.get_group_import_measures(
+                        country_code, type_ids
+                    )
+                ],
+                expected_measure_ids,
+            )
+
+    def test_commodity_measure_index_built_once(self):
+        tts_obj = self.commodity.tts_obj
+
+        self.assertIs(tts_obj.measure_index, tts_obj.measure_index)
+        self.assertEqual(tts_obj.get_import_measures(None), [])
+
+    def get_measures_modals(self, country_code):
+        commodity = Commodity.objects.get(pk=self.commodity.pk)
+        measures = commodity.tts_obj.get_import_measures(country_code)
+        for measure in measures:
+            if measure.num_conditions:
+                measure.conditions_html(lambda *args: "/conditions")
+            if measure.di["order_number"]:
+                measure.quota_html(lambda *args: "/quotas")
+
+        return [measure.measures_modals for measure in measures]
+
+    def test_commodity_measures_modals_rendered_once(self):
+        self.commodity.save_cache()
+
+        # the commodity and the country
+        with self.assertNumQueries(2):
+            measures_modals = self.get_measures_modals("AF")
+        self.assertEqual(len(measures_modals), 9)
+
+        with mock.patch(
+            "trade_tariff_service.tts_api.loader.get_template"
+        ) as mock_get_template, self.assertNumQueries(1):
+            self.assertEqual(self.get_measures_modals("AF"), measures_modals)
+        mock_get_template.assert_not_called()
+
+    def test_commodity_measures_modals_rendered_again_when_updated(self):
+        self.commodity.save_cache()
+        self.get_measures_modals("AF")
+
+        self.commodity.tts_json = json.dumps(self.commodity_data)
+        self.commodity.save_cache()
+
+        with mock.patch(
+            "trade_tariff_service.tts_api.loader.get_template",
+            wraps=loader.get_template,
+        ) as mock_get_template:
+            self.get_measures_modals("AF")
+        mock_get_template.assert_called()
+
     def test_footnotes(self):
         self.assertEqual(
             self.commodity.tts_obj.footnotes, self.commodity_data["footnotes"]
@@ -0,0 +1,98 @@
+import json
+import tempfile
+
+from unittest import mock
+
+from django.test import TestCase
+
+from trade_tariff_service.utils import (
+    RateLimiter,
+    get_host_rate_limiter,
+    iter_json_array,
+)
+
+
+class RateLimiterTestCase(TestCase):
+    def test_spaces_out_calls(self):
+        rate_limiter = RateLimiter(rate=10)
+
+        with mock.patch(
+            "trade_tariff_service.utils.time.monotonic", return_value=100.0
+        ), mock.patch("trade_tariff_service.utils.time.sleep") as mock_sleep:
+            for _ in range(3):
+                rate_limiter.wait()
+
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertAlmostEqual(mock_sleep.call_args_list[0].args[0], 0.1)
+        self.assertAlmostEqual(mock_sleep.call_args_list[1].args[0], 0.2)
+
+    def test_no_rate_does_not_wait(self):
+        rate_limiter = RateLimiter(rate=0)
+
+        with mock.patch("trade_tariff_service.utils.time.sleep") as mock_sleep:
+            rate_limiter.wait()
+
+        mock_sleep.assert_not_called()
+
+    def test_rate_limiter_shared_per_host(self):
+        uk_limiter = get_host_rate_limiter("https://example.com/api/v2/", 10)
+        eu_limiter = get_host_rate_limiter("https://example.com/xi/api/v2/", 10)
+        other_limiter = get_host_rate_limiter("https://example.org/api/v2/", 10)
+
+        self.assertIs(uk_limiter, eu_limiter)
+        self.assertIsNot(uk_limiter, other_limiter)
+
+
+class IterJSONArrayTestCase(TestCase):
+    def write_file(self, content):
+        f = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        self.addCleanup(f.close)
+        f.write(content)
+        f.flush()
+
+        return f.name
+
+    def test_yields_items(self):
+        items = [
+            {"goods_nomenclature_sid": 27623, "description": "Live animals, [bovine]"},
+            [1, 2, 3],
+            "text",
+            12345,
+            -1.5,
+            True,
+            None,
+        ]
+        file_path = self.write_file(json.dumps(items, indent=2))
+
+        for chunk_size in [1, 2, 7, 64 * 1024]:
+            self.assertEqual(
+                list(iter_json_array(file_path, chunk_size=chunk_size)), items
+            )
+
+    def test_empty_array(self):
+        file_path = self.write_file(" [ ] ")
+
+        self.assertEqual(list(iter_json_array(file_path)), [])
+
+    def test_leading_whitespace_longer_than_chunk(self):
+        file_path = self.write_file("\n" * 10 + ' \t[{"a": 1}]')
+
+        self.assertEqual(list(iter_json_array(file_path, chunk_size=4)), [{"a": 1}])
+
+    def test_empty_file(self):
+        file_path = self.write_file("  ")
+
+        with self.assertRaises(ValueError):
+            list(iter_json_array(file_path, chunk_size=1))
+
+    def test_not_an_array(self):
+        file_path = self.write_file('{"a": 1}')
+
+        with self.assertRaises(ValueError):
+            list(iter_json_array(file_path))
+
+    def test_truncated_file(self):
+        file_path = self.write_file('[{"a": 1}, {"b": ')
+
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_json_array(file_path, chunk_size=4))
@@ -1,11 +1,13 @@
 import logging
 import re
 
+from collections import defaultdict, namedtuple
 from datetime import datetime
 
 from django.template import loader
 from dateutil.parser import parse as parse_dt
 from django.conf import settings
+from django.core.cache import cache
 
 from countries.models import Country
 
@@ -24,10 +26,56 @@ COMMODITY_DETAIL_TABLE_KEYS = [
 ]
 
 
+# an import measure as held in `BaseCommodityJson.measure_index`, `position` is its position in
+# the json so that measures can be returned in their original order
+IndexedMeasure = namedtuple("IndexedMeasure", ["position", "di", "excluded_area_ids"])
+
+
+def build_measure_index(import_measures):
+    """
+    Indexes import measures by the id of every country they apply to and then by measure type
+    :param import_measures: list of import measures from the json
+    :return: dict of country code to dict of measure type id to list of IndexedMeasure
+    """
+    measure_index = defaultdict(lambda: defaultdict(list))
+
+    for position, di in enumerate(import_measures):
+        geo_area = di["geographical_area"]
+        if geo_area is None:
+            continue
+
+        # only countries are matched, not numbered groups of countries
+        area_ids = {
+            area["id"]
+            for area in [geo_area] + geo_area["children_geographical_areas"]
+            if area["id"][0].isalpha()
+        }
+        if not area_ids:
+            continue
+
+        measure = IndexedMeasure(
+            position,
+            di,
+            frozenset(
+                area["geographical_area_id"] for area in di["excluded_countries"]
+            ),
+        )
+        for area_id in area_ids:
+            measure_index[area_id][di["measure_type"]["id"]].append(measure)
+
+    return {
+        area_id: dict(measures_by_type)
+        for area_id, measures_by_type in measure_index.items()
+    }
+
+
 class BaseCommodityJson:
     def __init__(self, commodity_obj, di):
         self.commodity_obj = commodity_obj
         self.di = di
+        self._measure_index = None
+        self._country_names = {}
+        self._content_updated_at = None
 
     @property
     def title(self):
@@ -48,21 +96,100 @@ class BaseCommodityJson:
     def is_meursing_code(self):
         return self.di.get("meursing_code", False)
 
-    def get_import_measures(self, origin_country, vat=None, excise=None):
-        if "import_measures" not in self.di:
+    @property
+    def measure_index(self):
+        """
+        Import measures relevant to each origin country by measure type, built on first use and
+        kept for as long as the decoded json
+        :return: dict, see `build_measure_index`
+        """
+        if self._measure_index is None:
+            self._measure_index = build_measure_index(
+                self.di.get("import_measures", [])
+            )
+
+        return self._measure_index
+
+    def _get_indexed_measures(self, origin_country, type_ids=None):
+        if not origin_country:
             return []
 
-        measures = [
-            ImportMeasureJson(
-                self.commodity_obj, d, self.code, self.title, origin_country
-            )
-            for d in self.di["import_measures"]
+        measures_by_type = self.measure_index.get(origin_country.upper(), {})
+        if type_ids is None:
+            type_ids = measures_by_type.keys()
+
+        return sorted(
+            (
+                measure
+                for type_id in type_ids
+                for measure in measures_by_type.get(type_id, [])
+            ),
+            key=lambda measure: measure.position,
+        )
+
+    def _get_import_measure_json(self, measure, origin_country):
+        return ImportMeasureJson(
+            self.commodity_obj,
+            measure.di,
+            self.code,
+            self.title,
+            origin_country,
+            commodity_json=self,
+        )
+
+    def get_country_name(self, country_code):
+        """
+        Returns the name of the country, which is only looked up once for all of the measures
+        :param country_code: country code
+        :return: string
+        """
+        country_code = country_code.upper()
+        if country_code not in self._country_names:
+            country = Country.objects.get(country_code=country_code)
+            self._country_names[country_code] = country.name
+
+        return self._country_names[country_code]
+
+    def get_modal_cache_key(self, country_code, modal_id):
+        """
+        Returns the key the rendered modal is cached under, which changes whenever the content is
+        updated so cached modals never have to be invalidated
+        :param country_code: country code
+        :param modal_id: id of the modal
+        :return: string or None if the content has no update time
+        """
+        if self._content_updated_at is None:
+            self._content_updated_at = self.commodity_obj.last_updated
+            if self._content_updated_at is None:
+                return None
+
+        return "measure_modal__{0}_{1}_{2}_{3}_{4}_{5}".format(
+            self.commodity_obj.__class__.__name__,
+            self.commodity_obj.pk,
+            self.commodity_obj.nomenclature_tree_id,
+            country_code.upper(),
+            self._content_updated_at.timestamp(),
+            modal_id,
+        )
+
+    def get_group_import_measures(self, origin_country, type_ids):
+        """
+        Returns the import measures of the given types relevant to the origin country, without
+        the ones it is excluded from
+        :param origin_country: country code
+        :param type_ids: collection of measure type ids
+        :return: list of ImportMeasureJson
+        """
+        return [
+            self._get_import_measure_json(measure, origin_country)
+            for measure in self._get_indexed_measures(origin_country, type_ids)
+            if origin_country not in measure.excluded_area_ids
         ]
 
+    def get_import_measures(self, origin_country, vat=None, excise=None):
         measures = [
-            json_obj
-            for json_obj in measures
-            if json_obj.is_relevant_for_origin_country(origin_country)
+            self._get_import_measure_json(measure, origin_country)
+            for measure in self._get_indexed_measures(origin_country)
         ]
 
         if vat is not None:
@@ -113,7 +240,13 @@ class SubHeadingJson(BaseCommodityJson):
 
 class ImportMeasureJson:
     def __init__(
-        self, commodity_obj, di, commodity_code, commodity_title, country_code
+        self,
+        commodity_obj,
+        di,
+        commodity_code,
+        commodity_title,
+        country_code,
+        commodity_json=None,
     ):
         self.commodity_obj = commodity_obj
         self.di = di
@@ -121,6 +254,7 @@ class ImportMeasureJson:
         self.commodity_title = commodity_title
         self.measures_modals = {}
         self.country_code = country_code
+        self.commodity_json = commodity_json
 
     def __repr__(self):
         return "ImportMeasureJson %s %s" % (self.commodity_code, self.type_id)
@@ -209,22 +343,45 @@ class ImportMeasureJson:
             html = """<a data-toggle="modal" data-target="{0}" href="{1}">Conditions</a>""".format(
                 modal_id, url
             )
-            self.measures_modals[modal_id] = self.get_modal(
-                modal_id, self.get_conditions_table
+            self.measures_modals[modal_id] = self.get_cached_modal(
+                modal_id, lambda: self.get_modal(modal_id, self.get_conditions_table)
             )
 
         return html
 
+    def get_cached_modal(self, modal_id, render_modal):
+        """
+        Returns the rendered modal from the cache, rendering it when it isn't cached yet
+        :param modal_id: id of the modal
+        :param render_modal: callable rendering the modal
+        :return: the html of the modal
+        """
+        cache_key = None
+        if self.commodity_json is not None:
+            cache_key = self.commodity_json.get_modal_cache_key(
+                self.country_code, modal_id
+            )
+
+        if cache_key is None:
+            return render_modal()
+
+        return cache.get_or_set(cache_key, render_modal)
+
+    def get_country_name(self):
+        if self.commodity_json is not None:
+            return self.commodity_json.get_country_name(self.country_code)
+
+        return Country.objects.get(country_code=self.country_code.upper()).name
+
     def get_modal(self, modal_id, modal_body):
         template = loader.get_template("core/modal_base.html")
-        country = Country.objects.get(country_code=self.country_code.upper())
         context = {
             "modal_id": modal_id,
             "modal_body": modal_body,
             "commodity_code_split": self.commodity_code_split,
             "measure_type": self.type_description,
             "commodity_description": self.commodity_title,
-            "selected_origin_country_name": country.name,
+            "selected_origin_country_name": self.get_country_name(),
         }
         rendered = template.render(context)
         return rendered
@@ -322,6 +479,14 @@ class ImportMeasureJson:
             modal_id, url, order_number
         )
 
+        self.measures_modals[modal_id] = self.get_cached_modal(
+            modal_id,
+            lambda: self.get_modal(modal_id, self.get_quota_modal_body(order_number)),
+        )
+
+        return html
+
+    def get_quota_modal_body(self, order_number):
         if self.di["order_number"]["definition"] is None:
             modal_body = """<table class="govuk-table app-flexible-table">
                             <caption class="govuk-table__caption govuk-heading-m">Quota number : {0}</caption>
@@ -335,9 +500,7 @@ class ImportMeasureJson:
         else:
             modal_body = self.get_quota_table
 
-        self.measures_modals[modal_id] = self.get_modal(modal_id, modal_body)
-
-        return html
+        return modal_body
 
     def get_table_row(self, get_quotas_url, get_conditions_url):
         """
@@ -1,5 +1,109 @@
+import json
 import os
+import threading
+import time
+
+from urllib.parse import urlparse
 
 
 def createDir(path):
     os.makedirs(path, exist_ok=True)
+
+
+ARRAY_DELIMITERS = ", \t\n\r]"
+
+
+def iter_json_array(file_path, chunk_size=64 * 1024):
+    """
+    Yields the items of a JSON file holding a top level array one at a time, so the whole
+    file never has to be held in memory
+    :param file_path: path of the JSON file
+    :param chunk_size: number of characters read from the file at a time
+    :return: generator of the decoded items
+    """
+    decoder = json.JSONDecoder()
+
+    with open(file_path) as f:
+        # the leading whitespace can be longer than a chunk
+        buffer = ""
+        while not buffer:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            buffer = chunk.lstrip()
+
+        if not buffer.startswith("["):
+            raise ValueError(f"{file_path} does not hold a JSON array")
+        buffer = buffer[1:]
+
+        while True:
+            buffer = buffer.lstrip().lstrip(",").lstrip()
+            if buffer.startswith("]"):
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer += chunk
+                continue
+
+            # a number or literal is only complete once followed by a delimiter as it could
+            # have been cut short at the end of the chunk
+            if not isinstance(item, (dict, list, str)) and (
+                end == len(buffer) or buffer[end] not in ARRAY_DELIMITERS
+            ):
+                chunk = f.read(chunk_size)
+                if chunk:
+                    buffer += chunk
+                    continue
+
+            yield item
+            buffer = buffer[end:]
+
+
+class RateLimiter:
+    """
+    Spaces out calls to `wait` so that no more than `rate` calls per second go through,
+    shared across threads
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            wait_until = max(self._next_time, now)
+            self._next_time = wait_until + self.interval
+
+        delay = wait_until - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+_host_rate_limiters = {}
+_host_rate_limiters_lock = threading.Lock()
+
+
+def get_host_rate_limiter(url, rate):
+    """
+    Returns the rate limiter for the host of `url`, so clients for different regions
+    served from the same host share a limit
+    :param url: any url on the host
+    :param rate: maximum requests per second, used when creating the limiter
+    :return: RateLimiter
+    """
+    host = urlparse(url).netloc
+    with _host_rate_limiters_lock:
+        if host not in _host_rate_limiters:
+            _host_rate_limiters[host] = RateLimiter(rate)
+
+        return _host_rate_limiters[host]
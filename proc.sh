@@ -12,4 +12,10 @@ if [ $? -ne 0 ]; then
     exit
 fi
 
+# stores the section notes of trees imported before they were stored with the tree, this
+# does nothing once they are all stored
+if [ "$RUN_MIGRATIONS" ]; then
+    python manage.py backfill_section_notes
+fi
+
 gunicorn -c config/gunicorn.py config.wsgi:application --worker-class=gevent --worker-connections=1000 --workers 9 --bind 0.0.0.0:$PORT
@@ -2,4 +2,8 @@
 
 #pipenv run /app/manage.py runserver_plus 0.0.0.0:8000
 
+# the NLTK corpora used to generate the search keywords, only the missing ones are fetched
+# the server doesn't need them so it's still started when they can't be downloaded
+pipenv run /app/manage.py download_nltk_corpora || true
+
 pipenv run /app/manage.py runserver 0.0.0.0:8000